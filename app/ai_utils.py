@@ -1,44 +1,244 @@
 # app/ai_utils.py
 
-from openai import OpenAI
 import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from app.llm_client import chat_completion
+from app.summary_cache import get_summary_cache
 
 load_dotenv()
-openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-def summarize_and_tag(text: str):
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = "gpt-3.5-turbo"
+# 요약/구간 요약 프롬프트나 결과 형식을 바꾸면 올립니다. 요약 캐시 키에 포함되어 이전 결과를 쓰지 않게 됩니다.
+SUMMARY_PROMPT_VERSION = "v2"
+# 생성할 태그 수
+SUMMARY_TAG_COUNT = 5
+# 입력 토큰이 이 값 이하이면 한 번에 요약하고, 넘으면 구간별 요약(map) 후 합쳐서(reduce) 요약합니다.
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv("SUMMARY_MAX_INPUT_TOKENS", "3000"))
+# map 단계에서 한 번에 요약할 구간의 최대 토큰 수
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "2000"))
+# 문서 하나에서 요약에 사용할 최대 토큰 수. 넘는 뒷부분은 요약하지 않습니다.
+SUMMARY_MAX_DOCUMENT_TOKENS = int(os.getenv("SUMMARY_MAX_DOCUMENT_TOKENS", "30000"))
+# map 단계에서 동시에 보낼 요약 요청 수
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+# reduce 단계가 여전히 길 때 다시 map-reduce를 반복할 최대 횟수
+SUMMARY_MAX_REDUCE_ROUNDS = 3
+
+# tiktoken 인코더는 처음 사용할 때 불러옵니다. (인코딩 파일을 내려받지 못하면 바이트 수로 추정)
+token_encoder = None
+_token_encoder_loaded = False
+
+def get_token_encoder():
+    global token_encoder, _token_encoder_loaded
+    if not _token_encoder_loaded:
+        _token_encoder_loaded = True
+        try:
+            import tiktoken
+            token_encoder = tiktoken.encoding_for_model(SUMMARY_MODEL)
+        except Exception as e:
+            logger.warning(f"tiktoken 인코더를 불러오지 못해 토큰 수를 추정합니다: {e}")
+    return token_encoder
+
+def count_tokens(text: str) -> int:
+    encoder = get_token_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    # 영어는 약 4바이트, 한글은 1~2글자(3~6바이트)당 1토큰이므로 3바이트당 1토큰으로 넉넉히 추정
+    return -(-len(text.encode("utf-8")) // 3)
+
+def _split_oversized(text: str, max_tokens: int) -> list[str]:
+    """max_tokens보다 긴 텍스트를 글자 수 비율로 잘라 max_tokens 이하의 조각으로 나눕니다."""
+    pieces = []
+    while (tokens := count_tokens(text)) > max_tokens:
+        cut = max(1, len(text) * max_tokens // tokens * 9 // 10)
+        pieces.append(text[:cut])
+        text = text[cut:]
+    if text:
+        pieces.append(text)
+    return pieces
+
+def group_chunks(chunks: list[str], max_tokens: int = SUMMARY_CHUNK_TOKENS,
+                 max_total_tokens: int = SUMMARY_MAX_DOCUMENT_TOKENS) -> list[str]:
+    """
+    순서대로 이어지는 청크를 max_tokens 이하의 구간으로 묶습니다.
+    전체가 max_total_tokens를 넘으면 그 뒤의 청크는 버립니다.
+    """
+    groups, current, current_tokens, total = [], [], 0, 0
+    for chunk in chunks:
+        for piece in _split_oversized(chunk, max_tokens):
+            tokens = count_tokens(piece)
+            if total + tokens > max_total_tokens:
+                logger.warning(f"문서가 최대 {max_total_tokens} 토큰을 넘어 뒷부분은 요약하지 않습니다.")
+                return groups + (["\n".join(current)] if current else [])
+            if current and current_tokens + tokens > max_tokens:
+                groups.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += tokens
+            total += tokens
+    if current:
+        groups.append("\n".join(current))
+    return groups
+
+def summarize_section(text: str) -> str:
+    """map 단계: 긴 문서의 한 구간을 핵심 내용만 남겨 요약합니다."""
+    prompt = (
+        "다음은 긴 글의 일부입니다. 핵심 내용과 중요한 고유명사, 숫자를 빠짐없이 3~5문장으로 요약하세요.\n\n"
+        f"{text}"
+    )
+    response = chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return response.choices[0].message.content.strip()
+
+def reduce_to_budget(text: str, chunks: list[str] | None = None) -> str:
+    """
+    입력이 SUMMARY_MAX_INPUT_TOKENS 이하가 될 때까지 구간별 요약(map)을 병렬로 실행하고 이어 붙입니다(reduce).
+    chunks가 주어지면 (예: run_langchain_pipeline의 청크) 그대로 묶어서 사용합니다.
+    """
+    for _ in range(SUMMARY_MAX_REDUCE_ROUNDS):
+        if count_tokens(text) <= SUMMARY_MAX_INPUT_TOKENS:
+            break
+        sections = group_chunks(chunks or text.split("\n"), SUMMARY_CHUNK_TOKENS, SUMMARY_MAX_DOCUMENT_TOKENS)
+        with ThreadPoolExecutor(max_workers=SUMMARY_MAP_CONCURRENCY, thread_name_prefix="summary-map") as executor:
+            partials = list(executor.map(summarize_section, sections))
+        logger.info(f"긴 문서를 {len(sections)}개 구간으로 나누어 요약했습니다.")
+        text, chunks = "\n\n".join(partials), None
+
+    # 요약을 반복해도 예산 안으로 줄지 않으면 앞부분만 사용
+    if count_tokens(text) > SUMMARY_MAX_INPUT_TOKENS:
+        text = _split_oversized(text, SUMMARY_MAX_INPUT_TOKENS)[0]
+    return text
+
+class SummaryResult(BaseModel):
+    """summarize_and_tag의 구조화된 출력 형식 (JSON 모드 응답을 검증)."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    title: str = Field(min_length=1)
+    summary: str = Field(min_length=1)
+    tags: list[str]
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def _normalize_tags(cls, value):
+        # "태그1, 태그2"처럼 문자열로 오거나 '#'이 붙은 경우도 받아들임
+        if isinstance(value, str):
+            value = value.split(",")
+        if not isinstance(value, (list, tuple)):
+            # null, 숫자 등은 그대로 넘겨 pydantic이 ValidationError(list_type)로 보고하게 함
+            return value
+        tags = [str(tag).strip().lstrip("#").strip() for tag in value]
+        return [tag for tag in dict.fromkeys(tags) if tag][:SUMMARY_TAG_COUNT]
+
+
+class ParseMetrics:
+    """구조화된 출력 파싱 실패율. 첫 파싱 실패, 수리 성공/실패 횟수를 셉니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.parse_failures = 0
+        self.repaired = 0
+        self.repair_failures = 0
+
+    def record(self, parsed: bool, repaired: bool | None = None):
+        with self._lock:
+            self.responses += 1
+            self.parse_failures += not parsed
+            if repaired is not None:
+                self.repaired += repaired
+                self.repair_failures += not repaired
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "parse_failures": self.parse_failures,
+                "repaired": self.repaired,
+                "repair_failures": self.repair_failures,
+                "parse_failure_rate": self.parse_failures / self.responses if self.responses else 0.0,
+            }
+
+
+parse_metrics = ParseMetrics()
+
+SUMMARY_SCHEMA_HINT = '{"title": "제목 (30자 이내)", "summary": "한 문단 요약", "tags": ["태그1", "태그2", "태그3", "태그4", "태그5"]}'
+
+def _repair_summary(content: str, error: Exception) -> SummaryResult:
+    """형식이 맞지 않는 응답을 원문 재요약 없이 짧은 요청 한 번으로 JSON 형식에 맞게 고칩니다."""
+    response = chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": f"입력을 다음 형식의 JSON 객체로만 고쳐서 출력하세요: {SUMMARY_SCHEMA_HINT}"},
+            {"role": "user", "content": f"오류: {error}\n\n{content}"},
+        ],
+        response_format={"type": "json_object"},
+        temperature=0,
+    )
+    return SummaryResult.model_validate_json(response.choices[0].message.content or "")
+
+def _generate_summary(text: str, chunks: list[str] | None = None) -> dict:
+    text = reduce_to_budget(text, chunks)
     prompt = (
         "다음 글을 기반으로 아래 3가지를 생성하세요:\n"
         "1. 제목 (30자 이내)\n"
         "2. 한 문단 요약\n"
-        "3. 관련 태그 5개 (쉼표로 구분)\n\n"
-        "출력 형식:\n"
-        "[제목]\n[요약 문장]\n[태그1, 태그2, 태그3, 태그4, 태그5]\n\n"
+        f"3. 관련 태그 {SUMMARY_TAG_COUNT}개\n\n"
+        f"다음 형식의 JSON 객체로만 출력하세요: {SUMMARY_SCHEMA_HINT}\n\n"
         f"{text}"
     )
 
+    # JSON 모드로 응답을 받아 스키마로 검증하고, 형식이 어긋나면 한 번만 수리를 요청
+    response = chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"},
+    )
+    content = response.choices[0].message.content or ""
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        result = response.choices[0].message.content.strip().split("\n")
+        result = SummaryResult.model_validate_json(content)
+        parse_metrics.record(parsed=True)
+    except ValidationError as e:
+        logger.warning(f"요약 응답 형식 오류, 수리를 시도합니다: {e.errors()[0]['msg']}")
+        try:
+            result = _repair_summary(content, e)
+        except Exception:
+            # 수리 응답이 여전히 형식에 맞지 않거나, 수리 요청 자체가 실패한 경우
+            parse_metrics.record(parsed=False, repaired=False)
+            logger.error(f"요약 응답 수리 실패 (파싱 실패율 {parse_metrics.snapshot()['parse_failure_rate']:.1%})")
+            raise
+        parse_metrics.record(parsed=False, repaired=True)
 
-        title = result[0].strip('[]')
-        summary = result[1] if len(result) > 1 else "요약 없음"
-        tags_line = result[2] if len(result) > 2 else ""
-        tags = [tag.strip().strip('[]') for tag in tags_line.split(",") if tag.strip()] 
+    return result.model_dump()
 
-        return {
-            "title": title,
-            "summary": summary,
-            "tags": tags
-        }
+def summarize_and_tag(text: str, chunks: list[str] | None = None):
+    """
+    제목/요약/태그를 생성합니다. 입력이 SUMMARY_MAX_INPUT_TOKENS를 넘으면
+    구간별 요약(chunks가 있으면 그 청크 단위)을 먼저 만든 뒤 합친 내용으로 생성합니다.
+    같은(공백/유니코드 표기만 다른) 텍스트의 결과는 요약 캐시에서 재사용하며, 실패 결과는 저장하지 않습니다.
+    """
+    summary_cache = get_summary_cache()
+    if summary_cache and (cached := summary_cache.get(text, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION)) is not None:
+        return cached
 
-    except Exception:
+    try:
+        result = _generate_summary(text, chunks)
+    except Exception as e:
+        logger.error(f"요약/태그 생성 실패: {e}")
         return {
             "title": "제목 생성 실패",
             "summary": "요약 실패",
             "tags": ["실패", "에러", "요약불가", "GPT오류", "기본"]
         }
+
+    if summary_cache:
+        summary_cache.set(text, SUMMARY_MODEL, SUMMARY_PROMPT_VERSION, result)
+    return result
@@ -0,0 +1,258 @@
+# app/batch_index.py
+import os
+import json
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import redis
+from celery import group, states
+from dotenv import load_dotenv
+from app.celery_config import celery_app
+from app.redis_client import get_redis
+from app.result_cache import canonicalize_url, get_cached_result, get_cached_results, claim_inflight, release_inflight
+from app.task_routing import detect_queue, QUEUE_TASKS, BATCH_PREPARE_TASK
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 한 번에 등록할 수 있는 최대 URL 수
+BATCH_INDEX_MAX_URLS = int(os.getenv("BATCH_INDEX_MAX_URLS", "1000"))
+# URL 정규화(리다이렉트 확인), 결과 캐시 조회, 큐 판별을 동시에 처리할 스레드 수
+BATCH_INDEX_PREPARE_CONCURRENCY = int(os.getenv("BATCH_INDEX_PREPARE_CONCURRENCY", "16"))
+# 배치 정보 유지 시간(초). 작업이 끝나 결과가 기록되거나, 대기 중인 작업이 남은 배치를 조회할 때마다 다시 늘립니다.
+BATCH_INDEX_TTL = int(os.getenv("BATCH_INDEX_TTL", "3600"))
+
+# 배치 정보는 Redis 해시 하나에 저장합니다.
+#   urls          등록한 URL 목록 (준비 작업이 끝나기 전까지)
+#   error         준비 작업이 실패한 이유
+#   meta          {"total", "duplicates"} (준비 작업이 끝나면 기록)
+#   item:{i}      등록 순서 i번째 항목 {"url", "canonical_url", "task_id"} (+ 캐시된 "result" / 잘못된 URL의 "error")
+#   done:{task_id} 끝난 작업의 상태 {"status", "result" | "error"} (Celery 결과/URL 결과 캐시가 만료되어도 유지)
+
+
+def _key(group_id: str) -> str:
+    return f"batch-index:{group_id}"
+
+
+def submit_batch(urls: list[str]) -> dict:
+    """
+    배치 ID(group_id)를 발급하고 바로 반환합니다.
+    URL 정규화(리다이렉트 확인)와 큐 판별은 URL마다 HEAD 요청이 필요하므로 웹 큐의 준비 작업(prepare_batch)에서 처리하며,
+    그동안 /batch-status는 preparing=True와 함께 모든 URL을 대기 중으로 반환합니다.
+    """
+    group_id = str(uuid.uuid4())
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.hset(_key(group_id), mapping={"urls": json.dumps(urls, ensure_ascii=False)})
+    pipe.expire(_key(group_id), BATCH_INDEX_TTL)
+    pipe.execute()
+    try:
+        celery_app.send_task(BATCH_PREPARE_TASK, args=[group_id])
+    except Exception:
+        r.delete(_key(group_id))
+        raise
+    return {"group_id": group_id, "submitted": len(urls)}
+
+
+def _canonicalize(url: str) -> str | None:
+    try:
+        return canonicalize_url(url)
+    except ValueError as e:
+        logger.warning(f"배치에서 잘못된 URL을 건너뜁니다: {e}")
+        return None
+
+
+def _claim(canonical_url: str | None, url: str) -> dict:
+    """캐시된 결과가 있으면 그 결과를, 같은 URL의 작업이 진행 중이면 그 task_id를 사용하고, 없으면 새 작업을 준비합니다."""
+    if canonical_url is None:
+        return {"url": url, "canonical_url": None, "task_id": None, "error": "잘못된 URL입니다."}
+
+    cached = get_cached_result(canonical_url)
+    if cached is not None:
+        return {"url": url, "canonical_url": canonical_url, "task_id": None, "result": cached}
+
+    task_id = str(uuid.uuid4())
+    if existing_task_id := claim_inflight(canonical_url, task_id):
+        return {"url": url, "canonical_url": canonical_url, "task_id": existing_task_id}
+
+    return {"url": url, "canonical_url": canonical_url, "task_id": task_id, "queue": detect_queue(url)}
+
+
+def prepare_batch(group_id: str) -> dict | None:
+    """
+    submit_batch로 등록한 URL을 정규화하고, 정규화한 URL이 같은 항목은 배치 안에서 한 번만 처리합니다.
+    결과가 캐시된 URL은 작업 없이 결과를 바로 넣고, 새로 처리할 작업은 Celery group으로 한 번에 보냅니다.
+    배치가 없거나 만료되었으면 None.
+    """
+    r = get_redis()
+    key = _key(group_id)
+    found = r.hget(key, "urls")
+    if found is None:
+        logger.warning(f"배치 {group_id}가 없거나 만료되어 준비를 건너뜁니다.")
+        return None
+    urls = json.loads(found)
+
+    try:
+        with ThreadPoolExecutor(max_workers=BATCH_INDEX_PREPARE_CONCURRENCY, thread_name_prefix="batch-index") as executor:
+            # 1. 정규화 후 중복 제거 (처음 나온 URL과 순서를 유지, 잘못된 URL은 원문 기준)
+            unique_urls = list(dict.fromkeys(urls))
+            canonical_by_url = dict(zip(unique_urls, executor.map(_canonicalize, unique_urls)))
+            first_url = {}
+            for url in unique_urls:
+                first_url.setdefault(canonical_by_url[url] or url, url)
+
+            # 2. URL별로 캐시/진행 중 작업 확인 및 큐 판별
+            items = list(executor.map(_claim, [canonical_by_url[url] for url in first_url.values()], first_url.values()))
+
+        # 3. 새 작업은 큐별 작업 이름으로 만들어 group으로 한 번에 전송 (group_id = 배치 ID)
+        new_items = [item for item in items if "queue" in item]
+        signatures = [
+            celery_app.signature(QUEUE_TASKS[item.pop("queue")], args=[item["url"]],
+                                 kwargs={"canonical_url": item["canonical_url"], "batch_id": group_id}).set(task_id=item["task_id"])
+            for item in new_items
+        ]
+        if signatures:
+            try:
+                group(signatures).apply_async(task_id=group_id)
+            except Exception:
+                # 큐에 넣지 못한 작업의 task_id를 다른 요청이 공유하지 않도록 진행 중 표시를 해제
+                for item in new_items:
+                    release_inflight(item["canonical_url"], item["task_id"])
+                raise
+    except Exception as e:
+        r.hset(key, "error", f"배치 준비 실패: {e}")
+        raise
+
+    duplicates = len(urls) - len(items)
+    pipe = r.pipeline()
+    pipe.hset(key, mapping={
+        "meta": json.dumps({"total": len(items), "duplicates": duplicates}),
+        **{f"item:{i}": json.dumps(item, ensure_ascii=False) for i, item in enumerate(items)},
+    })
+    pipe.hdel(key, "urls")
+    pipe.expire(key, BATCH_INDEX_TTL)
+    pipe.execute()
+    logger.info(f"배치 등록: URL {len(urls)}개 → 작업 {len(signatures)}개 (캐시 {sum('result' in item for item in items)}개, "
+                f"중복 {duplicates}개)")
+
+    return {"group_id": group_id, "total": len(items), "queued": len(signatures), "duplicates": duplicates}
+
+
+def record_batch_result(group_id: str, task_id: str, result: dict | None = None, error: str | None = None):
+    """
+    배치로 보낸 작업이 끝나면 워커가 결과(또는 실패 이유)를 배치 정보에 기록합니다.
+    Celery 결과(result_expires)나 URL 결과 캐시가 만료되거나 꺼져 있어도 배치 진행 상황이 유지됩니다.
+    """
+    done = {"status": states.SUCCESS, "result": result} if error is None else {"status": states.FAILURE, "error": error}
+    try:
+        r = get_redis()
+        # 만료된 배치는 다시 만들지 않음
+        if not r.exists(_key(group_id)):
+            return
+        pipe = r.pipeline()
+        pipe.hset(_key(group_id), f"done:{task_id}", json.dumps(done, ensure_ascii=False))
+        pipe.expire(_key(group_id), BATCH_INDEX_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"배치 결과 기록 실패: {e}")
+
+
+def _task_metas(task_ids: list[str]) -> list[dict | None]:
+    """작업 결과를 Celery 결과 저장소에서 한 번에(MGET) 읽습니다."""
+    if not task_ids:
+        return []
+    backend = celery_app.backend
+    values = backend.mget([backend.get_key_for_task(task_id) for task_id in task_ids])
+    return [backend.decode_result(value) if value else None for value in values]
+
+
+def _status(group_id: str, entries: list[dict], duplicates: int, preparing: bool, offset: int, limit: int) -> dict:
+    succeeded = sum(entry["status"] == states.SUCCESS for entry in entries)
+    failed = sum(entry["status"] in states.PROPAGATE_STATES for entry in entries)
+    pending = len(entries) - succeeded - failed
+    return {
+        "group_id": group_id,
+        "preparing": preparing,
+        "total": len(entries),
+        "duplicates": duplicates,
+        "succeeded": succeeded,
+        "failed": failed,
+        "pending": pending,
+        "progress": (succeeded + failed) / len(entries) if entries else 1.0,
+        "offset": offset,
+        "limit": limit,
+        "results": entries[offset:offset + limit],
+    }
+
+
+def get_batch_status(group_id: str, offset: int = 0, limit: int = 50) -> dict | None:
+    """
+    배치 전체의 진행 상황(완료/실패/대기 수)과 등록 순서대로 offset부터 limit개 항목의 상태와 결과를 반환합니다.
+    끝난 작업의 상태는 배치 정보에 기록해 두므로 Celery 결과나 URL 결과 캐시가 만료되어도 진행률이 줄지 않습니다.
+    배치가 없거나 만료되었으면 None.
+    """
+    r = get_redis()
+    key = _key(group_id)
+    fields = {name.decode() if isinstance(name, bytes) else name: value for name, value in r.hgetall(key).items()}
+
+    if "meta" not in fields:
+        if "urls" not in fields:
+            return None
+        # 아직 준비 중이거나 준비에 실패한 배치: 등록한 URL을 그대로 보여줌
+        error = fields["error"].decode() if isinstance(fields.get("error"), bytes) else fields.get("error")
+        entries = [{"url": url, "task_id": None, "status": states.PENDING} for url in json.loads(fields["urls"])]
+        if error is not None:
+            for entry in entries:
+                entry.update(status=states.FAILURE, error=error)
+        return _status(group_id, entries, 0, error is None, offset, limit)
+
+    meta = json.loads(fields["meta"])
+    items = [json.loads(fields[f"item:{i}"]) for i in range(meta["total"])]
+    done = {name.removeprefix("done:"): json.loads(value) for name, value in fields.items() if name.startswith("done:")}
+
+    pending_index = [i for i, item in enumerate(items)
+                     if "result" not in item and "error" not in item and item["task_id"] not in done]
+    metas = dict(zip(pending_index, _task_metas([items[i]["task_id"] for i in pending_index])))
+    # Celery 결과가 없는 항목은 URL 결과 캐시를 확인 (다른 요청이 먼저 등록해 이 배치에 기록되지 않는 작업 등)
+    missing_index = [i for i in pending_index if metas[i] is None]
+    cached = dict(zip(missing_index, get_cached_results([items[i]["canonical_url"] for i in missing_index])))
+
+    entries = []
+    new_done = {}
+    for i, item in enumerate(items):
+        entry = {"url": item["url"], "task_id": item["task_id"]}
+        if "result" in item:
+            entry.update(status=states.SUCCESS, result=item["result"])
+        elif "error" in item:
+            entry.update(status=states.FAILURE, error=item["error"])
+        elif item["task_id"] in done:
+            entry.update(done[item["task_id"]])
+        else:
+            task_meta = metas[i] or {}
+            status = task_meta.get("status", states.PENDING)
+            if status == states.SUCCESS:
+                entry.update(status=status, result=task_meta.get("result"))
+            elif status in states.PROPAGATE_STATES:
+                entry.update(status=status, error=str(task_meta.get("result")))
+            elif cached.get(i) is not None:
+                entry.update(status=states.SUCCESS, result=cached[i])
+            else:
+                entry["status"] = status
+            # 끝난 상태는 만료되기 전에 배치 정보에 기록
+            if entry["status"] in states.READY_STATES:
+                new_done[f"done:{item['task_id']}"] = json.dumps({k: v for k, v in entry.items() if k not in ("url", "task_id")},
+                                                                  ensure_ascii=False)
+        entries.append(entry)
+
+    status = _status(group_id, entries, meta["duplicates"], False, offset, limit)
+    # 대기 중인 작업이 남아 있으면 배치 정보를 더 유지
+    if new_done or status["pending"]:
+        pipe = r.pipeline()
+        if new_done:
+            pipe.hset(key, mapping=new_done)
+        pipe.expire(key, BATCH_INDEX_TTL)
+        pipe.execute()
+    return status
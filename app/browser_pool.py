@@ -0,0 +1,198 @@
+# app/browser_pool.py
+import os
+import threading
+import logging
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 동시에 열 수 있는 페이지 수와 브라우저 재시작 주기 (환경변수로 조정 가능)
+BROWSER_POOL_MAX_PAGES = int(os.getenv("BROWSER_POOL_MAX_PAGES", "2"))
+BROWSER_RECYCLE_AFTER = int(os.getenv("BROWSER_RECYCLE_AFTER", "100"))
+
+
+class _BrowserSlot:
+    """한 스레드가 소유하는 Playwright 인스턴스와 브라우저 묶음."""
+
+    def __init__(self, playwright, browser):
+        self.playwright = playwright
+        self.browser = browser
+        self.pages = 0
+        self.thread = threading.current_thread()
+
+
+class BrowserPool:
+    """
+    프로세스 안에서 Chromium 브라우저를 재사용하는 풀.
+    sync Playwright 객체는 생성한 스레드에서만 쓸 수 있으므로 스레드마다 브라우저를 하나씩 띄우고,
+    동시에 열리는 페이지 수는 프로세스 전체에서 세마포어로 제한합니다.
+    """
+
+    def __init__(self, max_pages: int = BROWSER_POOL_MAX_PAGES,
+                 recycle_after: int = BROWSER_RECYCLE_AFTER,
+                 launch_options: dict | None = None):
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self.launch_options = launch_options or {"headless": True}
+        self.pid = os.getpid()
+
+        self._semaphore = threading.BoundedSemaphore(max_pages)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._slots = []
+
+        # 메트릭
+        self._waiters = 0
+        self._active = 0
+        self._pages_served = 0
+        self._launch_count = 0
+        self._recycle_count = 0
+        self._crash_count = 0
+
+    def _launch(self) -> _BrowserSlot:
+        playwright = sync_playwright().start()
+        browser = playwright.chromium.launch(**self.launch_options)
+        slot = _BrowserSlot(playwright, browser)
+        with self._lock:
+            self._launch_count += 1
+            self._slots.append(slot)
+        logger.info(f"Chromium 브라우저를 시작했습니다. (누적 {self._launch_count}회)")
+        return slot
+
+    def _close_slot(self, slot: _BrowserSlot):
+        with self._lock:
+            if slot in self._slots:
+                self._slots.remove(slot)
+        try:
+            slot.browser.close()
+        except Exception as e:
+            logger.warning(f"브라우저 종료 중 오류 발생: {e}")
+        try:
+            slot.playwright.stop()
+        except Exception as e:
+            logger.warning(f"Playwright 종료 중 오류 발생: {e}")
+
+    def _acquire_slot(self) -> _BrowserSlot:
+        """현재 스레드의 브라우저를 반환하고, 죽었거나 수명이 다했으면 새로 띄웁니다."""
+        slot = getattr(self._local, "slot", None)
+
+        if slot is not None and not slot.browser.is_connected():
+            logger.warning("브라우저 연결이 끊어져 재시작합니다.")
+            with self._lock:
+                self._crash_count += 1
+            self._close_slot(slot)
+            slot = None
+        elif slot is not None and slot.pages >= self.recycle_after:
+            logger.info(f"브라우저가 {slot.pages}개 페이지를 처리하여 재시작합니다.")
+            with self._lock:
+                self._recycle_count += 1
+            self._close_slot(slot)
+            slot = None
+
+        if slot is None:
+            self._reap_dead_slots()
+            slot = self._launch()
+            self._local.slot = slot
+        return slot
+
+    def _reap_dead_slots(self):
+        """종료된 스레드가 남긴 브라우저를 정리합니다 (다른 스레드에서는 재사용할 수 없음)."""
+        with self._lock:
+            dead = [slot for slot in self._slots if not slot.thread.is_alive()]
+        for slot in dead:
+            logger.warning(f"종료된 스레드({slot.thread.name})의 브라우저를 정리합니다.")
+            self._close_slot(slot)
+
+    def release_current_thread(self):
+        """현재 스레드의 브라우저를 종료합니다. 스레드를 끝내기 전에 그 스레드에서 호출합니다."""
+        slot = getattr(self._local, "slot", None)
+        if slot is not None:
+            self._local.slot = None
+            self._close_slot(slot)
+
+    @contextmanager
+    def page(self, **context_options):
+        """
+        격리된 브라우저 컨텍스트의 새 페이지를 빌려줍니다.
+        블록을 벗어나면 컨텍스트(쿠키, 스토리지 포함)는 닫히고 브라우저는 다음 요청을 위해 남겨둡니다.
+        """
+        with self._lock:
+            self._waiters += 1
+        self._semaphore.acquire()
+        with self._lock:
+            self._waiters -= 1
+            self._active += 1
+
+        slot = None
+        context = None
+        try:
+            slot = self._acquire_slot()
+            context = slot.browser.new_context(**context_options)
+            page = context.new_page()
+            with self._lock:
+                self._pages_served += 1
+            slot.pages += 1
+            yield page
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except Exception as e:
+                    logger.warning(f"브라우저 컨텍스트 종료 중 오류 발생: {e}")
+            with self._lock:
+                self._active -= 1
+            self._semaphore.release()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "max_pages": self.max_pages,
+                "active": self._active,
+                "waiters": self._waiters,
+                "browsers": len(self._slots),
+                "pages_served": self._pages_served,
+                "launch_count": self._launch_count,
+                "recycle_count": self._recycle_count,
+                "crash_count": self._crash_count,
+            }
+
+    def close(self):
+        """풀이 띄운 모든 브라우저를 종료합니다."""
+        for slot in list(self._slots):
+            self._close_slot(slot)
+        self._local = threading.local()
+
+
+# 풀 객체는 전역 변수로 두고, 프로세스에서 처음 사용할 때 생성합니다 (지연 초기화).
+pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    프로세스 단위 BrowserPool을 반환합니다.
+    Celery prefork 워커가 fork된 뒤 부모의 풀을 물려받지 않도록 PID가 바뀌면 새로 만듭니다.
+    """
+    global pool
+    if pool is None or pool.pid != os.getpid():
+        with _pool_lock:
+            if pool is None or pool.pid != os.getpid():
+                pool = BrowserPool()
+    return pool
+
+
+def release_thread_browser():
+    """현재 스레드가 띄운 브라우저가 있으면 종료합니다."""
+    if pool is not None and pool.pid == os.getpid():
+        pool.release_current_thread()
+
+
+def shutdown_browser_pool():
+    """워커 프로세스 종료 시 브라우저를 정리합니다."""
+    global pool
+    if pool is not None and pool.pid == os.getpid():
+        pool.close()
+    pool = None
@@ -1,7 +1,9 @@
 # app/celery_config.py
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from dotenv import load_dotenv
 import os
+from app.task_routing import QUEUE_TASKS, QUEUE_RATE_LIMITS, WEB_QUEUE, OCR_QUEUE, OCR_BATCH_TASK, BATCH_PREPARE_TASK
 
 load_dotenv()
 
@@ -18,9 +20,15 @@ celery_app = Celery(
 
 # Celery 설정 최적화
 celery_app.conf.update(
-    # 작업 설정
+    # 작업 설정: 콘텐츠 종류별 큐로 보내고, 큐마다 다른 속도 제한을 적용
+    task_routes={
+        **{task_name: {'queue': queue} for queue, task_name in QUEUE_TASKS.items()},
+        OCR_BATCH_TASK: {'queue': OCR_QUEUE},
+        BATCH_PREPARE_TASK: {'queue': WEB_QUEUE},
+    },
     task_annotations={
-        'app.summarizer.process_url_task': {'rate_limit': '10/m'}
+        **{task_name: {'rate_limit': QUEUE_RATE_LIMITS[queue] or None} for queue, task_name in QUEUE_TASKS.items()},
+        'app.summarizer.process_url_task': {'rate_limit': '10/m'},
     },
     # 직렬화 설정
     task_serializer='json',
@@ -45,4 +53,35 @@ celery_app.conf.update(
     
     # 메모리 누수 방지
     worker_max_tasks_per_child=50,
-)
\ No newline at end of file
+
+    # 자식 프로세스가 모델 워밍업을 마칠 때까지 기다리는 시간 (기본 4초로는 모델 로딩 중 종료됨)
+    worker_proc_alive_timeout=float(os.getenv("WORKER_WARMUP_TIMEOUT", "300")),
+)
+
+
+@worker_process_init.connect
+def warm_up_models(**kwargs):
+    """
+    워커 프로세스가 시작될 때 구독하는 큐에 필요한 모델(OCR/음성 인식)을 미리 불러옵니다.
+    첫 작업과 worker_max_tasks_per_child로 재시작된 프로세스가 모델 로딩을 기다리지 않게 합니다.
+    """
+    from app.warmup import models_for_queues, warm_up
+    consume_from = celery_app.amqp.queues.consume_from
+    queues = list(consume_from) if consume_from else [celery_app.conf.task_default_queue]
+    warm_up(models_for_queues(queues))
+
+
+@worker_process_shutdown.connect
+def shutdown_browser_pool_on_exit(**kwargs):
+    """워커 프로세스가 종료될 때 재사용하던 Chromium 브라우저를 정리합니다."""
+    from app.summarizer import shutdown_thumbnail_executor
+    from app.browser_pool import shutdown_browser_pool
+    shutdown_thumbnail_executor()
+    shutdown_browser_pool()
+
+
+@worker_process_shutdown.connect
+def flush_s3_uploads_on_exit(**kwargs):
+    """워커 프로세스가 종료되기 전에 백그라운드 큐에 남은 S3 업로드를 마칩니다."""
+    from app.thumbnail_handler import flush_uploads
+    flush_uploads()
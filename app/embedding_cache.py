@@ -0,0 +1,130 @@
+# app/embedding_cache.py
+import os
+import re
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+import numpy as np
+import redis
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+from app.redis_client import get_redis
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+# 모델별 최대 보관 벡터 수 (1536차원 float32 기준 항목당 약 6KB)
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", str(30 * 86400)))
+
+
+def normalize_chunk(text: str) -> str:
+    """공백/유니코드 표기 차이만 있는 청크가 같은 키를 갖도록 정규화합니다."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 모델 앞에 두는 Redis 캐시.
+    키는 (모델 이름, 정규화된 청크 텍스트의 해시)이며, 이미 임베딩한 청크는 API를 다시 호출하지 않습니다.
+    보관 개수는 최근 사용 시각 기준(LRU)으로 EMBEDDING_CACHE_MAX_ENTRIES까지 유지합니다.
+    """
+
+    def __init__(self, underlying: Embeddings, model_name: str | None = None,
+                 max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, ttl: int = EMBEDDING_CACHE_TTL):
+        self.underlying = underlying
+        self.model_name = model_name or getattr(underlying, "model", "unknown")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()
+        return f"emb-cache:{self.model_name}:{digest}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"emb-cache:{self.model_name}:lru"
+
+    def _lookup(self, keys: list[str]) -> list[bytes | None]:
+        try:
+            return get_redis().mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"임베딩 캐시 조회 실패: {e}")
+            return [None] * len(keys)
+
+    def _store(self, entries: dict[str, list[float]], touched: list[str]):
+        try:
+            r = get_redis()
+            now = time.time()
+            pipe = r.pipeline(transaction=False)
+            for key, vector in entries.items():
+                pipe.set(key, np.asarray(vector, dtype=np.float32).tobytes(), ex=self.ttl)
+            if touched:
+                pipe.zadd(self._lru_key, {key: now for key in touched})
+            pipe.zcard(self._lru_key)
+            size = pipe.execute()[-1]
+
+            # 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            if size > self.max_entries:
+                evicted = r.zrange(self._lru_key, 0, size - self.max_entries - 1)
+                if evicted:
+                    r.delete(*evicted)
+                    r.zrem(self._lru_key, *evicted)
+        except redis.RedisError as e:
+            logger.warning(f"임베딩 캐시 저장 실패: {e}")
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(keys)
+
+        vectors = [None] * len(texts)
+        miss_index = {}
+        for i, (key, value) in enumerate(zip(keys, cached)):
+            if value is not None:
+                vectors[i] = np.frombuffer(value, dtype=np.float32).tolist()
+            else:
+                # 같은 배치 안의 중복 청크는 한 번만 임베딩
+                miss_index.setdefault(key, []).append(i)
+
+        new_entries = {}
+        if miss_index:
+            miss_keys = list(miss_index)
+            miss_texts = [texts[miss_index[key][0]] for key in miss_keys]
+            for key, vector in zip(miss_keys, self.underlying.embed_documents(miss_texts)):
+                new_entries[key] = vector
+                for i in miss_index[key]:
+                    vectors[i] = vector
+
+        # 적중은 Redis 조회 결과로만 셈 (배치 안에서 중복된 미적중 청크는 적중이 아님)
+        hits = sum(value is not None for value in cached)
+        with self._lock:
+            self._hits += hits
+            self._misses += len(texts) - hits
+        self._store(new_entries, list(dict.fromkeys(keys)))
+
+        logger.info(f"임베딩 캐시: {hits}/{len(texts)} 적중 (누적 적중률 {self.metrics()['hit_rate']:.1%})")
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        # 검색 질의는 캐시하지 않음
+        return self.underlying.embed_query(text)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
@@ -1,8 +1,10 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import logging
 from app.structure_detector import extract_main_content_from_html # 새로운 함수 임포트
+from app.browser_pool import get_browser_pool
+from app.fetcher import PageArtifact
+from app import http_client
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -12,43 +14,49 @@ logger = logging.getLogger(__name__)
 def _extract_naver_blog_content(url: str) -> str | None:
     """Playwright를 사용해 네이버 블로그 본문을 추출하는 도우미 함수."""
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
+        with get_browser_pool().page() as page:
             page.goto(url, timeout=20000, wait_until='domcontentloaded')
             content_html = page.content()
-            browser.close()
-
-            soup = BeautifulSoup(content_html, 'html.parser')
-            content_selectors = [
-                "div.se-main-container",  # 최신 스마트에디터
-                "div.post_content",        # 구버전 스마트에디터
-                "div.blog_content",        # 또 다른 구버전
-                "div.article",             # 일반적인 블로그 아티클
-            ]
-
-            for selector in content_selectors:
-                if main_content := soup.select_one(selector):
-                    text = main_content.get_text(separator='\n', strip=True)
-                    if len(text) > 50:
-                        logger.info(f"선택자 '{selector}'를 사용하여 텍스트를 성공적으로 추출했습니다.")
-                        return text
-
-            # 선택자로 텍스트를 찾지 못한 경우 unstructured 라이브러리를 최종적으로 시도
-            logger.warning("일반 선택자로 본문 추출 실패. unstructured 라이브러리로 재시도합니다.")
-            return extract_main_content_from_html(content_html)
+
+        return _parse_naver_blog_html(content_html)
 
     except Exception as e:
         logger.error(f"Playwright로 네이버 블로그 처리 중 오류 발생: {e}")
         return None
 
 
+def _parse_naver_blog_html(content_html: str) -> str | None:
+    """렌더링된 네이버 블로그 HTML에서 본문을 찾아 반환합니다."""
+    soup = BeautifulSoup(content_html, 'html.parser')
+    content_selectors = [
+        "div.se-main-container",  # 최신 스마트에디터
+        "div.post_content",        # 구버전 스마트에디터
+        "div.blog_content",        # 또 다른 구버전
+        "div.article",             # 일반적인 블로그 아티클
+    ]
+
+    for selector in content_selectors:
+        if main_content := soup.select_one(selector):
+            text = main_content.get_text(separator='\n', strip=True)
+            if len(text) > 50:
+                logger.info(f"선택자 '{selector}'를 사용하여 텍스트를 성공적으로 추출했습니다.")
+                return text
+
+    # 선택자로 텍스트를 찾지 못한 경우 unstructured 라이브러리를 최종적으로 시도
+    logger.warning("일반 선택자로 본문 추출 실패. unstructured 라이브러리로 재시도합니다.")
+    return extract_main_content_from_html(content_html)
+
+
 # 메인 추출 함수
-def extract_text_from_url(url: str):
+def extract_text_from_url(url: str, artifact: PageArtifact | None = None):
     """
     URL을 분석하여 콘텐츠 유형과 텍스트를 반환합니다.
-    네이버 블로그는 Playwright를, 그 외에는 requests를 사용합니다.
+    이미 렌더링된 artifact가 있으면 페이지를 다시 불러오지 않고 그 HTML을 사용합니다.
+    없으면 네이버 블로그는 Playwright를, 그 외에는 공유 HTTP 클라이언트로 가져옵니다.
     """
+    if artifact is not None and artifact.html:
+        return extract_text_from_artifact(artifact)
+
     if "blog.naver.com" in url:
         logger.info(f"네이버 블로그 URL 감지: {url}. Playwright로 처리를 시도합니다.")
         # 도우미 함수를 호출하여 네이버 블로그 본문 추출 시도
@@ -60,25 +68,40 @@ def extract_text_from_url(url: str):
     return extract_text_with_requests(url)
 
 
+def extract_text_from_artifact(artifact: PageArtifact):
+    """fetch_page가 렌더링한 HTML에서 콘텐츠 유형과 텍스트를 추출합니다."""
+    if "blog.naver.com" in artifact.final_url or "blog.naver.com" in artifact.url:
+        text = _parse_naver_blog_html(artifact.html)
+        if text:
+            return "네이버 블로그", text
+
+    return artifact.headers.get('content-type', ''), _html_to_text(artifact.html)
+
+
+def _html_to_text(html) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+
+    for script_or_style in soup(["script", "style"]):
+        script_or_style.decompose()
+
+    body = soup.body or soup
+    return body.get_text(separator='\n', strip=True)
+
+
 # 일반 웹페이지 추출 함수
 def extract_text_with_requests(url: str):
-    """requests와 BeautifulSoup을 사용하여 웹페이지 텍스트를 추출하는 일반적인 방법입니다."""
+    """공유 HTTP 클라이언트(keep-alive)와 BeautifulSoup을 사용하여 웹페이지 텍스트를 추출하는 일반적인 방법입니다."""
     logger.info(f"일반 방식으로 URL 처리: {url}")
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=10)
+        response = http_client.get(url, headers=headers, timeout=10)
         response.raise_for_status()
 
         content_type = response.headers.get('Content-Type', '')
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        for script_or_style in soup(["script", "style"]):
-            script_or_style.decompose()
-
-        text = soup.body.get_text(separator='\n', strip=True)
+        text = _html_to_text(response.content)
         return content_type, text
-    except requests.RequestException as e:
-        logger.error(f"requests로 URL 처리 중 오류 발생: {e}")
+    except httpx.HTTPError as e:
+        logger.error(f"HTTP 요청으로 URL 처리 중 오류 발생: {e}")
         return "에러", f"URL 콘텐츠를 가져오는 데 실패했습니다: {e}"
\ No newline at end of file
@@ -0,0 +1,68 @@
+# app/fetcher.py
+import logging
+from dataclasses import dataclass, field
+from app.browser_pool import get_browser_pool
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PageArtifact:
+    """
+    URL을 한 번 렌더링한 결과물.
+    썸네일 생성과 본문 추출이 같은 로드 결과를 공유하도록 process_url_task 안에서 전달됩니다.
+    """
+    url: str
+    final_url: str
+    status: int | None = None
+    headers: dict = field(default_factory=dict)
+    html: str | None = None
+    body: bytes | None = None        # 이미지 등 HTML이 아닌 응답의 원본 바이트
+    screenshot: bytes | None = None
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").lower()
+
+    @property
+    def is_image(self) -> bool:
+        return "image" in self.content_type
+
+
+def fetch_page(url: str, take_screenshot: bool = True) -> PageArtifact | None:
+    """
+    공유 브라우저 풀에서 URL을 한 번만 로드하여 최종 URL, 헤더, HTML, 스크린샷을 함께 반환합니다.
+    로드에 실패하면 None을 반환하며, 호출 측은 기존 방식(requests 등)으로 처리합니다.
+    """
+    try:
+        with get_browser_pool().page() as page:
+            response = page.goto(url, wait_until='domcontentloaded', timeout=20000)
+            headers = response.headers if response else {}
+            artifact = PageArtifact(
+                url=url,
+                final_url=page.url,
+                status=response.status if response else None,
+                headers=headers,
+            )
+
+            # 이미지는 렌더링 없이 원본 바이트만 보관
+            if artifact.is_image:
+                artifact.body = response.body()
+                return artifact
+
+            # 스크린샷을 위해 네트워크가 잠잠해질 때까지 기다리되, 끝나지 않는 페이지는 그대로 진행
+            try:
+                page.wait_for_load_state('networkidle', timeout=15000)
+            except Exception:
+                logger.warning(f"networkidle 대기 시간 초과, 현재 상태로 진행합니다: {url}")
+
+            artifact.html = page.content()
+            if take_screenshot:
+                artifact.screenshot = page.screenshot()
+            return artifact
+
+    except Exception as e:
+        logger.error(f"Playwright로 페이지 로드 중 오류 발생: {e}")
+        return None
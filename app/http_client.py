@@ -0,0 +1,246 @@
+# app/http_client.py
+import os
+import time
+import asyncio
+import logging
+import threading
+import importlib.util
+from collections import OrderedDict
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+# 한 호스트에 동시에 보낼 수 있는 요청 수
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+# h2 패키지가 설치되어 있을 때만 HTTP/2를 사용합니다.
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+# 같은 URL의 HEAD 응답을 재사용하는 시간(초). 한 작업 안의 여러 단계가 HEAD를 한 번만 보내도록 합니다.
+HEAD_CACHE_TTL = float(os.getenv("HEAD_CACHE_TTL", "60"))
+HEAD_CACHE_MAX_ENTRIES = int(os.getenv("HEAD_CACHE_MAX_ENTRIES", "256"))
+# 호스트별 동시 요청 제한(세마포어)을 보관할 최대 호스트 수. 넘으면 가장 오래 사용하지 않은 호스트부터 제거합니다.
+HTTP_HOST_LIMITS_MAX_ENTRIES = int(os.getenv("HTTP_HOST_LIMITS_MAX_ENTRIES", "1024"))
+
+
+def _client_options() -> dict:
+    http2 = HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+    return {
+        "http2": http2,
+        "timeout": HTTP_TIMEOUT,
+        "follow_redirects": True,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+# 클라이언트는 전역 변수로 두고, 프로세스에서 처음 사용할 때 생성합니다 (지연 초기화).
+client = None
+client_pid = None
+_client_lock = threading.Lock()
+_host_limits = OrderedDict()
+
+# FastAPI 엔드포인트에서 await로 사용하는 비동기 클라이언트. 커넥션이 이벤트 루프에 묶이므로 루프별로 만듭니다.
+async_client = None
+async_client_loop = None
+_async_host_limits = OrderedDict()
+_async_head_requests = {}
+
+_head_cache = OrderedDict()
+_head_locks = {}
+_head_cache_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    프로세스 단위로 공유하는 httpx 클라이언트를 반환합니다.
+    keep-alive 커넥션을 재사용하며, fork 이후에는 부모의 커넥션을 쓰지 않도록 새로 만듭니다.
+    """
+    global client, client_pid
+    if client is None or client_pid != os.getpid():
+        with _client_lock:
+            if client is None or client_pid != os.getpid():
+                options = _client_options()
+                client = httpx.Client(**options)
+                client_pid = os.getpid()
+                logger.info(f"HTTP 클라이언트 생성 (HTTP/2: {options['http2']}, 호스트당 최대 {HTTP_MAX_CONNECTIONS_PER_HOST}개 요청)")
+                _host_limits.clear()
+                with _head_cache_lock:
+                    _head_cache.clear()
+    return client
+
+
+def _limit_for(limits: OrderedDict, host: str, factory):
+    """
+    호스트의 동시 요청 제한을 반환합니다. 보관 개수는 HTTP_HOST_LIMITS_MAX_ENTRIES까지 LRU로 유지합니다.
+    제거된 세마포어를 들고 있는 요청은 그대로 끝나며, 그 호스트의 다음 요청부터 새 세마포어를 사용합니다.
+    """
+    slot = limits.get(host)
+    if slot is None:
+        slot = limits[host] = factory(HTTP_MAX_CONNECTIONS_PER_HOST)
+    limits.move_to_end(host)
+    while len(limits) > HTTP_HOST_LIMITS_MAX_ENTRIES:
+        limits.popitem(last=False)
+    return slot
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = httpx.URL(url).host
+    with _client_lock:
+        return _limit_for(_host_limits, host, threading.BoundedSemaphore)
+
+
+def request(method: str, url: str, **kwargs) -> httpx.Response:
+    http = get_http_client()
+    with _host_slot(url):
+        return http.request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> httpx.Response:
+    return request("GET", url, **kwargs)
+
+
+def head(url: str, **kwargs) -> httpx.Response:
+    """
+    HEAD 응답을 HEAD_CACHE_TTL 동안 재사용합니다.
+    여러 스레드가 같은 URL을 동시에 요청하면 한 번만 보내고 결과를 공유합니다. 실패한 응답(예외)은 저장하지 않습니다.
+    """
+    if HEAD_CACHE_TTL <= 0:
+        return request("HEAD", url, **kwargs)
+
+    with _head_cache_lock:
+        cached = _cached_head(url)
+        if cached is not None:
+            return cached
+        url_lock = _head_locks.setdefault(url, threading.Lock())
+
+    with url_lock:
+        # 기다리는 동안 다른 스레드가 먼저 받아왔으면 그대로 사용
+        with _head_cache_lock:
+            cached = _cached_head(url)
+            if cached is not None:
+                return cached
+        try:
+            response = request("HEAD", url, **kwargs)
+            # URL별 락을 없애기 전에 저장해야, 그 사이에 들어온 요청이 HEAD를 다시 보내지 않음
+            _remember_head(url, response)
+        finally:
+            with _head_cache_lock:
+                _head_locks.pop(url, None)
+        return response
+
+
+def _remember_head(url: str, response: httpx.Response):
+    with _head_cache_lock:
+        _head_cache[url] = (time.monotonic() + HEAD_CACHE_TTL, response)
+        _head_cache.move_to_end(url)
+        while len(_head_cache) > HEAD_CACHE_MAX_ENTRIES:
+            _head_cache.popitem(last=False)
+
+
+def _cached_head(url: str) -> httpx.Response | None:
+    entry = _head_cache.get(url)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if expires_at < time.monotonic():
+        del _head_cache[url]
+        return None
+    _head_cache.move_to_end(url)
+    return response
+
+
+def get_content_type(url: str, **kwargs) -> str:
+    """URL의 Content-Type을 소문자로 반환합니다. HEAD 응답은 head()의 캐시를 공유합니다."""
+    return head(url, **kwargs).headers.get("Content-Type", "").lower()
+
+
+def clear_head_cache():
+    with _head_cache_lock:
+        _head_cache.clear()
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    FastAPI 엔드포인트에서 await로 사용하는 비동기 클라이언트를 반환합니다.
+    동기 클라이언트와 같은 커넥션 풀 설정을 사용하며, 다른 이벤트 루프에서 호출되면 새로 만듭니다.
+    """
+    global async_client, async_client_loop
+    loop = asyncio.get_running_loop()
+    if async_client is None or async_client.is_closed or async_client_loop is not loop:
+        async_client = httpx.AsyncClient(**_client_options())
+        async_client_loop = loop
+        _async_host_limits.clear()
+        _async_head_requests.clear()
+    return async_client
+
+
+async def async_request(method: str, url: str, **kwargs) -> httpx.Response:
+    http = get_async_http_client()
+    async with _limit_for(_async_host_limits, httpx.URL(url).host, asyncio.Semaphore):
+        return await http.request(method, url, **kwargs)
+
+
+async def async_get(url: str, **kwargs) -> httpx.Response:
+    return await async_request("GET", url, **kwargs)
+
+
+async def async_head(url: str, **kwargs) -> httpx.Response:
+    """
+    head()의 비동기 버전. 동기 클라이언트와 같은 HEAD 캐시를 사용하며,
+    같은 URL을 동시에 요청하면 한 번만 보내고 결과를 공유합니다. 실패한 응답(예외)은 저장하지 않습니다.
+    """
+    if HEAD_CACHE_TTL <= 0:
+        return await async_request("HEAD", url, **kwargs)
+
+    get_async_http_client()
+    with _head_cache_lock:
+        cached = _cached_head(url)
+    if cached is not None:
+        return cached
+
+    pending = _async_head_requests.get(url)
+    if pending is None:
+        pending = _async_head_requests[url] = asyncio.ensure_future(_async_fetch_head(url, **kwargs))
+    # 기다리던 요청 하나가 취소되어도 다른 요청이 공유하는 HEAD는 계속 진행
+    return await asyncio.shield(pending)
+
+
+async def _async_fetch_head(url: str, **kwargs) -> httpx.Response:
+    try:
+        response = await async_request("HEAD", url, **kwargs)
+        _remember_head(url, response)
+        return response
+    finally:
+        _async_head_requests.pop(url, None)
+
+
+async def async_get_content_type(url: str, **kwargs) -> str:
+    """get_content_type()의 비동기 버전."""
+    return (await async_head(url, **kwargs)).headers.get("Content-Type", "").lower()
+
+
+async def close_async_http_client():
+    global async_client
+    if async_client is not None:
+        await async_client.aclose()
+        async_client = None
+    _async_host_limits.clear()
+    _async_head_requests.clear()
+
+
+def close_http_client():
+    global client
+    with _client_lock:
+        if client is not None:
+            client.close()
+            client = None
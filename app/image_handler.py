@@ -1,7 +1,29 @@
 # app/image_handler.py
+import io
+import os
+import logging
 import easyocr
+import numpy as np
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
 from app.text_filter import clean_text
 from app.ai_utils import summarize_and_tag
+from app import http_client
+from app.ocr_cache import get_ocr_cache
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 긴 변이 이 값(px)보다 큰 이미지는 비율을 유지하며 줄인 뒤 OCR합니다. 0이면 줄이지 않음.
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "1600"))
+# 한 번에 검출(detection) 모델에 넣을 이미지 수와, 인식(recognition) 배치 크기
+OCR_DETECT_BATCH_SIZE = int(os.getenv("OCR_DETECT_BATCH_SIZE", "4"))
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))
+# 0보다 크면 글자 픽셀 비율이 이 값보다 낮은 검출 영역(빈 배경, 단색 바 등)은 인식을 건너뜁니다.
+OCR_MIN_TEXT_DENSITY = float(os.getenv("OCR_MIN_TEXT_DENSITY", "0"))
 
 # reader 객체를 전역 변수로 선언하되, 초기화는 하지 않습니다.
 reader = None
@@ -18,16 +40,110 @@ def get_ocr_reader():
         print("EasyOCR reader initialized.")
     return reader
 
-def extract_text_from_image(image_path: str) -> str:
-    # get_ocr_reader() 함수를 통해 reader 객체를 가져옵니다.
+def load_ocr_image(source: str | bytes | np.ndarray, max_side: int | None = None) -> np.ndarray:
+    """
+    파일 경로/URL/바이트를 RGB 배열로 읽고, 긴 변이 max_side(기본값 OCR_MAX_SIDE)를 넘으면 줄입니다.
+    이미 읽은 배열은 그대로 반환합니다.
+    """
+    if max_side is None:
+        max_side = OCR_MAX_SIDE
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, bytes):
+        image = Image.open(io.BytesIO(source))
+    elif source.startswith(("http://", "https://")):
+        response = http_client.get(source)
+        response.raise_for_status()
+        image = Image.open(io.BytesIO(response.content))
+    else:
+        image = Image.open(source)
+
+    image = ImageOps.exif_transpose(image).convert("RGB")
+    if max_side and max(image.size) > max_side:
+        scale = max_side / max(image.size)
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.Resampling.LANCZOS)
+    return np.asarray(image)
+
+def _pad_batch(images: list[np.ndarray]) -> np.ndarray:
+    """
+    크기가 다른 이미지를 흰 배경으로 오른쪽/아래만 채워 같은 크기로 맞춥니다.
+    왼쪽 위 기준이라 검출된 좌표는 원본 이미지 좌표와 같습니다.
+    """
+    height = max(image.shape[0] for image in images)
+    width = max(image.shape[1] for image in images)
+    batch = np.full((len(images), height, width, 3), 255, dtype=np.uint8)
+    for i, image in enumerate(images):
+        batch[i, :image.shape[0], :image.shape[1]] = image
+    return batch
+
+def _batches(images: list[np.ndarray], size: int):
+    """세로/가로 방향이 같은 이미지끼리 묶어 채움(padding) 낭비를 줄입니다."""
+    groups = {}
+    for index, image in enumerate(images):
+        groups.setdefault(image.shape[0] >= image.shape[1], []).append(index)
+    for indices in groups.values():
+        for start in range(0, len(indices), size):
+            yield indices[start:start + size]
+
+def text_density(grey: np.ndarray, box) -> float:
+    """검출 영역 [x_min, x_max, y_min, y_max]에서 배경과 뚜렷이 다른(글자로 보이는) 픽셀의 비율."""
+    x_min, x_max, y_min, y_max = (max(0, int(v)) for v in box)
+    region = grey[y_min:y_max, x_min:x_max]
+    if region.size == 0:
+        return 0.0
+    return float(np.mean(np.abs(region.astype(np.int16) - int(np.median(region))) > 40))
+
+def extract_text_from_images(sources: list[str | bytes | np.ndarray]) -> list[str]:
+    """
+    여러 이미지를 한 번에 OCR합니다.
+    이미지를 줄여서 OCR_DETECT_BATCH_SIZE장씩 묶어 검출 모델을 한 번에 실행하고,
+    검출된 영역은 이미지별로 OCR_BATCH_SIZE개씩 묶어 인식합니다.
+    """
+    if not sources:
+        return []
     ocr_reader = get_ocr_reader()
-    results = ocr_reader.readtext(image_path, detail=0)
-    raw_text = "\n".join(results)
-    return raw_text
+    images = [load_ocr_image(source) for source in sources]
+    greys = [np.asarray(Image.fromarray(image).convert("L")) for image in images]
+
+    texts = [""] * len(images)
+    skipped = 0
+    for indices in _batches(images, OCR_DETECT_BATCH_SIZE):
+        batch = _pad_batch([images[i] for i in indices])
+        horizontal_lists, free_lists = ocr_reader.detect(batch, reformat=False)
+
+        for i, horizontal_list, free_list in zip(indices, horizontal_lists, free_lists):
+            if OCR_MIN_TEXT_DENSITY > 0:
+                kept = [box for box in horizontal_list if text_density(greys[i], box) >= OCR_MIN_TEXT_DENSITY]
+                skipped += len(horizontal_list) - len(kept)
+                horizontal_list = kept
+            if not horizontal_list and not free_list:
+                continue
+            results = ocr_reader.recognize(greys[i], horizontal_list, free_list,
+                                           batch_size=OCR_BATCH_SIZE, detail=0, reformat=False)
+            texts[i] = "\n".join(results)
+
+    if skipped:
+        logger.info(f"글자 밀도가 낮은 영역 {skipped}개의 인식을 건너뛰었습니다.")
+    return texts
+
+def extract_text_from_image(image_path: str | bytes | np.ndarray) -> str:
+    return extract_text_from_images([image_path])[0]
+
+def process_image_tip(image_path: str | bytes) -> dict:
+    image = load_ocr_image(image_path)
+
+    # 같은(재인코딩/리사이즈된) 이미지를 이미 OCR했다면 결과를 재사용
+    ocr_cache = get_ocr_cache()
+    image_hash = ocr_cache.hash_image(image) if ocr_cache else None
+    cached = ocr_cache.get(image_hash) if ocr_cache else None
+    if cached is not None:
+        raw_text, cleaned_text = cached["raw_text"], cached["cleaned_text"]
+    else:
+        raw_text = extract_text_from_image(image)
+        cleaned_text = clean_text(raw_text)
+        if ocr_cache:
+            ocr_cache.set(image_hash, raw_text, cleaned_text)
 
-def process_image_tip(image_path: str) -> dict:
-    raw_text = extract_text_from_image(image_path)
-    cleaned_text = clean_text(raw_text)
     summary_and_tags = summarize_and_tag(cleaned_text)
 
     return {
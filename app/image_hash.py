@@ -0,0 +1,33 @@
+# app/image_hash.py
+from PIL import Image
+
+HASH_SIZE = 8  # 8x8 = 64비트 해시
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """
+    difference hash: 흑백으로 줄인 이미지에서 가로로 이웃한 픽셀의 밝기 차이를 비트로 기록합니다.
+    해상도/압축률만 다른 거의 같은 이미지는 해밍 거리가 작은 해시를 갖습니다.
+    """
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def hash_bands(value: int, bands: int = 4, bits: int = HASH_SIZE * HASH_SIZE) -> list[int]:
+    """
+    해시를 bands개 구간으로 나눕니다. 해밍 거리가 bands - 1 이하인 두 해시는
+    비둘기집 원리에 따라 적어도 한 구간이 완전히 같으므로, 구간 값으로 후보를 찾을 수 있습니다.
+    """
+    width = bits // bands
+    mask = (1 << width) - 1
+    return [(value >> (i * width)) & mask for i in range(bands)]
@@ -1,41 +1,55 @@
 # AI/app/langchain_pipe.py
 
-import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import PGVector
-from langchain_community.embeddings import OpenAIEmbeddings
 
 from app.ai_utils import summarize_and_tag
+from app.vector_store import get_vector_store_writer
 
 load_dotenv()
 
+def without_overlap(raw_text: str, chunks: list[str]) -> list[str]:
+    """
+    splitter의 chunk_overlap만큼 앞 청크와 겹치는 앞부분을 떼어 냅니다.
+    임베딩에는 겹치는 청크가 필요하지만, 요약에는 본문을 한 번씩만 보내기 위해 사용합니다.
+    원문에서 위치를 찾지 못한 청크는 그대로 둡니다.
+    """
+    sections, covered, search_from = [], 0, 0
+    for chunk in chunks:
+        start = raw_text.find(chunk, search_from)
+        if start < 0:
+            sections.append(chunk)
+            continue
+        sections.append(chunk[max(0, covered - start):])
+        covered = max(covered, start + len(chunk))
+        search_from = start + 1
+    return [section for section in sections if section.strip()]
+
 def run_langchain_pipeline(raw_text: str):
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
     docs = splitter.create_documents([raw_text])
 
-    embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"))
-
-    conn = os.getenv("PGVECTOR_CONNECTION_STRING") or os.getenv("DB_URL")
-    
-    PGVector.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        collection_name="tip_data",
-        connection_string=conn
-    )
-
     summary = ""
     tag_list = []
     title = ""
-    try:
-        summary_and_tags = summarize_and_tag(raw_text)
-        summary = summary_and_tags["summary"]
-        title = summary_and_tags["title"]
-        tag_list = summary_and_tags["tags"]
+    # 임베딩 저장과 요약은 서로 의존하지 않으므로 동시에 실행
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="summarize") as executor:
+        # 긴 문서는 임베딩에 쓰는 청크를 겹치는 부분만 빼고 구간별 요약(map-reduce)에 사용
+        chunks = without_overlap(raw_text, [doc.page_content for doc in docs])
+        summary_future = executor.submit(summarize_and_tag, raw_text, chunks)
+
+        # 워커 프로세스에서 재사용하는 저장기로 임베딩 후 한 번에 저장
+        get_vector_store_writer().add_documents(docs)
+
+        try:
+            summary_and_tags = summary_future.result()
+            summary = summary_and_tags["summary"]
+            title = summary_and_tags["title"]
+            tag_list = summary_and_tags["tags"]
 
-    except Exception as e:
-        print(f"[AI 요약/태그 생성 중 오류] {e}")
+        except Exception as e:
+            print(f"[AI 요약/태그 생성 중 오류] {e}")
 
 
     return {
@@ -43,4 +57,4 @@ def run_langchain_pipeline(raw_text: str):
         "title": title,
         "summary": summary,
         "tags": tag_list
-    }
\ No newline at end of file
+    }
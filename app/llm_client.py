@@ -0,0 +1,261 @@
+# app/llm_client.py
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import openai
+from openai import OpenAI, AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 비어 있으면 OpenAI 기본 주소. 테스트나 프록시에서는 모의 서버 주소(예: http://127.0.0.1:8080/v1)를 지정합니다.
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# 429/5xx/연결 오류 시 재시도 횟수와 지수 백오프(지터 포함) 기준/최대 대기 시간(초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+# 프로세스당 동시에 보낼 수 있는 요청 수
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# 프로세스당 분당 요청 수/토큰 수 제한 (0이면 제한 없음)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "160000"))
+# 응답 길이를 모를 때 토큰 제한에 미리 잡아 두는 응답 토큰 수 (응답 후 실제 사용량으로 보정)
+LLM_EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "500"))
+
+# 재시도할 오류 (429, 5xx, 연결 끊김/시간 초과)
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+)
+
+
+class TokenBucket:
+    """
+    분당 rate_per_minute만큼 채워지는 토큰 버킷.
+    reserve()는 필요한 양을 먼저 차감하고(잔량이 음수가 될 수 있음) 기다려야 할 시간을 돌려주므로,
+    동기/비동기 호출이 같은 버킷을 공유할 수 있습니다.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.rate = rate_per_minute / 60
+        self.capacity = rate_per_minute
+        self.available = rate_per_minute
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            # 한 번에 버킷 용량보다 많이 요청해도 용량만큼 기다리면 보내도록 함
+            self.available -= min(amount, self.capacity)
+            return max(0.0, -self.available / self.rate)
+
+    def refund(self, amount: float):
+        """미리 잡아 둔 양이 실제보다 많았으면 돌려줍니다 (음수이면 더 차감)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self.available = min(self.capacity, self.available + amount)
+
+
+class LLMMetrics:
+    """요청 수, 재시도, 실패, 토큰 사용량, 지연 시간 누적값."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.errors = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+    def record(self, latency: float, usage=None):
+        with self._lock:
+            self.requests += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+            if usage is not None:
+                self.prompt_tokens += usage.prompt_tokens
+                self.completion_tokens += usage.completion_tokens
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "latency_avg": self.latency_total / self.requests if self.requests else 0.0,
+                "latency_max": self.latency_max,
+            }
+
+
+metrics = LLMMetrics()
+request_bucket = TokenBucket(LLM_REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(LLM_TOKENS_PER_MINUTE)
+
+# 클라이언트는 전역 변수로 두고, 프로세스에서 처음 사용할 때 생성합니다 (지연 초기화).
+client = None
+client_pid = None
+_client_lock = threading.Lock()
+_concurrency = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+async_client = None
+_async_concurrency = None
+
+
+def _client_options() -> dict:
+    # 재시도는 이 모듈에서 직접 처리하므로 SDK의 재시도는 끔
+    return {
+        "api_key": os.getenv("OPENAI_API_KEY"),
+        "base_url": OPENAI_BASE_URL,
+        "timeout": LLM_TIMEOUT,
+        "max_retries": 0,
+    }
+
+
+def get_openai_client() -> OpenAI:
+    """
+    프로세스 단위로 공유하는 OpenAI 클라이언트를 반환합니다.
+    커넥션 풀을 재사용하며, fork 이후에는 부모의 커넥션을 쓰지 않도록 새로 만듭니다.
+    """
+    global client, client_pid
+    if client is None or client_pid != os.getpid():
+        with _client_lock:
+            if client is None or client_pid != os.getpid():
+                client = OpenAI(**_client_options())
+                client_pid = os.getpid()
+    return client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    global async_client, _async_concurrency
+    if async_client is None or async_client.is_closed():
+        async_client = AsyncOpenAI(**_client_options())
+        _async_concurrency = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return async_client
+
+
+def estimate_tokens(messages: list[dict], max_tokens: int | None = None) -> int:
+    """토큰 제한에 미리 잡아 둘 양. 프롬프트는 3바이트당 1토큰으로 넉넉히 추정합니다."""
+    prompt_bytes = sum(len(str(message.get("content", "")).encode("utf-8")) for message in messages)
+    return prompt_bytes // 3 + (max_tokens or LLM_EXPECTED_COMPLETION_TOKENS)
+
+
+def _backoff(attempt: int, error: Exception) -> float:
+    """Retry-After 헤더가 있으면 따르고, 없으면 지수 백오프에 전체 지터(full jitter)를 적용합니다."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+
+def _settle(reserved: int, response):
+    """응답의 실제 토큰 사용량으로 토큰 버킷을 보정하고 사용량을 반환합니다."""
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        token_bucket.refund(reserved - usage.total_tokens)
+    return usage
+
+
+def _fail(reserved: int):
+    """최종 실패한 요청은 토큰을 쓰지 않았으므로 미리 잡아 둔 양을 토큰 버킷에 돌려줍니다."""
+    token_bucket.refund(reserved)
+    metrics.record_error()
+
+
+def chat_completion(messages: list[dict], model: str, **kwargs):
+    """
+    chat.completions.create를 호출합니다.
+    분당 요청/토큰 제한과 동시 요청 수 제한을 지키고, 429/5xx/연결 오류는 백오프 후 재시도합니다.
+    """
+    reserved = estimate_tokens(messages, kwargs.get("max_tokens"))
+    time.sleep(max(request_bucket.reserve(1), token_bucket.reserve(reserved)))
+
+    llm = get_openai_client()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        start = time.perf_counter()
+        try:
+            with _concurrency:
+                response = llm.chat.completions.create(model=model, messages=messages, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == LLM_MAX_RETRIES:
+                _fail(reserved)
+                raise
+            delay = _backoff(attempt, e)
+            metrics.record_retry()
+            logger.warning(f"LLM 요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{LLM_MAX_RETRIES}): {e}")
+            # 재시도도 분당 요청 수에 포함
+            time.sleep(max(delay, request_bucket.reserve(1)))
+            continue
+        except Exception:
+            _fail(reserved)
+            raise
+        metrics.record(time.perf_counter() - start, _settle(reserved, response))
+        return response
+
+
+async def async_chat_completion(messages: list[dict], model: str, **kwargs):
+    """chat_completion의 비동기 버전. 분당 제한은 동기 호출과 같은 버킷을 공유합니다."""
+    reserved = estimate_tokens(messages, kwargs.get("max_tokens"))
+    await asyncio.sleep(max(request_bucket.reserve(1), token_bucket.reserve(reserved)))
+
+    llm = get_async_openai_client()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        start = time.perf_counter()
+        try:
+            async with _async_concurrency:
+                response = await llm.chat.completions.create(model=model, messages=messages, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == LLM_MAX_RETRIES:
+                _fail(reserved)
+                raise
+            delay = _backoff(attempt, e)
+            metrics.record_retry()
+            logger.warning(f"LLM 요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{LLM_MAX_RETRIES}): {e}")
+            await asyncio.sleep(max(delay, request_bucket.reserve(1)))
+            continue
+        except Exception:
+            _fail(reserved)
+            raise
+        metrics.record(time.perf_counter() - start, _settle(reserved, response))
+        return response
+
+
+async def close_async_openai_client():
+    global async_client
+    if async_client is not None:
+        await async_client.close()
+        async_client = None
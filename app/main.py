@@ -18,29 +18,122 @@ else:
 print("="*50)
 
 from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from fastapi.responses import Response, RedirectResponse
-from app.extractor import extract_text_from_url
-from app.image_handler import process_image_tip
-from app.video_handler import get_combined_transcript
-from app.text_filter import clean_text
-from app.langchain_pipe import run_langchain_pipeline
-from app.summarizer import process_url_task
 from celery.result import AsyncResult
 from app.celery_config import celery_app
-from app.ai_utils import summarize_and_tag
-from app.thumbnail_handler import generate_thumbnail
+from app.result_cache import async_canonicalize_url, get_cached_result, claim_inflight, release_inflight, invalidate
+from app.task_routing import async_detect_queue, QUEUE_TASKS, OCR_BATCH_TASK
+from app.batch_index import submit_batch, get_batch_status, BATCH_INDEX_MAX_URLS
+from app.http_client import close_http_client, close_async_http_client
+from celery import states
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from concurrent.futures import ThreadPoolExecutor
+import os
+import uuid
+import base64
+
+# 웹 프로세스는 작업을 큐에 넣고 결과만 읽습니다.
+# OCR(easyocr/torch), 음성 인식, LangChain 파이프라인은 워커에서만 실행되므로 여기서 import하지 않고,
+# 요약/OCR 작업은 큐의 작업 이름으로 보내며, 웹에서 직접 처리하는 썸네일 모듈은 처음 요청될 때 불러옵니다.
 
 app = FastAPI()
 
+# 동시에 렌더링할 수 있는 썸네일 수. 동기 Playwright는 이벤트 루프 밖의 전용 스레드에서만 실행합니다.
+THUMBNAIL_MAX_CONCURRENCY = int(os.getenv("THUMBNAIL_MAX_CONCURRENCY", "4"))
+thumbnail_executor = None
+
+def get_thumbnail_executor() -> ThreadPoolExecutor:
+    global thumbnail_executor
+    if thumbnail_executor is None:
+        thumbnail_executor = ThreadPoolExecutor(max_workers=THUMBNAIL_MAX_CONCURRENCY, thread_name_prefix="thumbnail")
+    return thumbnail_executor
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    global thumbnail_executor
+    close_http_client()
+    await close_async_http_client()
+    # LLM 클라이언트는 웹 프로세스에서 import하지 않으므로, 불러온 경우에만 닫음
+    if (llm_client := sys.modules.get("app.llm_client")) is not None:
+        await llm_client.close_async_openai_client()
+    if thumbnail_executor is not None:
+        thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        thumbnail_executor = None
+
 class URLRequest(BaseModel):
     url: str
 
 @app.post("/async-index/")
-def async_index(request: URLRequest):
-    task = process_url_task.delay(request.url)
+async def async_index(request: URLRequest):
+    """
+    URL의 요약 작업을 큐에 넣고 task_id를 반환합니다.
+    리다이렉트 확인과 콘텐츠 타입 확인(HEAD)은 비동기 HTTP 클라이언트로 await하고,
+    Redis/브로커 호출은 스레드 풀에서 실행해 이벤트 루프를 막지 않습니다.
+    """
+    try:
+        canonical_url = await async_canonicalize_url(request.url)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # 1. 캐시된 결과가 있으면 작업 없이 바로 완료된 task_id를 발급
+    cached = await run_in_threadpool(get_cached_result, canonical_url)
+    if cached is not None:
+        task_id = str(uuid.uuid4())
+        await run_in_threadpool(celery_app.backend.store_result, task_id, cached, states.SUCCESS)
+        return {"task_id": task_id}
+
+    # 2. 같은 URL의 작업이 이미 진행 중이면 그 task_id를 공유 (single-flight)
+    task_id = str(uuid.uuid4())
+    if existing_task_id := await run_in_threadpool(claim_inflight, canonical_url, task_id):
+        return {"task_id": existing_task_id}
+
+    try:
+        # 3. 콘텐츠 종류(웹/이미지/유튜브)에 맞는 큐로 보냄 (긴 음성 인식이 웹페이지 요약을 막지 않도록)
+        queue = await async_detect_queue(request.url)
+        task = await run_in_threadpool(celery_app.send_task, QUEUE_TASKS[queue], args=[request.url],
+                                       kwargs={"canonical_url": canonical_url}, task_id=task_id)
+    except Exception:
+        # 큐에 넣지 못한 작업의 task_id를 다른 요청이 공유하지 않도록 진행 중 표시를 해제
+        await run_in_threadpool(release_inflight, canonical_url, task_id)
+        raise
     return {"task_id": task.id}
 
+
+class BatchURLRequest(BaseModel):
+    urls: list[str]
+
+# 배치 상태 조회에서 한 번에 반환할 수 있는 최대 항목 수
+BATCH_STATUS_MAX_LIMIT = 200
+
+@app.post("/batch-index/")
+def batch_index(request: BatchURLRequest):
+    """
+    여러 URL을 한 번에 등록하고 배치 ID(group_id)를 바로 반환합니다.
+    URL 정규화와 작업 전송은 웹 큐의 준비 작업에서 처리하며, 같은 URL(정규화 기준)은 한 번만 처리합니다.
+    진행 상황은 /batch-status/{group_id}로 조회합니다.
+    """
+    if not request.urls:
+        raise HTTPException(status_code=400, detail="URL이 비어 있습니다.")
+    if len(request.urls) > BATCH_INDEX_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {BATCH_INDEX_MAX_URLS}개의 URL만 등록할 수 있습니다.")
+    return submit_batch(request.urls)
+
+@app.get("/batch-status/{group_id}")
+def batch_status(group_id: str, offset: int = 0, limit: int = 50):
+    """배치 전체 진행 상황과 등록 순서대로 offset부터 limit개 항목의 상태/결과를 반환합니다."""
+    status = get_batch_status(group_id, max(offset, 0), min(max(limit, 1), BATCH_STATUS_MAX_LIMIT))
+    if status is None:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없거나 만료되었습니다.")
+    return status
+
+
+# 결과 캐시 무효화 (콘텐츠가 바뀐 URL을 다시 처리해야 할 때)
+@app.post("/cache/invalidate")
+def invalidate_cache(request: URLRequest):
+    return {"invalidated": invalidate(request.url)}
+
 @app.get("/task-status/{task_id}")
 def get_status(task_id: str):
     result = AsyncResult(task_id, app=celery_app)
@@ -63,7 +156,9 @@ def get_summary_result(task_id: str):
                 "summary": task_output.get("summary", "요약 없음"),
                 "title": task_output.get("title", "제목 없음"),
                 "tags": task_output.get("tags", []),
-                "thumbnail_url": task_output.get("thumbnail_url")
+                "thumbnail_url": task_output.get("thumbnail_url"),
+                "transcript_path": task_output.get("transcript_path"),
+                "subtitle_coverage": task_output.get("subtitle_coverage")
             }
         else:
             raise HTTPException(status_code=500, detail=f"요약 결과 형식이 올바르지 않습니다: {task_output}")
@@ -71,6 +166,31 @@ def get_summary_result(task_id: str):
         raise HTTPException(status_code=500, detail=f"요약 작업이 실패했습니다: {result.result}")
 
 
+# 한 요청에서 OCR할 수 있는 최대 이미지 수
+OCR_BATCH_MAX_FILES = int(os.getenv("OCR_BATCH_MAX_FILES", "16"))
+# OCR 워커의 결과를 기다리는 최대 시간(초)
+OCR_BATCH_TIMEOUT = float(os.getenv("OCR_BATCH_TIMEOUT", "120"))
+
+# 여러 이미지 OCR
+@app.post("/ocr/batch")
+def ocr_batch(files: list[UploadFile] = File(...)):
+    """
+    업로드한 이미지 여러 장을 한 번에 OCR하여 파일별 텍스트를 반환합니다.
+    검출/인식 모델을 배치로 실행하므로 한 장씩 요청하는 것보다 처리량이 높습니다.
+    OCR은 모델이 올라와 있는 ocr 큐의 워커에서 실행하고, 웹 프로세스는 결과만 기다립니다.
+    """
+    if len(files) > OCR_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {OCR_BATCH_MAX_FILES}개의 이미지만 처리할 수 있습니다.")
+
+    images = [base64.b64encode(file.file.read()).decode("ascii") for file in files]
+    task = celery_app.send_task(OCR_BATCH_TASK, args=[images])
+    try:
+        texts = task.get(timeout=OCR_BATCH_TIMEOUT)
+    except CeleryTimeoutError:
+        raise HTTPException(status_code=504, detail="OCR 작업이 제한 시간 안에 끝나지 않았습니다.")
+    return {"results": [{"filename": file.filename, "text": text} for file, text in zip(files, texts)]}
+
+
 # 썸네일 생성
 @app.post("/thumbnail")
 async def create_thumbnail(request: URLRequest):
@@ -78,8 +198,11 @@ async def create_thumbnail(request: URLRequest):
     URL을 받아 콘텐츠 유형에 맞는 썸네일을 생성합니다.
     - 유튜브: 썸네일 URL로 리다이렉트
     - 이미지/웹페이지: PNG 바이트 반환
+    렌더링은 전용 스레드 풀에서 실행되므로 다른 요청(/task-status 등)을 막지 않습니다.
     """
-    thumbnail_data, thumb_type = generate_thumbnail(request.url)
+    from app.thumbnail_handler import generate_thumbnail
+    loop = asyncio.get_running_loop()
+    thumbnail_data, thumb_type = await loop.run_in_executor(get_thumbnail_executor(), generate_thumbnail, request.url)
 
     if not thumbnail_data:
         return Response(content="썸네일 생성에 실패했습니다.", status_code=500)
@@ -0,0 +1,160 @@
+# app/ocr_cache.py
+import os
+import json
+import time
+import logging
+import threading
+import numpy as np
+import redis
+from PIL import Image
+from dotenv import load_dotenv
+from app.redis_client import get_redis
+from app.image_hash import dhash, hamming, hash_bands
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "true").lower() == "true"
+# 16x16 dHash(256비트)를 사용합니다. 글자 위주의 스크린샷은 8x8 해시로는 서로 다른 이미지도 가깝게 나올 수 있습니다.
+OCR_CACHE_HASH_SIZE = 16
+# 해밍 거리가 이 값 이하이면 같은 이미지(재인코딩/리사이즈)로 보고 캐시된 OCR 결과를 사용합니다.
+# 재인코딩/리사이즈는 보통 0~1비트 차이지만, 배치가 같은 화면에서 글자 한 줄만 바뀌어도 5~6비트 차이밖에 나지 않으므로
+# 다른 글의 OCR 결과를 돌려주지 않도록 작게 둡니다.
+OCR_CACHE_MAX_DISTANCE = int(os.getenv("OCR_CACHE_MAX_DISTANCE", "2"))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "5000"))
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", str(30 * 86400)))
+
+
+def _band_count(max_distance: int, bits: int) -> int:
+    """해밍 거리 max_distance 이내의 해시가 적어도 한 구간을 공유하도록, max_distance + 1 이상인 2의 거듭제곱 구간 수."""
+    bands = 1
+    while bands < max_distance + 1 and bands < bits // 8:
+        bands *= 2
+    return bands
+
+
+class OcrResultCache:
+    """
+    이미지의 지각 해시(dHash)를 키로 OCR 결과(raw_text, cleaned_text)를 Redis에 저장하는 캐시.
+    해시를 구간으로 나눈 색인으로 해밍 거리가 가까운 후보만 비교하며,
+    보관 개수는 최근 사용 시각 기준(LRU)으로 max_entries까지 유지합니다.
+    """
+
+    def __init__(self, max_distance: int = OCR_CACHE_MAX_DISTANCE, max_entries: int = OCR_CACHE_MAX_ENTRIES,
+                 ttl: int = OCR_CACHE_TTL, hash_size: int = OCR_CACHE_HASH_SIZE):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hash_size = hash_size
+        self.bits = hash_size * hash_size
+        self.bands = _band_count(max_distance, self.bits)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._near_hits = 0
+        self._misses = 0
+
+    def hash_image(self, image: Image.Image | np.ndarray) -> int:
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        return dhash(image, self.hash_size)
+
+    def _entry_key(self, image_hash: int) -> str:
+        return f"ocr-cache:entry:{image_hash:0{self.bits // 4}x}"
+
+    def _band_keys(self, image_hash: int) -> list[str]:
+        return [f"ocr-cache:band:{self.bands}:{i}:{band:x}"
+                for i, band in enumerate(hash_bands(image_hash, self.bands, self.bits))]
+
+    _lru_key = "ocr-cache:lru"
+
+    def get(self, image_hash: int) -> dict | None:
+        """가장 가까운(해밍 거리 max_distance 이내) 이미지의 OCR 결과를 반환합니다."""
+        try:
+            r = get_redis()
+            found = r.get(self._entry_key(image_hash))
+            match, distance = image_hash, 0
+            if found is None and self.max_distance > 0:
+                pipe = r.pipeline(transaction=False)
+                for key in self._band_keys(image_hash):
+                    pipe.smembers(key)
+                candidates = {int(member, 16) for members in pipe.execute() for member in members}
+                for distance, candidate in sorted((hamming(image_hash, c), c) for c in candidates):
+                    if distance > self.max_distance:
+                        break
+                    # 만료/제거된 항목은 건너뜀
+                    if (found := r.get(self._entry_key(candidate))) is not None:
+                        match = candidate
+                        break
+
+            if found is not None:
+                r.zadd(self._lru_key, {f"{match:x}": time.time()})
+        except redis.RedisError as e:
+            logger.warning(f"OCR 캐시 조회 실패: {e}")
+            found = None
+
+        with self._lock:
+            if found is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._near_hits += distance > 0
+        if found is None:
+            return None
+        logger.info(f"OCR 캐시 적중 (해밍 거리 {distance}, 누적 적중률 {self.metrics()['hit_rate']:.1%})")
+        return json.loads(found)
+
+    def set(self, image_hash: int, raw_text: str, cleaned_text: str):
+        try:
+            r = get_redis()
+            member = f"{image_hash:x}"
+            pipe = r.pipeline(transaction=False)
+            pipe.set(self._entry_key(image_hash),
+                     json.dumps({"raw_text": raw_text, "cleaned_text": cleaned_text}, ensure_ascii=False), ex=self.ttl)
+            for key in self._band_keys(image_hash):
+                pipe.sadd(key, member)
+            pipe.zadd(self._lru_key, {member: time.time()})
+            pipe.zcard(self._lru_key)
+            size = pipe.execute()[-1]
+
+            # 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            if size > self.max_entries:
+                for evicted in r.zrange(self._lru_key, 0, size - self.max_entries - 1):
+                    self._evict(r, int(evicted, 16))
+        except redis.RedisError as e:
+            logger.warning(f"OCR 캐시 저장 실패: {e}")
+
+    def _evict(self, r, image_hash: int):
+        member = f"{image_hash:x}"
+        pipe = r.pipeline(transaction=False)
+        pipe.delete(self._entry_key(image_hash))
+        for key in self._band_keys(image_hash):
+            pipe.srem(key, member)
+        pipe.zrem(self._lru_key, member)
+        pipe.execute()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "near_hits": self._near_hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
+
+
+# 캐시 객체는 전역 변수로 두고, 처음 사용할 때 생성합니다 (지연 초기화).
+ocr_cache = None
+
+
+def get_ocr_cache() -> OcrResultCache | None:
+    """OCR 결과 캐시를 반환합니다. OCR_CACHE_ENABLED가 false이면 None."""
+    global ocr_cache
+    if not OCR_CACHE_ENABLED:
+        return None
+    if ocr_cache is None:
+        ocr_cache = OcrResultCache()
+    return ocr_cache
@@ -0,0 +1,19 @@
+# app/redis_client.py
+import os
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL") or os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
+
+# redis 클라이언트는 처음 사용할 때 생성합니다 (지연 초기화).
+client = None
+
+
+def get_redis():
+    """캐시 용도로 공유하는 redis 클라이언트. 캐시는 장애 시 건너뛰므로 타임아웃을 짧게 둡니다."""
+    global client
+    if client is None:
+        client = redis.Redis.from_url(REDIS_URL, socket_timeout=2, socket_connect_timeout=2)
+    return client
@@ -0,0 +1,183 @@
+# app/result_cache.py
+import os
+import json
+import hashlib
+import logging
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import redis
+import httpx
+from dotenv import load_dotenv
+from app.redis_client import get_redis
+from app.task_routing import extract_video_id
+from app import http_client
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 결과 캐시 유지 시간(초). 0이면 캐시를 사용하지 않습니다.
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", "86400"))
+# 같은 URL의 작업이 진행 중임을 표시하는 키의 유지 시간(초). 워커가 죽어도 이 시간이 지나면 풀립니다.
+RESULT_CACHE_INFLIGHT_TTL = int(os.getenv("RESULT_CACHE_INFLIGHT_TTL", "900"))
+RESULT_CACHE_FOLLOW_REDIRECTS = os.getenv("RESULT_CACHE_FOLLOW_REDIRECTS", "true").lower() == "true"
+
+# 캐시 키에서 제외할 추적용 쿼리 파라미터
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "spm", "si", "_ga", "_gl", "yclid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _resolve_redirects(url: str) -> str:
+    try:
+        return str(http_client.head(url, timeout=5).url) or url
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        logger.warning(f"리다이렉트 확인 실패, 원본 URL을 사용합니다: {e}")
+        return url
+
+
+async def _async_resolve_redirects(url: str) -> str:
+    try:
+        return str((await http_client.async_head(url, timeout=5)).url) or url
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        logger.warning(f"리다이렉트 확인 실패, 원본 URL을 사용합니다: {e}")
+        return url
+
+
+def _validate_url(url: str) -> str:
+    url = url.strip()
+    try:
+        httpx.URL(url)
+    except httpx.InvalidURL as e:
+        raise ValueError(f"잘못된 URL입니다: {url} ({e})") from e
+    return url
+
+
+def _normalize_url(url: str) -> str:
+    if video_id := extract_video_id(url):
+        return f"https://www.youtube.com/watch?v={video_id}"
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == "http" and netloc.endswith(":80")) or (scheme == "https" and netloc.endswith(":443")):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking_param(k)]
+    query.sort()
+
+    return urlunsplit((scheme, netloc, parts.path or "/", urlencode(query), ""))
+
+
+def canonicalize_url(url: str, follow_redirects: bool = RESULT_CACHE_FOLLOW_REDIRECTS) -> str:
+    """
+    같은 콘텐츠를 가리키는 URL이 같은 캐시 키를 갖도록 정규화합니다.
+    - 유튜브: 영상 ID 기준의 watch URL (단축 URL이 유튜브로 이어지는 경우 포함)
+    - 그 외: 리다이렉트 추적, 추적용 파라미터/프래그먼트 제거, 호스트 소문자화, 쿼리 정렬
+    URL 형식이 잘못되었으면 ValueError를 발생시킵니다.
+    """
+    url = _validate_url(url)
+    if follow_redirects and not extract_video_id(url):
+        url = _resolve_redirects(url)
+    return _normalize_url(url)
+
+
+async def async_canonicalize_url(url: str, follow_redirects: bool = RESULT_CACHE_FOLLOW_REDIRECTS) -> str:
+    """canonicalize_url의 비동기 버전 (FastAPI 엔드포인트용). 리다이렉트 확인은 비동기 HTTP 클라이언트로 await합니다."""
+    url = _validate_url(url)
+    if follow_redirects and not extract_video_id(url):
+        url = await _async_resolve_redirects(url)
+    return _normalize_url(url)
+
+
+def _key(prefix: str, canonical_url: str) -> str:
+    digest = hashlib.sha256(canonical_url.encode("utf-8")).hexdigest()
+    return f"url-cache:{prefix}:{digest}"
+
+
+def get_cached_result(canonical_url: str) -> dict | None:
+    if RESULT_CACHE_TTL <= 0:
+        return None
+    try:
+        cached = get_redis().get(_key("result", canonical_url))
+        return json.loads(cached) if cached else None
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 조회 실패: {e}")
+        return None
+
+
+def get_cached_results(canonical_urls: list[str]) -> list[dict | None]:
+    """여러 URL의 캐시된 결과를 한 번에(MGET) 조회합니다."""
+    if RESULT_CACHE_TTL <= 0 or not canonical_urls:
+        return [None] * len(canonical_urls)
+    try:
+        values = get_redis().mget([_key("result", canonical_url) for canonical_url in canonical_urls])
+        return [json.loads(value) if value else None for value in values]
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 조회 실패: {e}")
+        return [None] * len(canonical_urls)
+
+
+def set_cached_result(canonical_url: str, result: dict, ttl: int = RESULT_CACHE_TTL):
+    if ttl <= 0:
+        return
+    try:
+        get_redis().set(_key("result", canonical_url), json.dumps(result, ensure_ascii=False), ex=ttl)
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 저장 실패: {e}")
+
+
+def claim_inflight(canonical_url: str, task_id: str) -> str | None:
+    """
+    이 URL의 작업을 task_id로 등록합니다 (single-flight).
+    이미 진행 중인 작업이 있으면 그 작업 ID를, 등록에 성공하면 None을 반환합니다.
+    """
+    try:
+        r = get_redis()
+        key = _key("inflight", canonical_url)
+        if r.set(key, task_id, nx=True, ex=RESULT_CACHE_INFLIGHT_TTL):
+            return None
+        existing = r.get(key)
+        return existing.decode() if isinstance(existing, bytes) else existing
+    except redis.RedisError as e:
+        logger.warning(f"진행 중 작업 등록 실패: {e}")
+        return None
+
+
+# 진행 중 표시가 task_id의 것일 때만 삭제 (다른 작업이 다시 등록한 표시는 지우지 않음)
+_RELEASE_IF_OWNER = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def release_inflight(canonical_url: str, task_id: str | None = None):
+    """진행 중 표시를 해제합니다. task_id가 주어지면 그 작업이 등록한 표시일 때만 해제합니다."""
+    try:
+        r = get_redis()
+        key = _key("inflight", canonical_url)
+        if task_id is None:
+            r.delete(key)
+        else:
+            r.eval(_RELEASE_IF_OWNER, 1, key, task_id)
+    except redis.RedisError as e:
+        logger.warning(f"진행 중 작업 해제 실패: {e}")
+
+
+def invalidate(url: str) -> bool:
+    """URL에 해당하는 캐시 결과를 삭제합니다. 삭제된 항목이 있으면 True를 반환합니다."""
+    canonical_url = canonicalize_url(url)
+    try:
+        return bool(get_redis().delete(_key("result", canonical_url)))
+    except redis.RedisError as e:
+        logger.warning(f"결과 캐시 삭제 실패: {e}")
+        return False
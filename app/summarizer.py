@@ -1,83 +1,190 @@
 import os
-import requests
 from app.celery_config import celery_app
 from app.extractor import extract_text_from_url
 from app.text_filter import clean_text
 from app.langchain_pipe import run_langchain_pipeline
 from app.thumbnail_handler import generate_thumbnail_and_upload_to_s3
-from app.video_handler import get_combined_transcript
-from app.image_handler import process_image_tip
+from app.video_handler import build_combined_transcript
+from app.image_handler import process_image_tip, extract_text_from_images
+from app.fetcher import fetch_page
+from app.result_cache import set_cached_result, release_inflight
+from app.http_client import get_content_type
+from app.task_routing import is_youtube_url
+from app.browser_pool import release_thread_browser
+from app.batch_index import prepare_batch, record_batch_result
+import base64
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@celery_app.task
-def process_url_task(url):
+# 썸네일 생성/업로드를 본문 요약과 병렬로 실행하는 스레드.
+# 브라우저 풀은 스레드마다 브라우저를 띄우므로, 작업마다 새 스레드를 만들지 않고 프로세스당 한 스레드를 계속 사용합니다.
+thumbnail_executor = None
+thumbnail_executor_pid = None
+
+def get_thumbnail_executor() -> ThreadPoolExecutor:
+    global thumbnail_executor, thumbnail_executor_pid
+    if thumbnail_executor is None or thumbnail_executor_pid != os.getpid():
+        thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail")
+        thumbnail_executor_pid = os.getpid()
+    return thumbnail_executor
+
+def shutdown_thumbnail_executor():
+    """워커 프로세스 종료 시 썸네일 스레드의 브라우저를 그 스레드에서 닫고 스레드를 정리합니다."""
+    global thumbnail_executor
+    if thumbnail_executor is None or thumbnail_executor_pid != os.getpid():
+        return
+    try:
+        thumbnail_executor.submit(release_thread_browser).result(timeout=30)
+    except Exception as e:
+        logger.warning(f"썸네일 스레드의 브라우저 종료 중 오류 발생: {e}")
+    thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+    thumbnail_executor = None
+
+def _summarize_content(url, artifact, is_youtube):
+    """
+    콘텐츠 타입(웹, 유튜브, 이미지)을 감지하고 본문 추출 → 요약/태그 생성을 실행합니다.
+    썸네일과는 데이터 의존성이 없으므로 썸네일 작업과 병렬로 실행됩니다.
+    """
+    if artifact is not None:
+        content_type = artifact.content_type
+    elif is_youtube:
+        content_type = ""
+    else:
+        # 썸네일 단계와 같은 HEAD 응답을 공유
+        content_type = get_content_type(url)
+
+    # 이미지 처리
+    if "image" in content_type:
+        logger.info(f"콘텐츠 타입 '이미지' 감지: {url}")
+        # 이미 받아둔 이미지 바이트가 있으면 OCR에 그대로 전달
+        image_source = artifact.body if artifact is not None and artifact.body else url
+        image_result = process_image_tip(image_source)
+        return {
+            "type": "이미지",
+            "title": image_result['summary_and_tags'].get('title', '이미지 분석 결과'),
+            "summary": image_result['summary_and_tags'].get('summary'),
+            "tags": image_result['summary_and_tags'].get('tags', [])
+        }
+
+    # 유튜브 처리
+    if is_youtube:
+        logger.info(f"콘텐츠 타입 '유튜브' 감지: {url}")
+        transcript = build_combined_transcript(url)
+        cleaned_text = clean_text(transcript["text"])
+        yt_result = run_langchain_pipeline(cleaned_text)
+        return {
+            "type": "유튜브",
+            "title": yt_result.get('title'),
+            "summary": yt_result.get('summary'),
+            "tags": yt_result.get('tags', []),
+            # 자막만 사용했는지, 음성 인식을 얼마나 했는지 (subtitles | partial_asr | full_asr)
+            "transcript_path": transcript["transcript_path"],
+            "subtitle_coverage": transcript["subtitle_coverage"]
+        }
+
+    # 웹페이지 처리 (기본값)
+    logger.info(f"콘텐츠 타입 '웹페이지' 감지: {url}")
+    # extract_text_from_url은 (content_type, text_content) 튜플을 반환
+    extracted_content_type, text_content = extract_text_from_url(url, artifact)
+    if not text_content:
+        raise ValueError("웹페이지에서 텍스트를 추출할 수 없습니다.")
+
+    cleaned_text = clean_text(text_content)
+    web_result = run_langchain_pipeline(cleaned_text)
+    return {
+        "type": extracted_content_type, # extractor가 반환한 타입 사용
+        "title": web_result.get('title'),
+        "summary": web_result.get('summary'),
+        "tags": web_result.get('tags', [])
+    }
+
+
+def _process_url(url, canonical_url=None, task_id=None, batch_id=None):
     """
     URL의 콘텐츠 타입(웹, 유튜브, 이미지)을 감지하고,
-    각각에 맞는 요약, 태그, 썸네일 생성을 실행한 후 결과만 반환하는 Celery 작업입니다.
+    각각에 맞는 요약, 태그, 썸네일 생성을 실행한 후 결과만 반환합니다.
     (폴링 방식이므로 콜백 로직은 없습니다.)
+    썸네일/S3 업로드와 본문 추출→요약은 병렬로 실행되어, 전체 시간은 더 오래 걸리는 쪽에 맞춰집니다.
+    canonical_url이 주어지면 성공한 결과를 결과 캐시에 저장하고, 진행 중 표시를 해제합니다.
+    진행 중 표시는 task_id(이 작업)가 등록한 것일 때만 해제하므로, 늦게 끝난 작업이 새 요청의 표시를 지우지 않습니다.
+    batch_id가 주어지면 (POST /batch-index/로 보낸 작업) 끝난 상태를 배치 정보에 기록합니다.
     """
     try:
-        # 1. 썸네일 생성 및 S3 업로드 (가장 먼저 시도)
-        s3_thumbnail_url = generate_thumbnail_and_upload_to_s3(url)
+        is_youtube = is_youtube_url(url)
+
+        # 0. 페이지를 한 번만 불러와 썸네일과 본문 추출이 함께 사용 (유튜브는 렌더링 불필요)
+        artifact = None if is_youtube else fetch_page(url)
+
+        # 1. 썸네일 생성 및 S3 업로드는 별도 스레드에서 실행
+        thumbnail_future = get_thumbnail_executor().submit(generate_thumbnail_and_upload_to_s3, url, artifact)
+
+        # 2. 그동안 콘텐츠 타입 감지 및 본문 요약을 처리
+        try:
+            result_data = _summarize_content(url, artifact, is_youtube)
+        finally:
+            # 요약이 실패해도 썸네일 작업이 끝난 뒤에 반환 (다음 작업과 겹치지 않도록)
+            s3_thumbnail_url = thumbnail_future.result()
+
         if not s3_thumbnail_url:
             logger.warning(f"URL '{url}'에 대한 썸네일 생성/업로드에 실패했습니다.")
 
-        # 2. 콘텐츠 타입 감지 및 처리
-        headers = requests.head(url, timeout=10, allow_redirects=True).headers
-        content_type = headers.get("Content-Type", "").lower()
-        
-        result_data = {}
-
-        # 이미지 처리
-        if "image" in content_type:
-            logger.info(f"콘텐츠 타입 '이미지' 감지: {url}")
-            image_result = process_image_tip(url)
-            result_data = {
-                "type": "이미지",
-                "title": image_result['summary_and_tags'].get('title', '이미지 분석 결과'),
-                "summary": image_result['summary_and_tags'].get('summary'),
-                "tags": image_result['summary_and_tags'].get('tags', [])
-            }
-        # 유튜브 처리
-        elif "youtube.com" in url or "youtu.be" in url:
-            logger.info(f"콘텐츠 타입 '유튜브' 감지: {url}")
-            full_text = get_combined_transcript(url)
-            cleaned_text = clean_text(full_text)
-            yt_result = run_langchain_pipeline(cleaned_text)
-            result_data = {
-                "type": "유튜브",
-                "title": yt_result.get('title'),
-                "summary": yt_result.get('summary'),
-                "tags": yt_result.get('tags', [])
-            }
-        # 웹페이지 처리 (기본값)
-        else:
-            logger.info(f"콘텐츠 타입 '웹페이지' 감지: {url}")
-            # extract_text_from_url은 (content_type, text_content) 튜플을 반환
-            extracted_content_type, text_content = extract_text_from_url(url)
-            if not text_content:
-                raise ValueError("웹페이지에서 텍스트를 추출할 수 없습니다.")
-            
-            cleaned_text = clean_text(text_content)
-            web_result = run_langchain_pipeline(cleaned_text)
-            result_data = {
-                "type": extracted_content_type, # extractor가 반환한 타입 사용
-                "title": web_result.get('title'),
-                "summary": web_result.get('summary'),
-                "tags": web_result.get('tags', [])
-            }
-
         # 3. 최종 결과에 썸네일 URL 추가
         result_data["thumbnail_url"] = s3_thumbnail_url
-        
+
+        if canonical_url:
+            set_cached_result(canonical_url, result_data)
+        if batch_id:
+            record_batch_result(batch_id, task_id, result=result_data)
+
         logger.info(f"URL '{url}' 처리가 성공적으로 완료되었습니다.")
         return result_data
 
     except Exception as e:
         logger.error(f"URL '{url}' 처리 중 오류 발생: {e}", exc_info=True)
+        if batch_id:
+            record_batch_result(batch_id, task_id, error=str(e))
         # Celery가 작업을 실패로 기록하도록 예외를 다시 발생시킴
-        raise
\ No newline at end of file
+        raise
+
+    finally:
+        if canonical_url:
+            release_inflight(canonical_url, task_id)
+
+
+# 큐별 작업. 처리 내용은 같고, 큐(task_routes)와 속도 제한(task_annotations)을 작업 이름으로 나눕니다.
+# 큐는 API 서버가 detect_queue로 미리 정하며, 워커는 실제 콘텐츠를 보고 처리 방식을 다시 정합니다.
+@celery_app.task(bind=True)
+def process_web_task(self, url, canonical_url=None, batch_id=None):
+    return _process_url(url, canonical_url, self.request.id, batch_id)
+
+
+@celery_app.task(bind=True)
+def process_image_task(self, url, canonical_url=None, batch_id=None):
+    return _process_url(url, canonical_url, self.request.id, batch_id)
+
+
+@celery_app.task(bind=True)
+def process_video_task(self, url, canonical_url=None, batch_id=None):
+    return _process_url(url, canonical_url, self.request.id, batch_id)
+
+
+@celery_app.task
+def prepare_batch_task(group_id):
+    """POST /batch-index/로 등록한 URL을 정규화하고 새로 처리할 작업을 group으로 보냅니다 (웹 큐)."""
+    return prepare_batch(group_id)
+
+
+@celery_app.task
+def ocr_images_task(images):
+    """POST /ocr/batch로 받은 이미지(base64 문자열 목록)를 OCR 워커에서 한 번에 OCR합니다."""
+    return extract_text_from_images([base64.b64decode(image) for image in images])
+
+
+@celery_app.task(bind=True)
+def process_url_task(self, url, canonical_url=None):
+    """큐를 나누기 전에 쌓인 메시지를 처리하기 위한 작업 (기본 큐)."""
+    return _process_url(url, canonical_url, self.request.id)
@@ -0,0 +1,110 @@
+# app/summary_cache.py
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import redis
+from dotenv import load_dotenv
+from app.redis_client import get_redis
+from app.embedding_cache import normalize_chunk
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+# 모델/프롬프트 버전별 최대 보관 결과 수
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+SUMMARY_CACHE_TTL = int(os.getenv("SUMMARY_CACHE_TTL", str(30 * 86400)))
+
+
+class SummaryCache:
+    """
+    summarize_and_tag 결과(제목/요약/태그)를 Redis에 저장하는 캐시.
+    키는 (모델, 프롬프트 버전, 정규화된 입력 텍스트의 해시)이므로 프롬프트를 바꾸고 버전을 올리면
+    이전 결과는 조회되지 않고 TTL이 지나면 사라집니다.
+    보관 개수는 최근 사용 시각 기준(LRU)으로 max_entries까지 유지합니다.
+    """
+
+    def __init__(self, max_entries: int = SUMMARY_CACHE_MAX_ENTRIES, ttl: int = SUMMARY_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _namespace(model: str, prompt_version: str) -> str:
+        return f"summary-cache:{model}:{prompt_version}"
+
+    def _key(self, text: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256(normalize_chunk(text).encode("utf-8")).hexdigest()
+        return f"{self._namespace(model, prompt_version)}:{digest}"
+
+    def get(self, text: str, model: str, prompt_version: str) -> dict | None:
+        key = self._key(text, model, prompt_version)
+        try:
+            r = get_redis()
+            found = r.get(key)
+            if found is not None:
+                r.zadd(f"{self._namespace(model, prompt_version)}:lru", {key: time.time()})
+        except redis.RedisError as e:
+            logger.warning(f"요약 캐시 조회 실패: {e}")
+            found = None
+
+        with self._lock:
+            if found is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        if found is None:
+            return None
+        logger.info(f"요약 캐시 적중 (누적 적중률 {self.metrics()['hit_rate']:.1%})")
+        return json.loads(found)
+
+    def set(self, text: str, model: str, prompt_version: str, result: dict):
+        key = self._key(text, model, prompt_version)
+        lru_key = f"{self._namespace(model, prompt_version)}:lru"
+        try:
+            r = get_redis()
+            pipe = r.pipeline(transaction=False)
+            pipe.set(key, json.dumps(result, ensure_ascii=False), ex=self.ttl)
+            pipe.zadd(lru_key, {key: time.time()})
+            pipe.zcard(lru_key)
+            size = pipe.execute()[-1]
+
+            # 최대 개수를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+            if size > self.max_entries:
+                evicted = r.zrange(lru_key, 0, size - self.max_entries - 1)
+                if evicted:
+                    r.delete(*evicted)
+                    r.zrem(lru_key, *evicted)
+        except redis.RedisError as e:
+            logger.warning(f"요약 캐시 저장 실패: {e}")
+
+    def metrics(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / total if total else 0.0,
+            }
+
+
+# 캐시 객체는 전역 변수로 두고, 처음 사용할 때 생성합니다 (지연 초기화).
+summary_cache = None
+
+
+def get_summary_cache() -> SummaryCache | None:
+    """요약 결과 캐시를 반환합니다. SUMMARY_CACHE_ENABLED가 false이면 None."""
+    global summary_cache
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    if summary_cache is None:
+        summary_cache = SummaryCache()
+    return summary_cache
@@ -0,0 +1,74 @@
+# app/task_routing.py
+import os
+import re
+import logging
+import httpx
+from dotenv import load_dotenv
+from app import http_client
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 콘텐츠 종류별 큐. 큐마다 워커 풀을 따로 띄워 동시성/프리페치를 CPU·메모리 특성에 맞춥니다.
+WEB_QUEUE = "web"    # 웹페이지 본문 추출 + 요약 (I/O 위주, 짧음)
+OCR_QUEUE = "ocr"    # 이미지 OCR (EasyOCR 모델, 메모리 위주)
+ASR_QUEUE = "asr"    # 유튜브 자막/음성 인식 (Whisper, CPU 위주, 김)
+
+# 큐별로 보내는 작업 이름. 속도 제한(rate_limit)은 작업 이름 단위이므로 큐마다 작업을 나눕니다.
+QUEUE_TASKS = {
+    WEB_QUEUE: "app.summarizer.process_web_task",
+    OCR_QUEUE: "app.summarizer.process_image_task",
+    ASR_QUEUE: "app.summarizer.process_video_task",
+}
+
+# POST /ocr/batch 요청의 이미지를 OCR 워커에서 처리하는 작업 (웹 프로세스는 EasyOCR/torch를 불러오지 않음)
+OCR_BATCH_TASK = "app.summarizer.ocr_images_task"
+# POST /batch-index/로 받은 URL을 정규화(HEAD)하고 작업을 보내는 준비 작업 (웹 요청은 배치 ID만 바로 반환)
+BATCH_PREPARE_TASK = "app.summarizer.prepare_batch_task"
+
+# 큐별 워커당 속도 제한 (Celery rate_limit 형식, 빈 값이면 제한 없음)
+QUEUE_RATE_LIMITS = {
+    WEB_QUEUE: os.getenv("WEB_TASK_RATE_LIMIT", "60/m"),
+    OCR_QUEUE: os.getenv("OCR_TASK_RATE_LIMIT", "30/m"),
+    ASR_QUEUE: os.getenv("ASR_TASK_RATE_LIMIT", "10/m"),
+}
+
+
+def is_youtube_url(url: str) -> bool:
+    return "youtube.com" in url or "youtu.be" in url
+
+
+def extract_video_id(url: str) -> str:
+    match = re.search(r"(?:v=|youtu\.be/|shorts/)([a-zA-Z0-9_-]{11})", url)
+    return match.group(1) if match else None
+
+
+def detect_queue(url: str) -> str:
+    """
+    작업을 큐에 넣기 전에 URL의 콘텐츠 종류를 판별해 보낼 큐를 정합니다.
+    유튜브는 URL만으로, 이미지는 HEAD 응답의 Content-Type으로 판별하며 (canonicalize_url과 HEAD 캐시 공유)
+    판별할 수 없으면 웹 큐로 보냅니다. 워커는 실제 콘텐츠를 보고 처리 방식을 다시 정하므로 결과는 같습니다.
+    """
+    if is_youtube_url(url):
+        return ASR_QUEUE
+    try:
+        if "image" in http_client.get_content_type(url, timeout=5):
+            return OCR_QUEUE
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        logger.warning(f"콘텐츠 타입 확인 실패, 웹 큐로 보냅니다: {url} ({e})")
+    return WEB_QUEUE
+
+
+async def async_detect_queue(url: str) -> str:
+    """detect_queue의 비동기 버전 (FastAPI 엔드포인트용). HEAD는 비동기 HTTP 클라이언트로 await합니다."""
+    if is_youtube_url(url):
+        return ASR_QUEUE
+    try:
+        if "image" in await http_client.async_get_content_type(url, timeout=5):
+            return OCR_QUEUE
+    except (httpx.HTTPError, httpx.InvalidURL) as e:
+        logger.warning(f"콘텐츠 타입 확인 실패, 웹 큐로 보냅니다: {url} ({e})")
+    return WEB_QUEUE
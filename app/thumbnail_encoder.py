@@ -0,0 +1,103 @@
+# app/thumbnail_encoder.py
+import io
+import os
+import logging
+from dataclasses import dataclass
+from PIL import Image, ImageOps, UnidentifiedImageError
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 생성할 썸네일 너비(px) 목록. 원본보다 큰 크기는 만들지 않습니다.
+THUMBNAIL_SIZES = [int(size) for size in os.getenv("THUMBNAIL_SIZES", "640,320").split(",") if size.strip()]
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "webp").lower()  # webp | jpeg
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp"),
+    "jpeg": ("JPEG", "jpg", "image/jpeg"),
+}
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "bmp": "image/bmp",
+    "tiff": "image/tiff",
+}
+
+
+@dataclass
+class EncodedThumbnail:
+    width: int
+    height: int
+    data: bytes
+    extension: str
+    content_type: str
+
+
+def sniff_image_extension(data: bytes, default: str = "png") -> str:
+    """이미지 바이트의 실제 포맷을 확장자로 반환합니다 (알 수 없으면 default)."""
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            fmt = (image.format or "").lower()
+    except (UnidentifiedImageError, OSError):
+        return default
+    return "jpg" if fmt == "jpeg" else (fmt or default)
+
+
+def encode_thumbnails(data: bytes, sizes: list[int] | None = None, fmt: str = THUMBNAIL_FORMAT,
+                      quality: int = THUMBNAIL_QUALITY) -> list[EncodedThumbnail]:
+    """
+    스크린샷/원본 이미지를 한 번만 디코딩해서 여러 너비의 썸네일로 줄이고 WebP 또는 JPEG로 인코딩합니다.
+    큰 크기부터 만들고, 작은 크기는 바로 앞 결과에서 줄여 리샘플링 비용을 줄입니다.
+    디코딩할 수 없는 데이터면 빈 리스트를 반환합니다.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 썸네일 포맷입니다: {fmt}")
+    pil_format, extension, content_type = FORMATS[fmt]
+    sizes = sorted(set(sizes or THUMBNAIL_SIZES), reverse=True)
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft("RGB", (sizes[0], sizes[0]))  # JPEG는 디코딩 단계에서부터 축소
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError) as e:
+        logger.warning(f"썸네일 디코딩 실패, 원본을 사용합니다: {e}")
+        return []
+
+    # JPEG는 투명도를 지원하지 않으므로 흰 배경에 합성
+    if pil_format == "JPEG" and image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+    if pil_format == "WEBP":
+        save_options = {"quality": quality, "method": 4}
+    else:
+        save_options = {"quality": quality, "optimize": True, "progressive": True}
+
+    results = []
+    for width in sizes:
+        if width < image.width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        elif results:
+            # 원본이 이 크기보다 작으면 앞에서 만든 것과 같은 이미지이므로 건너뜀
+            continue
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=pil_format, **save_options)
+        results.append(EncodedThumbnail(image.width, image.height, buffer.getvalue(), extension, content_type))
+
+    logger.info(f"썸네일 인코딩: 원본 {len(data)}바이트 → " + ", ".join(f"{t.width}px {len(t.data)}바이트" for t in results))
+    return results
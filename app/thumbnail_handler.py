@@ -1,17 +1,105 @@
 import os
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import boto3
-import requests
+import httpx
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
-from playwright.sync_api import sync_playwright
 import logging
+from app.browser_pool import get_browser_pool
+from app.fetcher import PageArtifact
+from app import http_client
+from app.thumbnail_encoder import encode_thumbnails, sniff_image_extension, CONTENT_TYPES
+from app.thumbnail_index import content_hash, perceptual_hash, find_existing, remember, THUMBNAIL_PHASH_DISTANCE
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def upload_to_s3(data, file_extension):
-    """S3에 썸네일 데이터를 업로드하고 URL을 반환합니다."""
+# S3 클라이언트 커넥션 풀 크기와 재시도 설정
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "20"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "5"))
+# true이면 업로드를 백그라운드 큐에 넣고 최종 URL을 바로 반환합니다.
+S3_ASYNC_UPLOAD = os.getenv("S3_ASYNC_UPLOAD", "false").lower() == "true"
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "4"))
+
+# S3 클라이언트와 업로드 스레드 풀은 전역 변수로 두고, 프로세스에서 처음 사용할 때 생성합니다 (지연 초기화).
+s3_client = None
+s3_client_pid = None
+upload_executor = None
+_s3_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    프로세스 단위로 재사용하는 S3 클라이언트를 반환합니다.
+    자격 증명/엔드포인트 확인은 처음 한 번만 하며, fork 이후에는 새로 만듭니다.
+    """
+    global s3_client, s3_client_pid
+    if s3_client is None or s3_client_pid != os.getpid():
+        with _s3_lock:
+            if s3_client is None or s3_client_pid != os.getpid():
+                s3_client = boto3.client(
+                    's3',
+                    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+                    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+                    region_name=os.getenv("AWS_REGION"),
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": "standard"},
+                        connect_timeout=5,
+                        read_timeout=30,
+                    ),
+                )
+                s3_client_pid = os.getpid()
+    return s3_client
+
+
+def get_upload_executor() -> ThreadPoolExecutor:
+    global upload_executor
+    with _s3_lock:
+        if upload_executor is None:
+            upload_executor = ThreadPoolExecutor(max_workers=S3_UPLOAD_CONCURRENCY, thread_name_prefix="s3-upload")
+    return upload_executor
+
+
+def flush_uploads():
+    """백그라운드 큐에 남은 업로드가 모두 끝날 때까지 기다립니다 (워커 종료 시 호출)."""
+    global upload_executor
+    with _s3_lock:
+        executor, upload_executor = upload_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def _put_object(bucket_name, file_name, data, content_type, aws_account_id):
+    get_s3_client().put_object(
+        Bucket=bucket_name,
+        Key=file_name,
+        Body=data,
+        ContentType=content_type,
+        # 버킷 소유자 계정을 확인하는 파라미터
+        ExpectedBucketOwner=aws_account_id
+    )
+
+
+def _after_background_upload(file_name, on_uploaded=None):
+    def callback(future):
+        if future.exception() is not None:
+            logger.error(f"S3 백그라운드 업로드 실패 ({file_name}): {future.exception()}")
+        elif on_uploaded is not None:
+            on_uploaded()
+    return callback
+
+
+def upload_to_s3(data, file_extension, key=None, content_type=None, background=None, on_uploaded=None):
+    """
+    S3에 썸네일 데이터를 업로드하고 URL을 반환합니다.
+    key를 주지 않으면 thumbnails/{uuid}.{확장자}로 저장하며, ContentType은 실제 포맷에 맞춰 설정합니다.
+    background가 True이면(기본값 S3_ASYNC_UPLOAD) 업로드를 큐에 넣고 최종 URL을 바로 반환합니다.
+    on_uploaded는 업로드가 실제로 성공했을 때만 호출됩니다 (백그라운드 업로드는 완료 후 업로드 스레드에서).
+    """
     try:
         # .env 파일에서 AWS 계정 ID를 가져옵니다.
         aws_account_id = os.getenv("AWS_ACCOUNT_ID")
@@ -19,24 +107,18 @@ def upload_to_s3(data, file_extension):
             logger.error("AWS_ACCOUNT_ID가 .env 파일에 설정되지 않았습니다.")
             return None
 
-        s3 = boto3.client(
-            's3',
-            aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-            aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
-            region_name=os.getenv("AWS_REGION")
-        )
         bucket_name = os.getenv("AWS_S3_BUCKET_NAME")
-        file_name = f"thumbnails/{uuid.uuid4()}.{file_extension}"
-
-        s3.put_object(
-            Bucket=bucket_name,
-            Key=file_name,
-            Body=data,
-            ContentType=f'image/{file_extension}',
-            # 버킷 소유자 계정을 확인하는 파라미터
-            ExpectedBucketOwner=aws_account_id
-        )
-        
+        file_name = key or f"thumbnails/{uuid.uuid4()}.{file_extension}"
+        content_type = content_type or CONTENT_TYPES.get(file_extension, f'image/{file_extension}')
+
+        if S3_ASYNC_UPLOAD if background is None else background:
+            future = get_upload_executor().submit(_put_object, bucket_name, file_name, data, content_type, aws_account_id)
+            future.add_done_callback(_after_background_upload(file_name, on_uploaded))
+        else:
+            _put_object(bucket_name, file_name, data, content_type, aws_account_id)
+            if on_uploaded is not None:
+                on_uploaded()
+
         return f"https://{bucket_name}.s3.ap-northeast-2.amazonaws.com/{file_name}"
 
     except NoCredentialsError:
@@ -46,8 +128,11 @@ def upload_to_s3(data, file_extension):
         logger.error(f"S3 업로드 중 오류 발생: {e}")
         return None
 
-def generate_thumbnail(url):
-    """URL 유형에 따라 썸네일(이미지 데이터 또는 URL)을 생성합니다."""
+def generate_thumbnail(url, artifact: PageArtifact | None = None):
+    """
+    URL 유형에 따라 썸네일(이미지 데이터 또는 URL)을 생성합니다.
+    fetch_page로 이미 불러온 artifact가 있으면 그 스크린샷/원본 이미지를 그대로 사용합니다.
+    """
     # 유튜브 URL 처리
     if "youtube.com/watch?v=" in url:
         video_id = url.split('v=')[1].split('&')[0]
@@ -56,42 +141,96 @@ def generate_thumbnail(url):
         video_id = url.split('/')[-1].split('?')[0]
         return f"https://img.youtube.com/vi/{video_id}/0.jpg", "redirect"
 
+    # 이미 렌더링된 결과가 있으면 다시 요청하지 않음
+    if artifact is not None:
+        if artifact.is_image and artifact.body:
+            return artifact.body, "image"
+        if artifact.screenshot:
+            return artifact.screenshot, "image"
+
     # 이미지 URL 처리
     try:
-        headers = requests.head(url, timeout=5, allow_redirects=True).headers
-        content_type = headers.get('Content-Type', '').lower()
+        # HEAD 응답은 같은 작업의 다른 단계와 공유 (http_client 캐시)
+        content_type = http_client.get_content_type(url)
         if 'image' in content_type:
-            response = requests.get(url, timeout=10)
+            response = http_client.get(url)
             response.raise_for_status()
             return response.content, "image"
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.warning(f"이미지 URL 처리 중 오류: {e}")
         # 이미지 URL이 아니면 웹페이지로 간주하고 계속 진행
     
     # 일반 웹페이지 처리 (Playwright 사용)
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page()
+        with get_browser_pool().page() as page:
             page.goto(url, wait_until='networkidle', timeout=15000)
             screenshot_bytes = page.screenshot()
-            browser.close()
             return screenshot_bytes, "image"
     except Exception as e:
         logger.error(f"웹페이지 스크린샷 생성 중 오류 발생: {e}")
         return None, None
 
-def generate_thumbnail_and_upload_to_s3(url):
+def _remember_when_uploaded(uploads: int, digest: str, phash: int | None):
+    """
+    업로드 uploads개가 모두 성공하고 URL이 정해진 뒤에만 썸네일 인덱스에 기록하는 콜백을 만듭니다.
+    업로드가 성공할 때마다 callback()을, 반환할 URL이 정해지면 callback(url)을 한 번 호출합니다.
+    백그라운드 업로드가 하나라도 실패하면 없는 객체를 가리키는 인덱스가 남지 않도록 기록하지 않습니다.
+    """
+    lock = threading.Lock()
+    state = {"remaining": uploads + 1, "url": None}
+
+    def callback(url=None):
+        with lock:
+            if url:
+                state["url"] = url
+            state["remaining"] -= 1
+            ready = state["remaining"] == 0
+        if ready:
+            remember(digest, state["url"], phash)
+    return callback
+
+def upload_thumbnail_variants(data: bytes):
+    """
+    썸네일을 THUMBNAIL_SIZES의 너비별로 인코딩해 thumbnails/{id}/{너비}.{확장자}로 업로드하고,
+    가장 큰 크기의 URL을 반환합니다. 작은 크기는 같은 경로에서 너비만 바꿔 접근할 수 있습니다.
+    id는 원본 내용의 해시이므로, 같은 이미지를 이미 올렸다면 업로드 없이 기존 URL을 반환합니다.
+    인코딩할 수 없는 이미지는 원본 포맷 그대로 업로드합니다.
+    """
+    digest = content_hash(data)
+    phash = perceptual_hash(data) if THUMBNAIL_PHASH_DISTANCE > 0 else None
+    if existing_url := find_existing(digest, phash):
+        return existing_url
+
+    thumbnail_id = digest[:32]
+    variants = encode_thumbnails(data)
+    on_uploaded = _remember_when_uploaded(max(len(variants), 1), digest, phash)
+    if not variants:
+        extension = sniff_image_extension(data)
+        url = upload_to_s3(data, extension, key=f"thumbnails/{thumbnail_id}.{extension}", on_uploaded=on_uploaded)
+    else:
+        urls = [
+            upload_to_s3(variant.data, variant.extension,
+                         key=f"thumbnails/{thumbnail_id}/{variant.width}.{variant.extension}",
+                         content_type=variant.content_type, on_uploaded=on_uploaded)
+            for variant in variants
+        ]
+        url = urls[0] if all(urls) else None
+
+    if url:
+        on_uploaded(url)
+    return url
+
+def generate_thumbnail_and_upload_to_s3(url, artifact: PageArtifact | None = None):
     """썸네일을 생성하고, 필요한 경우 S3에 업로드하여 최종 URL을 반환합니다."""
     try:
-        thumbnail_data, thumb_type = generate_thumbnail(url)
+        thumbnail_data, thumb_type = generate_thumbnail(url, artifact)
 
         if not thumbnail_data:
             return None
 
         if thumb_type == "image":
-            # 생성된 이미지 데이터를 S3에 업로드하고 URL을 받음
-            return upload_to_s3(thumbnail_data, "png")
+            # 생성된 이미지 데이터를 줄이고 압축한 뒤 S3에 업로드하고 URL을 받음
+            return upload_thumbnail_variants(thumbnail_data)
         elif thumb_type == "redirect":
             # 유튜브 썸네일처럼 이미 URL인 경우 그대로 반환
             return thumbnail_data
@@ -0,0 +1,95 @@
+# app/thumbnail_index.py
+import io
+import os
+import hashlib
+import logging
+import redis
+from PIL import Image, UnidentifiedImageError
+from dotenv import load_dotenv
+from app.redis_client import get_redis
+from app.image_hash import dhash, hamming, hash_bands
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DEDUP_ENABLED = os.getenv("THUMBNAIL_DEDUP_ENABLED", "true").lower() == "true"
+# 0보다 크면 지각 해시(dHash)의 해밍 거리가 이 값 이하인 스크린샷도 같은 썸네일로 봅니다 (최대 3).
+THUMBNAIL_PHASH_DISTANCE = min(int(os.getenv("THUMBNAIL_PHASH_DISTANCE", "0")), 3)
+# 인덱스 유지 시간(초). S3 수명 주기 정책으로 썸네일을 지운다면 그보다 짧게 설정합니다. 0이면 만료 없음.
+THUMBNAIL_INDEX_TTL = int(os.getenv("THUMBNAIL_INDEX_TTL", "0"))
+
+BANDS = 4
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def perceptual_hash(data: bytes) -> int | None:
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return dhash(image)
+    except (UnidentifiedImageError, OSError):
+        return None
+
+
+def _band_key(index: int, value: int) -> str:
+    return f"thumb-index:band:{index}:{value:04x}"
+
+
+def find_existing(digest: str, phash: int | None = None) -> str | None:
+    """같은 내용(또는 거의 같은 스크린샷)으로 이미 업로드한 썸네일 URL을 찾습니다."""
+    if not THUMBNAIL_DEDUP_ENABLED:
+        return None
+    try:
+        r = get_redis()
+        url = r.get(f"thumb-index:sha:{digest}")
+        if url is None and phash is not None and THUMBNAIL_PHASH_DISTANCE > 0:
+            url = _find_similar(r, phash)
+    except redis.RedisError as e:
+        logger.warning(f"썸네일 인덱스 조회 실패: {e}")
+        return None
+
+    if url is None:
+        return None
+    url = url.decode() if isinstance(url, bytes) else url
+    logger.info(f"이미 업로드된 썸네일을 재사용합니다: {url}")
+    return url
+
+
+def _find_similar(r, phash: int) -> str | None:
+    pipe = r.pipeline(transaction=False)
+    for i, band in enumerate(hash_bands(phash, BANDS)):
+        pipe.smembers(_band_key(i, band))
+    candidates = set().union(*pipe.execute())
+
+    # 가까운 후보부터 확인 (만료된 항목은 URL이 없으므로 건너뜀)
+    similar = sorted((hamming(phash, int(candidate)), int(candidate)) for candidate in candidates)
+    for distance, candidate in similar:
+        if distance > THUMBNAIL_PHASH_DISTANCE:
+            break
+        if (url := r.get(f"thumb-index:phash:{candidate:016x}")) is not None:
+            return url
+    return None
+
+
+def remember(digest: str, url: str, phash: int | None = None):
+    """업로드한 썸네일 URL을 내용 해시(와 지각 해시)로 기록합니다."""
+    if not THUMBNAIL_DEDUP_ENABLED or not url:
+        return
+    ttl = THUMBNAIL_INDEX_TTL or None
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.set(f"thumb-index:sha:{digest}", url, ex=ttl)
+        if phash is not None and THUMBNAIL_PHASH_DISTANCE > 0:
+            pipe.set(f"thumb-index:phash:{phash:016x}", url, ex=ttl)
+            for i, band in enumerate(hash_bands(phash, BANDS)):
+                pipe.sadd(_band_key(i, band), phash)
+                if ttl:
+                    pipe.expire(_band_key(i, band), ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"썸네일 인덱스 저장 실패: {e}")
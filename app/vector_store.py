@@ -0,0 +1,131 @@
+# app/vector_store.py
+import os
+import threading
+import logging
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from langchain_community.vectorstores import PGVector
+from langchain_community.embeddings import OpenAIEmbeddings
+from app.embedding_cache import CachedEmbeddings, EMBEDDING_CACHE_ENABLED
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = "tip_data"
+# 임베딩 요청 한 번에 보낼 청크 수. OpenAI는 요청당 2048개 입력 / 약 30만 토큰까지 받으므로
+# 500자 청크 기준으로 한도 안에 들어오는 512를 기본값으로 사용합니다.
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "512"))
+PGVECTOR_POOL_SIZE = int(os.getenv("PGVECTOR_POOL_SIZE", "5"))
+# 0보다 크면 이 시간(ms) 동안 여러 작업의 청크를 모아 한 번에 임베딩/저장합니다.
+# 같은 프로세스 안에서 동시에 실행되는 작업끼리만 묶이므로 threads/gevent 풀(-P threads, -P gevent)에서만 효과가 있습니다.
+# 기본 prefork 풀은 자식 프로세스마다 작업을 하나씩 실행하므로 묶을 작업이 없고 지연만 늘어납니다.
+VECTOR_MICRO_BATCH_MS = int(os.getenv("VECTOR_MICRO_BATCH_MS", "0"))
+
+
+def get_connection_string() -> str | None:
+    return os.getenv("PGVECTOR_CONNECTION_STRING") or os.getenv("DB_URL")
+
+
+class VectorStoreWriter:
+    """
+    워커 프로세스 동안 유지되는 PGVector 저장기.
+    엔진(커넥션 풀)과 컬렉션 확인은 생성 시 한 번만 수행하고,
+    청크는 임베딩 요청을 묶어서 보낸 뒤 한 번의 bulk insert로 저장합니다.
+    """
+
+    def __init__(self, connection_string: str, collection_name: str = COLLECTION_NAME,
+                 batch_size: int = EMBEDDING_BATCH_SIZE, micro_batch_ms: int = VECTOR_MICRO_BATCH_MS,
+                 pool_size: int = PGVECTOR_POOL_SIZE, use_cache: bool = EMBEDDING_CACHE_ENABLED):
+        self.batch_size = batch_size
+        self.micro_batch_ms = micro_batch_ms
+        self.pid = os.getpid()
+
+        embeddings = OpenAIEmbeddings(openai_api_key=os.getenv("OPENAI_API_KEY"), chunk_size=batch_size)
+        # 이미 임베딩한 청크는 캐시에서 꺼내 쓰고, 캐시에 없는 청크만 API로 요청
+        self.embeddings = CachedEmbeddings(embeddings) if use_cache else embeddings
+        self.store = PGVector(
+            connection_string=connection_string,
+            embedding_function=self.embeddings,
+            collection_name=collection_name,
+            engine_args={"pool_size": pool_size, "pool_pre_ping": True, "pool_recycle": 1800},
+        )
+
+        # 마이크로 배치 상태
+        self._pending = []
+        self._cond = threading.Condition()
+        self._flusher = None
+
+    def _write(self, texts: list[str], metadatas: list[dict]) -> list[str]:
+        vectors = self.embeddings.embed_documents(texts)
+        return self.store.add_embeddings(texts=texts, embeddings=vectors, metadatas=metadatas)
+
+    def add_documents(self, docs) -> list[str]:
+        """문서 청크를 임베딩하여 저장하고 생성된 ID 목록을 반환합니다."""
+        if not docs:
+            return []
+        texts = [doc.page_content for doc in docs]
+        metadatas = [doc.metadata for doc in docs]
+
+        if self.micro_batch_ms <= 0:
+            return self._write(texts, metadatas)
+
+        future = Future()
+        with self._cond:
+            self._pending.append((texts, metadatas, future))
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flusher.start()
+            self._cond.notify()
+        return future.result()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # 첫 요청이 들어온 뒤 일정 시간 동안, 또는 배치가 찰 때까지 다른 작업의 청크를 기다림
+                self._cond.wait_for(
+                    lambda: sum(len(texts) for texts, _, _ in self._pending) >= self.batch_size,
+                    timeout=self.micro_batch_ms / 1000,
+                )
+                batch, self._pending = self._pending, []
+
+            self._flush(batch)
+
+    def _flush(self, batch):
+        texts = [text for item_texts, _, _ in batch for text in item_texts]
+        metadatas = [metadata for _, item_metadatas, _ in batch for metadata in item_metadatas]
+        try:
+            ids = self._write(texts, metadatas)
+        except Exception as e:
+            logger.error(f"벡터 저장 배치 처리 중 오류 발생: {e}")
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        logger.info(f"{len(batch)}개 작업의 청크 {len(texts)}개를 한 번에 저장했습니다.")
+        offset = 0
+        for item_texts, _, future in batch:
+            future.set_result(ids[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+
+# 저장기 객체는 전역 변수로 두고, 프로세스에서 처음 사용할 때 생성합니다 (지연 초기화).
+writer = None
+_writer_lock = threading.Lock()
+
+
+def get_vector_store_writer() -> VectorStoreWriter:
+    """
+    프로세스 단위 VectorStoreWriter를 반환합니다.
+    fork 이후에는 부모의 DB 커넥션을 공유하지 않도록 새로 만듭니다.
+    """
+    global writer
+    if writer is None or writer.pid != os.getpid():
+        with _writer_lock:
+            if writer is None or writer.pid != os.getpid():
+                writer = VectorStoreWriter(get_connection_string())
+    return writer
@@ -1,10 +1,47 @@
 # app/video_handler.py
 import re
 import os
-import whisper
-from rapidfuzz import fuzz
+import subprocess
+import tempfile
+import numpy as np
+from rapidfuzz import fuzz, process
 import yt_dlp
+import logging
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
+from dotenv import load_dotenv
+from app.task_routing import extract_video_id
+
+load_dotenv()
+
+# 음성 인식 백엔드 설정 (whisper | faster-whisper)
+WHISPER_BACKEND = os.getenv("WHISPER_BACKEND", "whisper")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+# whisper: default | int8 (동적 양자화), faster-whisper: int8 | int8_float32 | float32 ...
+WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE")
+
+# 자막 커버리지 기반 처리 설정
+# coverage: 자막이 영상 길이를 충분히 덮으면 음성 인식을 건너뛰고, 아니면 자막이 없는 구간만 인식
+# always: 항상 전체 오디오를 음성 인식 (이전 동작)
+TRANSCRIPT_MODE = os.getenv("TRANSCRIPT_MODE", "coverage")
+SUBTITLE_COVERAGE_THRESHOLD = float(os.getenv("SUBTITLE_COVERAGE_THRESHOLD", "0.9"))
+SUBTITLE_GAP_MIN_SECONDS = float(os.getenv("SUBTITLE_GAP_MIN_SECONDS", "3"))
+
+# 자막-Whisper 중복 제거 설정 (cdist 스레드 수, -1이면 모든 코어 / 한 번에 비교할 줄 수)
+OVERLAP_WORKERS = int(os.getenv("OVERLAP_WORKERS", "-1"))
+OVERLAP_CHUNK_SIZE = 1024
+
+# 유튜브 오디오 확보 방식
+# native: 작업별 임시 폴더에 원본 오디오(저비트레이트)를 받아 변환 없이 사용
+# mp3: 작업별 임시 폴더에 받은 뒤 ffmpeg로 mp3 변환 (이전 동작)
+# stream: 디스크에 쓰지 않고 ffmpeg가 원격 오디오를 바로 16kHz PCM으로 디코딩하여 메모리로 전달
+AUDIO_FETCH_MODE = os.getenv("AUDIO_FETCH_MODE", "native")
+
+# Whisper 입력 샘플링 레이트
+SAMPLE_RATE = 16000
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 def normalize_youtube_url(url: str) -> str:
     match = re.search(r"(?:v=|youtu\.be/|shorts/)([a-zA-Z0-9_-]{11})", url)
@@ -13,59 +50,280 @@ def normalize_youtube_url(url: str) -> str:
     video_id = match.group(1)
     return f"https://www.youtube.com/watch?v={video_id}"
 
-def extract_video_id(url: str) -> str:
-    match = re.search(r"(?:v=|youtu\.be/|shorts/)([a-zA-Z0-9_-]{11})", url)
-    return match.group(1) if match else None
-
-def get_youtube_subtitles(video_id: str) -> list[str]:
+def get_youtube_subtitle_entries(video_id: str) -> list[dict]:
+    """자막을 시작 시각/길이(초)와 함께 반환합니다."""
     try:
         transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=["ko", "en"])
-        return [entry["text"] for entry in transcript if entry["text"].strip()]
     except NoTranscriptFound:
         return []
+    return [
+        {"text": entry["text"], "start": entry.get("start", 0.0), "duration": entry.get("duration", 0.0)}
+        for entry in transcript if entry["text"].strip()
+    ]
+
+def get_youtube_subtitles(video_id: str) -> list[str]:
+    return [entry["text"] for entry in get_youtube_subtitle_entries(video_id)]
+
+def get_video_duration(url: str) -> float | None:
+    """오디오를 내려받지 않고 메타데이터만 조회하여 영상 길이(초)를 반환합니다."""
+    try:
+        with yt_dlp.YoutubeDL({'quiet': True, 'noplaylist': True, 'skip_download': True}) as ydl:
+            info = ydl.extract_info(url, download=False)
+        return info.get("duration")
+    except Exception as e:
+        logger.warning(f"영상 길이 조회 실패: {e}")
+        return None
+
+def _merge_subtitle_intervals(entries: list[dict], duration: float) -> list[tuple[float, float]]:
+    intervals = sorted(
+        (max(0.0, e["start"]), min(duration, e["start"] + e["duration"]))
+        for e in entries if e["duration"] > 0
+    )
+    merged = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        elif end > start:
+            merged.append((start, end))
+    return merged
+
+def subtitle_coverage(entries: list[dict], duration: float) -> float:
+    """영상 길이 대비 자막이 덮고 있는 시간의 비율 (0~1)."""
+    if not duration:
+        return 0.0
+    covered = sum(end - start for start, end in _merge_subtitle_intervals(entries, duration))
+    return min(1.0, covered / duration)
+
+def find_uncovered_ranges(entries: list[dict], duration: float,
+                          min_gap: float = SUBTITLE_GAP_MIN_SECONDS) -> list[tuple[float, float]]:
+    """자막이 없는 구간 중 min_gap초 이상인 구간만 (시작, 끝) 목록으로 반환합니다."""
+    gaps = []
+    cursor = 0.0
+    for start, end in _merge_subtitle_intervals(entries, duration):
+        if start - cursor >= min_gap:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if duration - cursor >= min_gap:
+        gaps.append((cursor, duration))
+    return gaps
 
-def download_youtube_audio(url: str, filename: str = "yt_audio") -> str:
+def download_youtube_audio(url: str, output_dir: str, transcode: bool = False) -> str:
+    """
+    output_dir(작업별 임시 폴더)에 오디오를 내려받고 파일 경로를 반환합니다.
+    음성 인식에는 음질이 중요하지 않으므로 기본적으로 저비트레이트 원본 컨테이너를 변환 없이 사용하고,
+    transcode=True일 때만 mp3로 변환합니다.
+    """
     url = normalize_youtube_url(url)
     ydl_opts = {
-        'format': 'bestaudio/best',
-        'outtmpl': filename,
+        'format': 'bestaudio/best' if transcode else 'worstaudio/bestaudio/best',
+        'outtmpl': os.path.join(output_dir, 'audio.%(ext)s'),
         'quiet': True,
         'noplaylist': True,
-        # 컨테이너에 ffmpeg 설치되어 있으므로 별도 경로 지정 불필요
-        'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}],
     }
+    if transcode:
+        # 컨테이너에 ffmpeg 설치되어 있으므로 별도 경로 지정 불필요
+        ydl_opts['postprocessors'] = [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}]
+
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    return filename + ".mp3"
+        info = ydl.extract_info(url, download=True)
+        if transcode:
+            return os.path.join(output_dir, "audio.mp3")
+        return ydl.prepare_filename(info)
+
+def stream_youtube_audio(url: str):
+    """
+    오디오를 파일로 저장하지 않고 ffmpeg로 바로 디코딩하여 16kHz mono float32 배열로 반환합니다.
+    (whisper.load_audio와 같은 형식이므로 음성 인식 백엔드에 그대로 전달할 수 있습니다.)
+    """
+    url = normalize_youtube_url(url)
+    with yt_dlp.YoutubeDL({'format': 'worstaudio/bestaudio/best', 'quiet': True, 'noplaylist': True}) as ydl:
+        info = ydl.extract_info(url, download=False)
+
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error"]
+    if headers := info.get("http_headers"):
+        cmd += ["-headers", "".join(f"{key}: {value}\r\n" for key, value in headers.items())]
+    cmd += ["-i", info["url"], "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"]
+
+    out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+def get_youtube_audio(url: str, output_dir: str, mode: str = AUDIO_FETCH_MODE):
+    """AUDIO_FETCH_MODE에 따라 오디오 파일 경로 또는 디코딩된 오디오 배열을 반환합니다."""
+    if mode == "stream":
+        return stream_youtube_audio(url)
+    return download_youtube_audio(url, output_dir, transcode=(mode == "mp3"))
+
+def _to_torch_linear(module):
+    """
+    whisper.model.Linear 같은 nn.Linear 하위 클래스를 가중치를 공유하는 nn.Linear로 바꿉니다.
+    동적 양자화는 정확히 nn.Linear 타입인 레이어만 변환하기 때문입니다.
+    """
+    import torch
+    for name, child in module.named_children():
+        if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            linear.weight, linear.bias = child.weight, child.bias
+            setattr(module, name, linear)
+        else:
+            _to_torch_linear(child)
+    return module
 
-def get_whisper_transcript(audio_path: str) -> list[str]:
-    model = whisper.load_model("base")
-    result = model.transcribe(audio_path)
-    lines = result["text"].replace('.', '').split(" ")
+
+class WhisperBackend:
+    """openai-whisper(PyTorch) 백엔드. compute_type='int8'이면 Linear 레이어를 동적 양자화합니다."""
+    name = "whisper"
+
+    def __init__(self, model_name: str, compute_type: str | None = None):
+        # whisper는 torch를 함께 불러오므로, 웹 프로세스(result_cache 등)가 이 모듈을 가져와도 로딩하지 않도록 여기서 import
+        import whisper
+        self.model = whisper.load_model(model_name)
+        if compute_type == "int8":
+            import torch
+            self.model = torch.quantization.quantize_dynamic(_to_torch_linear(self.model), {torch.nn.Linear}, dtype=torch.qint8)
+
+    def transcribe(self, audio) -> str:
+        return self.model.transcribe(audio)["text"]
+
+
+class FasterWhisperBackend:
+    """CTranslate2 기반 faster-whisper 백엔드 (선택 의존성, CPU에서 int8 추론)."""
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str, compute_type: str | None = None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError("WHISPER_BACKEND=faster-whisper를 사용하려면 faster-whisper 패키지를 설치하세요.") from e
+        self.model = WhisperModel(model_name, device="cpu", compute_type=compute_type or "int8")
+
+    def transcribe(self, audio) -> str:
+        segments, _ = self.model.transcribe(audio, beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments)
+
+
+TRANSCRIBE_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def load_transcriber(backend: str = WHISPER_BACKEND, model_name: str = WHISPER_MODEL,
+                     compute_type: str | None = WHISPER_COMPUTE_TYPE):
+    if backend not in TRANSCRIBE_BACKENDS:
+        raise ValueError(f"지원하지 않는 음성 인식 백엔드입니다: {backend}")
+    return TRANSCRIBE_BACKENDS[backend](model_name, compute_type)
+
+
+# 음성 인식 모델을 전역 변수로 선언하되, 초기화는 하지 않습니다.
+transcriber = None
+
+def get_transcriber():
+    """
+    음성 인식 모델을 워커 프로세스당 한 번만 로드하여 재사용하는 함수 (지연 초기화).
+    """
+    global transcriber
+    if transcriber is None:
+        print(f"Initializing {WHISPER_BACKEND} ({WHISPER_MODEL}) transcriber for the first time...")
+        transcriber = load_transcriber()
+        print("Transcriber initialized.")
+    return transcriber
+
+def _split_transcript_text(text: str) -> list[str]:
+    lines = text.replace('.', '').split(" ")
     return [line.strip() for line in lines if line.strip()]
 
+def get_whisper_transcript(audio_path) -> list[str]:
+    """audio_path에는 파일 경로 또는 16kHz로 디코딩된 오디오 배열을 전달할 수 있습니다."""
+    return _split_transcript_text(get_transcriber().transcribe(audio_path))
+
+def get_whisper_transcript_ranges(audio_path, ranges: list[tuple[float, float]]) -> list[str]:
+    """오디오를 한 번 디코딩한 뒤 지정한 구간만 잘라서 음성 인식합니다."""
+    if isinstance(audio_path, str):
+        import whisper
+        audio = whisper.load_audio(audio_path)
+    else:
+        audio = audio_path
+    lines = []
+    for start, end in ranges:
+        segment = audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)]
+        if segment.size == 0:
+            continue
+        lines.extend(_split_transcript_text(get_transcriber().transcribe(segment)))
+    return lines
+
 def is_similar(a: str, b: str, threshold: int = 85) -> bool:
     return fuzz.ratio(a, b) > threshold
 
-def remove_overlap(whisper_lines: list[str], subtitle_lines: list[str]) -> list[str]:
-    unique = []
-    for w_line in whisper_lines:
-        if not any(is_similar(w_line, s_line) for s_line in subtitle_lines):
-            unique.append(w_line)
-    return unique
+def remove_overlap(whisper_lines: list[str], subtitle_lines: list[str],
+                   threshold: int = 85, workers: int = OVERLAP_WORKERS) -> list[str]:
+    """
+    자막 중 하나와 유사한(is_similar) Whisper 줄을 제거합니다.
+    반복되는 단어/줄은 한 번만 비교하고, rapidfuzz.process.cdist로 여러 줄을 묶어 병렬 계산합니다.
+    score_cutoff 미만인 쌍은 rapidfuzz 내부에서 길이 차이만으로 먼저 걸러집니다.
+    """
+    if not subtitle_lines:
+        return list(whisper_lines)
+
+    queries = list(dict.fromkeys(whisper_lines))
+    choices = list(dict.fromkeys(subtitle_lines))
+
+    overlapped = set()
+    for i in range(0, len(queries), OVERLAP_CHUNK_SIZE):
+        chunk = queries[i:i + OVERLAP_CHUNK_SIZE]
+        scores = process.cdist(chunk, choices, scorer=fuzz.ratio, score_cutoff=threshold,
+                               dtype=np.float64, workers=workers)
+        overlapped.update(line for line, hit in zip(chunk, (scores > threshold).any(axis=1)) if hit)
+
+    return [line for line in whisper_lines if line not in overlapped]
 
 def get_combined_transcript(url: str) -> str:
+    return build_combined_transcript(url)["text"]
+
+def build_combined_transcript(url: str, mode: str = TRANSCRIPT_MODE) -> dict:
+    """
+    자막과 음성 인식 결과를 합친 텍스트와 함께, 어떤 경로로 처리했는지 반환합니다.
+    - subtitles: 자막만 사용 (오디오 다운로드/음성 인식 생략)
+    - partial_asr: 자막이 없는 구간만 음성 인식
+    - full_asr: 전체 오디오 음성 인식
+    """
     url = normalize_youtube_url(url)
     video_id = extract_video_id(url)
 
-    subtitles = get_youtube_subtitles(video_id)
-    audio_file = download_youtube_audio(url)
-    whisper_lines = get_whisper_transcript(audio_file)
+    entries = get_youtube_subtitle_entries(video_id)
+    subtitles = [entry["text"] for entry in entries]
 
-    whisper_unique = remove_overlap(whisper_lines, subtitles)
+    coverage = None
+    gaps = None
+    if mode == "coverage" and entries:
+        duration = get_video_duration(url)
+        if duration:
+            coverage = subtitle_coverage(entries, duration)
+            gaps = [] if coverage >= SUBTITLE_COVERAGE_THRESHOLD else find_uncovered_ranges(entries, duration)
+
+    if gaps == []:
+        logger.info(f"자막 커버리지 {coverage:.0%}: 음성 인식을 건너뜁니다. ({video_id})")
+        return {
+            "text": "\n".join(["[유튜브 자막 기반]"] + subtitles),
+            "transcript_path": "subtitles",
+            "subtitle_coverage": coverage,
+        }
 
-    if os.path.exists(audio_file):
-        os.remove(audio_file)
+    # 작업마다 별도의 임시 폴더를 사용하므로 같은 워커에서 여러 작업이 동시에 실행되어도 파일이 겹치지 않음
+    with tempfile.TemporaryDirectory(prefix="yt_audio_") as workdir:
+        audio = get_youtube_audio(url, workdir)
+        if gaps is not None:
+            logger.info(f"자막 커버리지 {coverage:.0%}: 자막이 없는 {len(gaps)}개 구간만 음성 인식합니다. ({video_id})")
+            whisper_lines = get_whisper_transcript_ranges(audio, gaps)
+            transcript_path = "partial_asr"
+        else:
+            whisper_lines = get_whisper_transcript(audio)
+            transcript_path = "full_asr"
+
+    whisper_unique = remove_overlap(whisper_lines, subtitles)
 
     combined = ["[유튜브 자막 기반]"] + subtitles + ["", "[Whisper에서 잡힌 추가 내용]"] + whisper_unique
-    return "\n".join(combined)
+    return {
+        "text": "\n".join(combined),
+        "transcript_path": transcript_path,
+        "subtitle_coverage": coverage,
+    }
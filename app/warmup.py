@@ -0,0 +1,69 @@
+# app/warmup.py
+import os
+import time
+import logging
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스 시작 시 미리 불러올 모델.
+# auto: 워커가 구독하는 큐 이름으로 결정 (QUEUE_WARMUP 참고), none: 사용하지 않음, 또는 "ocr,asr"처럼 직접 지정
+WORKER_WARMUP = os.getenv("WORKER_WARMUP", "auto").lower()
+
+# 큐 이름별로 미리 불러올 모델 (기본 큐 celery는 모든 작업을 처리하므로 둘 다 불러옴, web 큐는 모델을 쓰지 않음)
+QUEUE_WARMUP = {
+    "celery": ["ocr", "asr"],
+    "web": [],
+    "ocr": ["ocr"],
+    "asr": ["asr"],
+}
+
+
+def warm_up_ocr():
+    """EasyOCR 모델을 불러오고 작은 빈 이미지로 한 번 추론합니다."""
+    from app.image_handler import get_ocr_reader
+    reader = get_ocr_reader()
+    reader.readtext(np.full((64, 256, 3), 255, dtype=np.uint8), detail=0)
+
+
+def warm_up_asr():
+    """음성 인식 모델을 불러오고 1초 무음으로 한 번 추론합니다."""
+    from app.video_handler import get_transcriber, SAMPLE_RATE
+    get_transcriber().transcribe(np.zeros(SAMPLE_RATE, dtype=np.float32))
+
+
+WARMUP_TARGETS = {
+    "ocr": warm_up_ocr,
+    "asr": warm_up_asr,
+}
+
+
+def models_for_queues(queues, setting: str = WORKER_WARMUP) -> list[str]:
+    """WORKER_WARMUP 설정과 워커가 구독하는 큐 목록으로 미리 불러올 모델 목록을 정합니다."""
+    if setting in ("", "none"):
+        return []
+    if setting != "auto":
+        models = [model.strip() for model in setting.split(",") if model.strip()]
+    else:
+        models = [model for queue in queues or [] for model in QUEUE_WARMUP.get(queue, [])]
+
+    unknown = [model for model in models if model not in WARMUP_TARGETS]
+    if unknown:
+        raise ValueError(f"지원하지 않는 워밍업 대상입니다: {', '.join(unknown)}")
+    return list(dict.fromkeys(models))
+
+
+def warm_up(models: list[str]):
+    """모델을 차례로 불러옵니다. 실패해도 워커는 계속 뜨고, 첫 작업에서 다시 로딩을 시도합니다."""
+    for model in models:
+        start = time.perf_counter()
+        try:
+            WARMUP_TARGETS[model]()
+            logger.info(f"[워밍업] {model} 모델 준비 완료 ({time.perf_counter() - start:.1f}s, pid={os.getpid()})")
+        except Exception as e:
+            logger.error(f"[워밍업] {model} 모델 준비 실패: {e}")
@@ -0,0 +1,80 @@
+# benchmarks/bench_import_time.py
+"""
+웹 프로세스(app.main)의 import 시간과 메모리(최대 RSS)를 측정합니다.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --module app.summarizer --top 20
+
+새 파이썬 프로세스에서 `python -X importtime -c "import <module>"`을 실행하고,
+최상위 패키지별 import 시간과 워커 전용 모듈(torch, easyocr, whisper ...)의 로딩 여부를 출력합니다.
+"""
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+# 웹 프로세스에서 불러오면 안 되는 워커 전용 패키지/모듈 (app.* 모듈은 전체 이름으로 확인)
+HEAVY_MODULES = ("torch", "easyocr", "whisper", "langchain", "langchain_openai", "openai",
+                 "yt_dlp", "youtube_transcript_api", "rapidfuzz",
+                 "app.video_handler", "app.image_handler", "app.langchain_pipe", "app.summarizer")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 최대 RSS는 /proc의 VmHWM으로 읽습니다. ru_maxrss는 fork한 부모(예: pytest)의 exec 이전 메모리까지 포함할 수 있습니다.
+_REPORT_RSS = """
+import os, re, sys, resource
+import {module}
+if os.path.exists("/proc/self/status"):
+    rss_mb = int(re.search(r"VmHWM:\\s+(\\d+)", open("/proc/self/status").read()).group(1)) // 1024
+else:
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+print(rss_mb, ",".join(sorted(sys.modules)))
+"""
+
+
+def measure_import(module: str = "app.main") -> dict:
+    """
+    새 프로세스에서 module을 import하고 결과를 반환합니다.
+    {"total_seconds", "rss_mb", "packages": {최상위 패키지: 모듈 자체 import 시간 합(초)}, "modules": 로딩된 모듈 이름 집합}
+    """
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    env.setdefault("OPENAI_API_KEY", "sk-import-benchmark")
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", _REPORT_RSS.format(module=module)],
+                               cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True)
+
+    packages = defaultdict(float)
+    total = 0.0
+    for line in completed.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        # 패키지별 시간은 각 모듈 자체 시간(self)의 합
+        packages[name.strip().split(".")[0]] += int(own) / 1e6
+        # 하위 import는 두 칸씩 더 들여쓰여 있으므로, 한 칸만 들여쓴 줄의 누적 시간을 더하면 전체 시간
+        if not name.startswith("  "):
+            total += int(cumulative) / 1e6
+
+    rss_mb, loaded = completed.stdout.strip().splitlines()[-1].split(" ", 1)
+    return {"total_seconds": total, "rss_mb": int(rss_mb), "packages": dict(packages), "modules": set(loaded.split(","))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import 시간/메모리 벤치마크")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=10, help="import 시간이 긴 최상위 패키지 출력 수")
+    args = parser.parse_args()
+
+    result = measure_import(args.module)
+    print(f"module: {args.module}")
+    print(f"import time: {result['total_seconds']:6.2f}s")
+    print(f"max RSS:     {result['rss_mb']:6d} MB")
+    for name, seconds in sorted(result["packages"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<30} {seconds:6.3f}s")
+    heavy = [name for name in HEAVY_MODULES if name in result["modules"]]
+    print(f"heavy modules loaded: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
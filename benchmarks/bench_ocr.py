@@ -0,0 +1,88 @@
+# benchmarks/bench_ocr.py
+"""
+한 장씩 원본 해상도로 readtext를 호출하던 기존 방식과 배치 OCR(extract_text_from_images)의
+처리량(images/sec)을 비교합니다.
+
+    python -m benchmarks.bench_ocr
+    python -m benchmarks.bench_ocr --images screenshots/*.png --detect-batch 4 --max-side 1600
+
+--images를 지정하지 않으면 시드가 고정된 합성 휴대폰 스크린샷(1170x2532, 글자 줄 + 빈 영역)을 사용합니다.
+EasyOCR 모델(ko, en)이 필요하며, 처음 실행할 때 다운로드됩니다.
+"""
+import io
+import glob
+import random
+import argparse
+import time
+from PIL import Image, ImageDraw
+from app import image_handler
+
+WORDS = ["tip", "save", "money", "coffee", "morning", "daily", "note", "check", "list", "2024", "sale", "free"]
+
+
+def make_fixture(count: int = 8, size: tuple[int, int] = (1170, 2532), seed: int = 0) -> list[bytes]:
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        image = Image.new("RGB", size, (250, 250, 250))
+        draw = ImageDraw.Draw(image)
+        # 상단 상태바/하단 탭바처럼 글자 없는 단색 영역
+        draw.rectangle((0, 0, size[0], 120), fill=(30, 30, 30))
+        draw.rectangle((0, size[1] - 200, size[0], size[1]), fill=(235, 235, 235))
+        y = 200
+        while y < size[1] - 300:
+            line = " ".join(rng.choices(WORDS, k=rng.randint(2, 6)))
+            draw.text((60, y), line, fill=(20, 20, 20), font_size=48)
+            y += rng.randint(80, 160)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        images.append(buffer.getvalue())
+    return images
+
+
+def one_at_a_time(sources: list[bytes]) -> list[str]:
+    """변경 전 구현 (원본 해상도, 이미지마다 readtext 한 번)."""
+    reader = image_handler.get_ocr_reader()
+    return ["\n".join(reader.readtext(source, detail=0)) for source in sources]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 처리량 벤치마크")
+    parser.add_argument("--images", nargs="*", help="이미지 파일 경로 (glob 가능)")
+    parser.add_argument("--count", type=int, default=8, help="합성 이미지 수 (--images가 없을 때)")
+    parser.add_argument("--max-side", type=int, default=image_handler.OCR_MAX_SIDE)
+    parser.add_argument("--detect-batch", type=int, default=image_handler.OCR_DETECT_BATCH_SIZE)
+    parser.add_argument("--min-density", type=float, default=image_handler.OCR_MIN_TEXT_DENSITY)
+    args = parser.parse_args()
+
+    if args.images:
+        paths = [path for pattern in args.images for path in glob.glob(pattern)]
+        sources = [open(path, "rb").read() for path in paths]
+    else:
+        sources = make_fixture(args.count)
+    print(f"images: {len(sources)}")
+
+    image_handler.OCR_MAX_SIDE = args.max_side
+    image_handler.OCR_DETECT_BATCH_SIZE = args.detect_batch
+    image_handler.OCR_MIN_TEXT_DENSITY = args.min_density
+
+    # 모델 로딩 시간은 제외
+    image_handler.get_ocr_reader()
+
+    _, baseline_seconds = timed(one_at_a_time, sources)
+    print(f"one-at-a-time: {baseline_seconds:8.2f}s  {len(sources) / baseline_seconds:6.2f} images/sec")
+
+    _, batched_seconds = timed(image_handler.extract_text_from_images, sources)
+    print(f"batched:       {batched_seconds:8.2f}s  {len(sources) / batched_seconds:6.2f} images/sec"
+          f"  (max_side={args.max_side}, detect_batch={args.detect_batch}, min_density={args.min_density})")
+    print(f"speedup:       {baseline_seconds / batched_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_remove_overlap.py
+"""
+remove_overlap의 기존 이중 루프 구현과 cdist 기반 구현을 1시간 분량 전사본으로 비교합니다.
+
+    python -m benchmarks.bench_remove_overlap
+    python -m benchmarks.bench_remove_overlap --minutes 10 --workers 1
+
+전사본은 시드가 고정된 합성 데이터이며(분당 150단어, 자막 한 줄 1~10단어),
+두 구현의 출력이 완전히 같은지도 함께 확인합니다.
+"""
+import argparse
+import random
+import time
+from rapidfuzz import fuzz
+from app.video_handler import remove_overlap
+
+VOCAB_SIZE = 3000
+
+
+def make_fixture(minutes: int = 60, seed: int = 0) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    syllables = ["가", "나", "다", "라", "마", "바", "사", "아", "자", "차", "카", "타", "파", "하", "요", "는", "을", "에"]
+    vocab = ["".join(rng.choices(syllables, k=rng.randint(1, 5))) for _ in range(VOCAB_SIZE)]
+    # 실제 발화처럼 자주 쓰이는 단어가 반복되도록 치우친 분포로 뽑음
+    weights = [1 / (rank + 1) for rank in range(VOCAB_SIZE)]
+
+    words = rng.choices(vocab, weights=weights, k=minutes * 150)
+    subtitles = []
+    i = 0
+    while i < len(words):
+        # 짧은 추임새 자막(1~2단어)도 섞여 있어 단어 단위 Whisper 줄과 겹치는 경우가 생김
+        size = rng.choice([1, 2, 8, 8, 8, 10])
+        subtitles.append(" ".join(words[i:i + size]))
+        i += size
+    # 자막 일부는 누락시켜 Whisper에만 남는 내용이 생기게 함
+    subtitles = [line for line in subtitles if rng.random() > 0.2]
+    return words, subtitles
+
+
+def remove_overlap_pairwise(whisper_lines: list[str], subtitle_lines: list[str]) -> list[str]:
+    """변경 전 구현 (모든 쌍에 대해 fuzz.ratio 호출)."""
+    unique = []
+    for w_line in whisper_lines:
+        if not any(fuzz.ratio(w_line, s_line) > 85 for s_line in subtitle_lines):
+            unique.append(w_line)
+    return unique
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="remove_overlap 벤치마크")
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=-1)
+    parser.add_argument("--skip-baseline", action="store_true", help="기존 구현 측정을 건너뜀 (오래 걸림)")
+    args = parser.parse_args()
+
+    whisper_lines, subtitle_lines = make_fixture(args.minutes)
+    print(f"whisper lines: {len(whisper_lines)}, subtitle lines: {len(subtitle_lines)}")
+
+    fast, fast_seconds = timed(remove_overlap, whisper_lines, subtitle_lines, workers=args.workers)
+    print(f"cdist:    {fast_seconds:8.2f}s  (남은 줄 {len(fast)})")
+
+    if args.skip_baseline:
+        return
+
+    slow, slow_seconds = timed(remove_overlap_pairwise, whisper_lines, subtitle_lines)
+    print(f"pairwise: {slow_seconds:8.2f}s  (남은 줄 {len(slow)})")
+    print(f"speedup:  {slow_seconds / fast_seconds:8.1f}x, identical output: {fast == slow}")
+
+
+if __name__ == "__main__":
+    main()
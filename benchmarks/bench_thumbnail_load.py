@@ -0,0 +1,78 @@
+# benchmarks/bench_thumbnail_load.py
+"""
+썸네일을 동시에 여러 개 렌더링하는 동안 /task-status 응답 지연을 측정합니다.
+
+    python -m benchmarks.bench_thumbnail_load
+    python -m benchmarks.bench_thumbnail_load --renders 20 --render-ms 2000
+    python -m benchmarks.bench_thumbnail_load --real   # 실제 Playwright로 렌더링 (브라우저 필요)
+
+기본값은 렌더링을 time.sleep으로 흉내내고 Celery 결과 조회를 모의하여, 앱 코드만의 동작을 봅니다.
+부하 전(idle)과 부하 중(load)의 p50/p95/max가 비슷하면 렌더링이 이벤트 루프를 막지 않는 것입니다.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import patch, MagicMock
+import httpx
+from app.main import app
+
+
+async def measure_status(http: httpx.AsyncClient, until, interval: float) -> list[float]:
+    latencies = []
+    while not until():
+        start = time.perf_counter()
+        await http.get("/task-status/bench")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def summarize(name: str, latencies: list[float]):
+    ms = sorted(latency * 1000 for latency in latencies)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    print(f"{name:5s} n={len(ms):4d}  p50={statistics.median(ms):7.1f}ms  p95={p95:7.1f}ms  max={ms[-1]:7.1f}ms")
+
+
+async def run(renders: int, url: str, interval: float):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        idle_until = time.perf_counter() + 1.0
+        summarize("idle", await measure_status(http, lambda: time.perf_counter() > idle_until, interval))
+
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(http.post("/thumbnail", json={"url": f"{url}?n={i}"})) for i in range(renders)]
+        latencies = await measure_status(http, lambda: all(task.done() for task in tasks), interval)
+        responses = await asyncio.gather(*tasks)
+        summarize("load", latencies)
+
+        ok = sum(response.status_code == 200 for response in responses)
+        print(f"renders: {ok}/{renders} 성공, {time.perf_counter() - start:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/thumbnail 동시 렌더링 중 /task-status 지연 벤치마크")
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--render-ms", type=int, default=1000, help="흉내낼 렌더링 시간 (--real이 아닐 때)")
+    parser.add_argument("--url", default="https://example.com/")
+    parser.add_argument("--interval-ms", type=int, default=20)
+    parser.add_argument("--real", action="store_true", help="generate_thumbnail을 모의하지 않고 실제로 렌더링")
+    args = parser.parse_args()
+
+    status = MagicMock(status="PENDING")
+    status.ready.return_value = False
+
+    def fake_render(url):
+        time.sleep(args.render_ms / 1000)
+        return b"png", "image"
+
+    with patch("app.main.AsyncResult", return_value=status):
+        if args.real:
+            asyncio.run(run(args.renders, args.url, args.interval_ms / 1000))
+        else:
+            with patch("app.thumbnail_handler.generate_thumbnail", side_effect=fake_render):
+                asyncio.run(run(args.renders, args.url, args.interval_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/bench_transcription.py
+"""
+음성 인식 백엔드별 실시간 배수(RTF = 처리 시간 / 오디오 길이)를 측정합니다.
+
+    python -m benchmarks.bench_transcription
+    python -m benchmarks.bench_transcription --audio sample.wav --backends whisper:base faster-whisper:base:int8
+
+--audio를 지정하지 않으면 시드가 고정된 30초짜리 16kHz 합성 오디오를 사용하므로
+같은 머신에서 실행 결과를 서로 비교할 수 있습니다.
+RTF가 1보다 작을수록 실제 재생 시간보다 빠르게 처리한다는 뜻입니다.
+"""
+import argparse
+import time
+import wave
+import numpy as np
+from app.video_handler import load_transcriber
+
+SAMPLE_RATE = 16000
+
+
+def make_fixture(seconds: int = 30, seed: int = 0) -> np.ndarray:
+    """음절 길이의 톤과 잡음을 섞은 고정 오디오를 생성합니다."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(seconds * SAMPLE_RATE) / SAMPLE_RATE
+    pitch = np.repeat(rng.uniform(120, 300, size=seconds * 4), SAMPLE_RATE // 4)[:t.size]
+    envelope = (np.sin(2 * np.pi * 2 * t) > 0).astype(np.float32)
+    audio = 0.3 * np.sin(2 * np.pi * pitch * t) * envelope + 0.02 * rng.standard_normal(t.size)
+    return audio.astype(np.float32)
+
+
+def load_wav(path: str) -> np.ndarray:
+    """16kHz mono 16-bit WAV를 float32 배열로 읽습니다 (ffmpeg 없이 동작)."""
+    with wave.open(path, "rb") as f:
+        if f.getframerate() != SAMPLE_RATE or f.getnchannels() != 1 or f.getsampwidth() != 2:
+            raise ValueError("16kHz mono 16-bit WAV 파일만 지원합니다.")
+        frames = f.readframes(f.getnframes())
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def bench(spec: str, audio: np.ndarray, repeat: int) -> dict:
+    backend, model_name, *rest = spec.split(":")
+    compute_type = rest[0] if rest else None
+
+    start = time.perf_counter()
+    transcriber = load_transcriber(backend, model_name, compute_type)
+    load_seconds = time.perf_counter() - start
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        transcriber.transcribe(audio)
+        durations.append(time.perf_counter() - start)
+
+    audio_seconds = audio.size / SAMPLE_RATE
+    best = min(durations)
+    return {
+        "spec": spec,
+        "load_s": load_seconds,
+        "transcribe_s": best,
+        "rtf": best / audio_seconds,
+        "cold_rtf": (load_seconds + durations[0]) / audio_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="음성 인식 백엔드 RTF 벤치마크")
+    parser.add_argument("--audio", help="16kHz mono 16-bit WAV 경로 (기본값: 합성 고정 오디오)")
+    parser.add_argument("--seconds", type=int, default=30, help="합성 오디오 길이(초)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--backends", nargs="+",
+        default=["whisper:base", "whisper:base:int8", "whisper:tiny", "faster-whisper:base:int8"],
+        help="backend:model[:compute_type] 형식",
+    )
+    args = parser.parse_args()
+
+    audio = load_wav(args.audio) if args.audio else make_fixture(args.seconds)
+    print(f"audio: {audio.size / SAMPLE_RATE:.1f}s, repeat={args.repeat}")
+    print(f"{'backend':<28}{'load(s)':>10}{'warm(s)':>10}{'RTF':>8}{'cold RTF':>10}")
+
+    for spec in args.backends:
+        try:
+            r = bench(spec, audio, args.repeat)
+        except ImportError as e:
+            print(f"{spec:<28}건너뜀: {e}")
+            continue
+        print(f"{r['spec']:<28}{r['load_s']:>10.2f}{r['transcribe_s']:>10.2f}{r['rtf']:>8.3f}{r['cold_rtf']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
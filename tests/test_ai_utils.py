@@ -2,12 +2,18 @@ import pytest
 from unittest.mock import patch, MagicMock
 from app.ai_utils import summarize_and_tag
 
-@patch('app.ai_utils.openai.chat.completions.create')
+@pytest.fixture(autouse=True)
+def no_summary_cache():
+    """요약 캐시는 tests/test_summary_cache.py에서 따로 테스트"""
+    with patch('app.ai_utils.get_summary_cache', return_value=None):
+        yield
+
+@patch('app.ai_utils.chat_completion')
 def test_summarize_and_tag_success(mock_create):
     """OpenAI API 호출 성공 시 정상적인 결과 반환 테스트"""
     mock_response = MagicMock()
     mock_choice = MagicMock()
-    mock_choice.message.content = "[테스트 제목]\n테스트 요약 내용입니다.\n태그1, 태그2, 태그3, 태그4, 태그5"
+    mock_choice.message.content = '{"title": "테스트 제목", "summary": "테스트 요약 내용입니다.", "tags": ["태그1", "태그2", "태그3", "태그4", "태그5"]}'
     mock_response.choices = [mock_choice]
     mock_create.return_value = mock_response
 
@@ -17,8 +23,9 @@ def test_summarize_and_tag_success(mock_create):
     assert result["title"] == "테스트 제목"
     assert result["summary"] == "테스트 요약 내용입니다."
     assert result["tags"] == ["태그1", "태그2", "태그3", "태그4", "태그5"]
+    assert mock_create.call_args.kwargs["response_format"] == {"type": "json_object"}
 
-@patch('app.ai_utils.openai.chat.completions.create', side_effect=Exception("API Error"))
+@patch('app.ai_utils.chat_completion', side_effect=Exception("API Error"))
 def test_summarize_and_tag_failure(mock_create):
     """OpenAI API 호출 실패 시 기본값 반환 테스트"""
     text = "이것은 테스트를 위한 텍스트입니다."
@@ -27,3 +34,141 @@ def test_summarize_and_tag_failure(mock_create):
     assert result["title"] == "제목 생성 실패"
     assert result["summary"] == "요약 실패"
     assert result["tags"] == ["실패", "에러", "요약불가", "GPT오류", "기본"]
+
+def _completion(content):
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = content
+    return response
+
+def _fake_create(section_calls):
+    """구간 요약 요청은 기록하고 짧은 요약을, 최종 요청에는 제목/요약/태그를 반환"""
+    def create(model, messages, **kwargs):
+        prompt = messages[0]["content"]
+        if prompt.startswith("다음은 긴 글의 일부입니다."):
+            section_calls.append(prompt)
+            return _completion(f"구간 요약 {len(section_calls)}")
+        return _completion('{"title": "긴 글 제목", "summary": "긴 글 요약", "tags": ["태그1", "태그2"]}')
+    return create
+
+@patch('app.ai_utils.get_token_encoder', return_value=None)
+@patch('app.ai_utils.SUMMARY_MAX_INPUT_TOKENS', 100)
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_short_text_single_call(mock_create, mock_encoder):
+    """예산 이하의 짧은 글은 구간 요약 없이 한 번만 요청하는지 테스트"""
+    mock_create.return_value = _completion('{"title": "제목", "summary": "요약", "tags": ["태그1"]}')
+
+    summarize_and_tag("짧은 글입니다.", chunks=["짧은 글입니다."])
+
+    mock_create.assert_called_once()
+    assert "짧은 글입니다." in mock_create.call_args.kwargs["messages"][0]["content"]
+
+@patch('app.ai_utils.get_token_encoder', return_value=None)
+@patch('app.ai_utils.SUMMARY_MAX_INPUT_TOKENS', 100)
+@patch('app.ai_utils.SUMMARY_CHUNK_TOKENS', 60)
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_map_reduce(mock_create, mock_encoder):
+    """긴 글은 청크를 구간으로 묶어 요약한 뒤, 구간 요약을 합쳐 최종 요약하는지 테스트"""
+    section_calls = []
+    mock_create.side_effect = _fake_create(section_calls)
+    chunks = [f"chunk-{i:02d} " + "a" * 40 for i in range(10)]  # 청크당 약 17토큰 (3바이트당 1토큰 추정)
+
+    result = summarize_and_tag("\n".join(chunks), chunks=chunks)
+
+    # 60토큰 이하로 묶으면 구간당 청크 3개 → 4개 구간
+    assert len(section_calls) == 4
+    assert all(chunk in "".join(section_calls) for chunk in chunks)
+    final_prompt = mock_create.call_args_list[-1].kwargs["messages"][0]["content"]
+    assert "구간 요약" in final_prompt and "chunk-00" not in final_prompt
+    assert result["title"] == "긴 글 제목"
+
+@patch('app.ai_utils.get_token_encoder', return_value=None)
+@patch('app.ai_utils.SUMMARY_MAX_INPUT_TOKENS', 100)
+@patch('app.ai_utils.SUMMARY_CHUNK_TOKENS', 60)
+@patch('app.ai_utils.SUMMARY_MAX_DOCUMENT_TOKENS', 70)
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_document_token_cap(mock_create, mock_encoder):
+    """문서 최대 토큰을 넘는 뒷부분은 요약 요청에 보내지 않는지 테스트"""
+    section_calls = []
+    mock_create.side_effect = _fake_create(section_calls)
+    chunks = [f"chunk-{i:02d} " + "a" * 40 for i in range(10)]
+
+    summarize_and_tag("\n".join(chunks), chunks=chunks)
+
+    sent = "".join(section_calls)
+    assert "chunk-03" in sent and "chunk-04" not in sent
+
+@patch('app.ai_utils.get_token_encoder', return_value=None)
+def test_group_chunks_splits_oversized_chunk(mock_encoder):
+    """구간 크기보다 긴 청크는 잘라서 모든 구간이 예산 이하가 되는지 테스트"""
+    from app.ai_utils import group_chunks, count_tokens
+    groups = group_chunks(["가" * 500], max_tokens=100, max_total_tokens=10_000)
+
+    assert "".join(groups) == "가" * 500
+    assert all(count_tokens(group) <= 100 for group in groups)
+
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_repairs_malformed_output(mock_create):
+    """형식이 어긋난 응답은 수리 요청 한 번으로 고치고, 파싱 실패로 기록하는지 테스트"""
+    from app.ai_utils import parse_metrics
+    before = parse_metrics.snapshot()
+    mock_create.side_effect = [
+        _completion("1. 제목: 커피 절약 팁\n\n2. 요약: 텀블러를 쓰면 할인됩니다.\n3. 태그: 커피, 절약"),
+        _completion('{"title": "커피 절약 팁", "summary": "텀블러를 쓰면 할인됩니다.", "tags": "#커피, 절약"}'),
+    ]
+
+    result = summarize_and_tag("커피값을 아끼는 방법")
+
+    assert result == {"title": "커피 절약 팁", "summary": "텀블러를 쓰면 할인됩니다.", "tags": ["커피", "절약"]}
+    assert mock_create.call_count == 2
+    # 수리 요청에는 원문이 아니라 잘못된 응답만 보냄
+    repair_messages = mock_create.call_args_list[1].kwargs["messages"]
+    assert "커피값을 아끼는 방법" not in str(repair_messages)
+    after = parse_metrics.snapshot()
+    assert after["parse_failures"] == before["parse_failures"] + 1
+    assert after["repaired"] == before["repaired"] + 1
+
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_gives_up_after_one_repair(mock_create):
+    """수리 후에도 형식이 맞지 않으면 더 시도하지 않고 기본값을 반환하는지 테스트"""
+    from app.ai_utils import parse_metrics
+    before = parse_metrics.snapshot()
+    mock_create.side_effect = [_completion("형식 없음"), _completion('{"title": ""}')]
+
+    result = summarize_and_tag("텍스트")
+
+    assert result["summary"] == "요약 실패"
+    assert mock_create.call_count == 2
+    assert parse_metrics.snapshot()["repair_failures"] == before["repair_failures"] + 1
+
+@pytest.mark.parametrize("tags", [None, 3])
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_repairs_invalid_tags_type(mock_create, tags):
+    """tags가 null/숫자이면 형식 오류로 보고 수리 요청을 보내는지 테스트"""
+    import json
+    from app.ai_utils import parse_metrics
+    before = parse_metrics.snapshot()
+    mock_create.side_effect = [
+        _completion(json.dumps({"title": "제목", "summary": "요약", "tags": tags})),
+        _completion('{"title": "제목", "summary": "요약", "tags": ["태그1"]}'),
+    ]
+
+    result = summarize_and_tag("텍스트")
+
+    assert result["tags"] == ["태그1"]
+    assert mock_create.call_count == 2
+    assert parse_metrics.snapshot()["repaired"] == before["repaired"] + 1
+
+@patch('app.ai_utils.chat_completion')
+def test_summarize_and_tag_counts_failed_repair_request(mock_create):
+    """수리 요청이 API 오류로 실패해도 파싱 실패로 기록하는지 테스트"""
+    from app.ai_utils import parse_metrics
+    before = parse_metrics.snapshot()
+    mock_create.side_effect = [_completion("형식 없음"), Exception("API Error")]
+
+    result = summarize_and_tag("텍스트")
+
+    assert result["summary"] == "요약 실패"
+    after = parse_metrics.snapshot()
+    assert after["parse_failures"] == before["parse_failures"] + 1
+    assert after["repair_failures"] == before["repair_failures"] + 1
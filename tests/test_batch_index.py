@@ -0,0 +1,293 @@
+# tests/test_batch_index.py
+
+import json
+import pytest
+from unittest.mock import patch, MagicMock
+from app.batch_index import submit_batch, prepare_batch, record_batch_result, get_batch_status, BATCH_INDEX_TTL
+from app.task_routing import QUEUE_TASKS, BATCH_PREPARE_TASK
+
+class FakeRedis:
+    """배치 정보 저장에 쓰는 해시 명령(HSET/HGET/HGETALL/HDEL)과 EXPIRE/EXISTS/DELETE, pipeline만 흉내 내는 Redis"""
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        fields = self.store.setdefault(key, {})
+        for name, item in ({field: value} if mapping is None else mapping).items():
+            fields[name.encode()] = item.encode() if isinstance(item, str) else item
+
+    def hget(self, key, field):
+        return self.store.get(key, {}).get(field.encode())
+
+    def hgetall(self, key):
+        return dict(self.store.get(key, {}))
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.store.get(key, {}).pop(field.encode(), None)
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        fake = self
+
+        class Pipe:
+            def __init__(self):
+                self.calls = []
+
+            def __getattr__(self, name):
+                def call(*args, **kwargs):
+                    self.calls.append((getattr(fake, name), args, kwargs))
+                return call
+
+            def execute(self):
+                return [method(*args, **kwargs) for method, args, kwargs in self.calls]
+
+        return Pipe()
+
+@pytest.fixture
+def fake_redis():
+    redis_client = FakeRedis()
+    with patch('app.batch_index.get_redis', return_value=redis_client):
+        yield redis_client
+
+def _canonicalize(url):
+    # 추적 파라미터만 떼는 간단한 정규화
+    return url.split("?")[0]
+
+def _canonicalize_or_reject(url):
+    # 실제 canonicalize_url처럼 형식이 잘못된 URL은 ValueError
+    if "[" in url:
+        raise ValueError(f"잘못된 URL입니다: {url}")
+    return _canonicalize(url)
+
+def _submitted(fake_redis, urls, group_id="batch1"):
+    """submit_batch가 저장하는 것과 같은 준비 전 배치 정보"""
+    fake_redis.hset(f"batch-index:{group_id}", mapping={"urls": json.dumps(urls)})
+    return group_id
+
+def _prepared(fake_redis, items, duplicates=0, group_id="batch1"):
+    """prepare_batch가 저장하는 것과 같은 준비된 배치 정보"""
+    fake_redis.hset(f"batch-index:{group_id}", mapping={
+        "meta": json.dumps({"total": len(items), "duplicates": duplicates}),
+        **{f"item:{i}": json.dumps(item) for i, item in enumerate(items)},
+    })
+    return group_id
+
+def _mock_backend(metas):
+    backend = MagicMock()
+    backend.get_key_for_task.side_effect = lambda task_id: f"celery-task-meta-{task_id}".encode()
+    backend.mget.side_effect = lambda keys: [metas.get(key.decode().removeprefix("celery-task-meta-")) for key in keys]
+    backend.decode_result.side_effect = json.loads
+    return backend
+
+@patch('app.batch_index.canonicalize_url')
+@patch('app.batch_index.celery_app.send_task')
+def test_submit_batch_returns_before_preparing(mock_send_task, mock_canonicalize, fake_redis):
+    """배치 등록은 URL 정규화(HEAD) 없이 배치 ID를 바로 반환하고, 준비 작업을 웹 큐 작업으로 보내는지 테스트"""
+    urls = ["https://example.com/a", "https://example.com/b"]
+
+    response = submit_batch(urls)
+
+    assert response == {"group_id": response["group_id"], "submitted": 2}
+    mock_canonicalize.assert_not_called()
+    mock_send_task.assert_called_once_with(BATCH_PREPARE_TASK, args=[response["group_id"]])
+    key = f"batch-index:{response['group_id']}"
+    assert json.loads(fake_redis.hget(key, "urls")) == urls
+    assert fake_redis.ttls[key] == BATCH_INDEX_TTL
+
+@patch('app.batch_index.celery_app.send_task', side_effect=ConnectionError("broker down"))
+def test_submit_batch_removes_batch_when_enqueue_fails(mock_send_task, fake_redis):
+    """준비 작업을 보내지 못하면 배치 정보를 지우고 예외를 전달하는지 테스트"""
+    with pytest.raises(ConnectionError):
+        submit_batch(["https://example.com/a"])
+
+    assert not fake_redis.store
+
+@patch('app.batch_index.group')
+@patch('app.batch_index.detect_queue', side_effect=lambda url: "asr" if "youtube" in url else "web")
+@patch('app.batch_index.claim_inflight', side_effect=lambda canonical_url, task_id: "running_task" if "running" in canonical_url else None)
+@patch('app.batch_index.get_cached_result', side_effect=lambda canonical_url: {"title": "캐시"} if "cached" in canonical_url else None)
+@patch('app.batch_index.canonicalize_url', side_effect=_canonicalize)
+def test_prepare_batch_dedupes_and_fans_out(mock_canonicalize, mock_cached, mock_claim, mock_detect_queue, mock_group, fake_redis):
+    """정규화 기준 중복은 한 번만 처리하고, 캐시/진행 중 URL을 빼고 새 작업만 group으로 보내는지 테스트"""
+    group_id = _submitted(fake_redis, [
+        "https://example.com/a",
+        "https://example.com/a?utm_source=kakao",  # 정규화하면 중복
+        "https://example.com/a",                   # 그대로 중복
+        "https://www.youtube.com/watch",
+        "https://example.com/cached",
+        "https://example.com/running",
+    ])
+
+    response = prepare_batch(group_id)
+
+    assert response == {"group_id": group_id, "total": 4, "queued": 2, "duplicates": 2}
+    # 같은 URL은 한 번만 정규화
+    assert mock_canonicalize.call_count == 5
+
+    signatures = mock_group.call_args.args[0]
+    assert [sig.task for sig in signatures] == [QUEUE_TASKS["web"], QUEUE_TASKS["asr"]]
+    assert signatures[0].args == ("https://example.com/a",)
+    assert signatures[0].kwargs == {"canonical_url": "https://example.com/a", "batch_id": group_id}
+    mock_group.return_value.apply_async.assert_called_once_with(task_id=group_id)
+
+    fields = fake_redis.store[f"batch-index:{group_id}"]
+    assert b"urls" not in fields
+    assert json.loads(fields[b"meta"]) == {"total": 4, "duplicates": 2}
+    items = [json.loads(fields[f"item:{i}".encode()]) for i in range(4)]
+    assert [item["url"] for item in items] == [
+        "https://example.com/a", "https://www.youtube.com/watch", "https://example.com/cached", "https://example.com/running",
+    ]
+    assert items[0]["task_id"] == signatures[0].options["task_id"]
+    assert items[0]["canonical_url"] == "https://example.com/a"
+    assert items[2]["result"] == {"title": "캐시"}
+    assert items[3]["task_id"] == "running_task"
+
+@patch('app.batch_index.group')
+@patch('app.batch_index.get_cached_result', return_value={"title": "캐시"})
+@patch('app.batch_index.canonicalize_url', side_effect=_canonicalize)
+def test_prepare_batch_all_cached_sends_nothing(mock_canonicalize, mock_cached, mock_group, fake_redis):
+    """모든 URL의 결과가 캐시되어 있으면 작업을 보내지 않는지 테스트"""
+    response = prepare_batch(_submitted(fake_redis, ["https://example.com/a", "https://example.com/b"]))
+
+    assert response["queued"] == 0
+    mock_group.assert_not_called()
+
+@patch('app.batch_index.group')
+@patch('app.batch_index.detect_queue', return_value="web")
+@patch('app.batch_index.claim_inflight', return_value=None)
+@patch('app.batch_index.get_cached_result', return_value=None)
+@patch('app.batch_index.canonicalize_url', side_effect=_canonicalize_or_reject)
+def test_prepare_batch_marks_malformed_url_failed(mock_canonicalize, mock_cached, mock_claim, mock_detect_queue, mock_group, fake_redis):
+    """형식이 잘못된 URL은 작업을 보내지 않고 실패 항목으로 기록하는지 테스트"""
+    group_id = _submitted(fake_redis, ["http://[::1", "https://example.com/a"])
+
+    with patch('app.batch_index.celery_app.signature'):
+        response = prepare_batch(group_id)
+
+    assert response["queued"] == 1
+    assert [call.args[0] for call in mock_claim.call_args_list] == ["https://example.com/a"]
+    with patch('app.batch_index.celery_app', MagicMock(backend=_mock_backend({}))), \
+         patch('app.batch_index.get_cached_results', return_value=[None]):
+        status = get_batch_status(group_id)
+    assert (status["failed"], status["pending"]) == (1, 1)
+    assert status["results"][0]["url"] == "http://[::1" and status["results"][0]["status"] == "FAILURE"
+
+def test_prepare_batch_skips_expired_batch(fake_redis):
+    """등록 정보가 없거나 만료된 배치는 준비하지 않는지 테스트"""
+    assert prepare_batch("missing") is None
+    assert not fake_redis.store
+
+@patch('app.batch_index.release_inflight')
+@patch('app.batch_index.group')
+@patch('app.batch_index.detect_queue', return_value="web")
+@patch('app.batch_index.claim_inflight', side_effect=lambda canonical_url, task_id: "running_task" if "running" in canonical_url else None)
+@patch('app.batch_index.get_cached_result', return_value=None)
+@patch('app.batch_index.canonicalize_url', side_effect=_canonicalize)
+def test_prepare_batch_releases_claims_when_enqueue_fails(mock_canonicalize, mock_cached, mock_claim, mock_detect_queue,
+                                                          mock_group, mock_release, fake_redis):
+    """group 전송이 실패하면 이 배치가 등록한 진행 중 표시만 해제하고, 상태 조회에서 모든 URL이 실패로 보이는지 테스트"""
+    mock_group.return_value.apply_async.side_effect = ConnectionError("broker down")
+    urls = ["https://example.com/a", "https://example.com/b", "https://example.com/running"]
+    group_id = _submitted(fake_redis, urls)
+
+    with pytest.raises(ConnectionError):
+        prepare_batch(group_id)
+
+    released = [call.args for call in mock_release.call_args_list]
+    claimed = [(call.args[0], call.args[1]) for call in mock_claim.call_args_list if "running" not in call.args[0]]
+    assert sorted(released) == sorted(claimed)
+
+    status = get_batch_status(group_id)
+    assert (status["preparing"], status["total"], status["failed"], status["progress"]) == (False, 3, 3, 1.0)
+    assert "broker down" in status["results"][0]["error"]
+
+def test_get_batch_status_while_preparing(fake_redis):
+    """준비 작업이 끝나기 전에는 등록한 URL을 모두 대기 중으로 반환하는지 테스트"""
+    group_id = _submitted(fake_redis, ["https://example.com/a", "https://example.com/b"])
+
+    status = get_batch_status(group_id)
+
+    assert status["preparing"] is True
+    assert (status["total"], status["pending"], status["progress"]) == (2, 2, 0.0)
+    assert [entry["status"] for entry in status["results"]] == ["PENDING", "PENDING"]
+
+def test_get_batch_status_aggregates_and_pages(fake_redis):
+    """결과를 한 번에 조회해 전체 진행 상황을 집계하고, 등록 순서대로 페이지를 나누는지 테스트"""
+    group_id = _prepared(fake_redis, [
+        {"url": "https://example.com/cached", "canonical_url": "https://example.com/cached", "task_id": None, "result": {"title": "캐시"}},
+        {"url": "https://example.com/done", "canonical_url": "https://example.com/done", "task_id": "t1"},
+        {"url": "https://example.com/error", "canonical_url": "https://example.com/error", "task_id": "t2"},
+        {"url": "https://example.com/waiting", "canonical_url": "https://example.com/waiting", "task_id": "t3"},
+    ], duplicates=1)
+    metas = {
+        "t1": json.dumps({"status": "SUCCESS", "result": {"title": "완료"}}),
+        "t2": json.dumps({"status": "FAILURE", "result": "처리 실패"}),
+    }
+    backend = _mock_backend(metas)
+
+    with patch('app.batch_index.celery_app', MagicMock(backend=backend)), \
+         patch('app.batch_index.get_cached_results', return_value=[None]) as mock_cached:
+        status = get_batch_status(group_id, offset=1, limit=2)
+
+    mock_cached.assert_called_once_with(["https://example.com/waiting"])
+
+    backend.mget.assert_called_once()
+    assert status["preparing"] is False
+    assert (status["total"], status["duplicates"], status["succeeded"], status["failed"], status["pending"]) == (4, 1, 2, 1, 1)
+    assert status["progress"] == 0.75
+    assert status["results"] == [
+        {"url": "https://example.com/done", "task_id": "t1", "status": "SUCCESS", "result": {"title": "완료"}},
+        {"url": "https://example.com/error", "task_id": "t2", "status": "FAILURE", "error": "처리 실패"},
+    ]
+
+def test_get_batch_status_unknown_batch(fake_redis):
+    """없거나 만료된 배치는 None을 반환하는지 테스트"""
+    assert get_batch_status("missing") is None
+
+@patch('app.batch_index.get_cached_results', side_effect=lambda canonical_urls: [None] * len(canonical_urls))
+def test_get_batch_status_survives_result_expiry_without_result_cache(mock_cached, fake_redis):
+    """
+    결과 캐시가 꺼져 있어도(RESULT_CACHE_TTL=0), 워커가 기록한 결과와 상태 조회 때 기록한 결과로
+    Celery 결과가 만료된 뒤에도 진행률이 줄지 않고, 대기 중이면 TTL을 늘리는지 테스트
+    """
+    group_id = _prepared(fake_redis, [
+        {"url": "https://example.com/worker", "canonical_url": "https://example.com/worker", "task_id": "t1"},
+        {"url": "https://example.com/done", "canonical_url": "https://example.com/done", "task_id": "t2"},
+        {"url": "https://example.com/error", "canonical_url": "https://example.com/error", "task_id": "t3"},
+        {"url": "https://example.com/waiting", "canonical_url": "https://example.com/waiting", "task_id": "t4"},
+    ])
+    # t1은 배치로 보낸 작업이라 워커가 끝날 때 직접 기록
+    record_batch_result(group_id, "t1", result={"title": "워커"})
+    # t2, t3은 다른 요청이 먼저 등록한 작업이라 상태 조회 때 Celery 결과를 보고 기록
+    metas = {
+        "t2": json.dumps({"status": "SUCCESS", "result": {"title": "완료"}}),
+        "t3": json.dumps({"status": "FAILURE", "result": "처리 실패"}),
+    }
+
+    with patch('app.batch_index.celery_app', MagicMock(backend=_mock_backend(metas))):
+        first = get_batch_status(group_id)
+    # Celery 결과가 모두 만료
+    with patch('app.batch_index.celery_app', MagicMock(backend=_mock_backend({}))):
+        second = get_batch_status(group_id)
+
+    for status in (first, second):
+        assert (status["succeeded"], status["failed"], status["pending"]) == (2, 1, 1)
+        assert [entry.get("result") for entry in status["results"][:2]] == [{"title": "워커"}, {"title": "완료"}]
+        assert status["results"][2]["error"] == "처리 실패"
+    assert fake_redis.ttls[f"batch-index:{group_id}"] == BATCH_INDEX_TTL
+
+def test_record_batch_result_does_not_recreate_expired_batch(fake_redis):
+    """만료된 배치에는 결과를 기록하지 않는지 테스트"""
+    record_batch_result("missing", "t1", error="처리 실패")
+
+    assert not fake_redis.store
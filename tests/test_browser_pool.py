@@ -0,0 +1,114 @@
+# tests/test_browser_pool.py
+
+import pytest
+from unittest.mock import patch, MagicMock
+from app.browser_pool import BrowserPool, get_browser_pool
+
+def _mock_playwright():
+    mock_browser = MagicMock()
+    mock_browser.is_connected.return_value = True
+    mock_playwright = MagicMock()
+    mock_playwright.chromium.launch.return_value = mock_browser
+    return mock_playwright, mock_browser
+
+@patch('app.browser_pool.sync_playwright')
+def test_browser_pool_reuses_browser(mock_sync_playwright):
+    """여러 페이지를 요청해도 브라우저는 한 번만 실행되는지 테스트"""
+    mock_playwright, mock_browser = _mock_playwright()
+    mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+    pool = BrowserPool(max_pages=2, recycle_after=10)
+    for _ in range(3):
+        with pool.page() as page:
+            assert page is mock_browser.new_context.return_value.new_page.return_value
+
+    mock_playwright.chromium.launch.assert_called_once()
+    assert mock_browser.new_context.return_value.close.call_count == 3
+    metrics = pool.metrics()
+    assert metrics["pages_served"] == 3
+    assert metrics["launch_count"] == 1
+    assert metrics["active"] == 0
+    assert metrics["waiters"] == 0
+
+@patch('app.browser_pool.sync_playwright')
+def test_browser_pool_recycles_after_limit(mock_sync_playwright):
+    """지정한 페이지 수를 넘기면 브라우저를 재시작하는지 테스트"""
+    mock_playwright, mock_browser = _mock_playwright()
+    mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+    pool = BrowserPool(max_pages=1, recycle_after=2)
+    for _ in range(3):
+        with pool.page():
+            pass
+
+    assert mock_playwright.chromium.launch.call_count == 2
+    mock_browser.close.assert_called_once()
+    assert pool.metrics()["recycle_count"] == 1
+
+@patch('app.browser_pool.sync_playwright')
+def test_browser_pool_relaunches_crashed_browser(mock_sync_playwright):
+    """브라우저 연결이 끊기면 다음 요청에서 새로 실행하는지 테스트"""
+    mock_playwright, crashed_browser = _mock_playwright()
+    new_browser = MagicMock()
+    new_browser.is_connected.return_value = True
+    mock_playwright.chromium.launch.side_effect = [crashed_browser, new_browser]
+    mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+    pool = BrowserPool(max_pages=1, recycle_after=10)
+    with pytest.raises(RuntimeError):
+        with pool.page():
+            crashed_browser.is_connected.return_value = False
+            raise RuntimeError("Target closed")
+
+    with pool.page() as page:
+        assert page is new_browser.new_context.return_value.new_page.return_value
+
+    assert mock_playwright.chromium.launch.call_count == 2
+    assert pool.metrics()["crash_count"] == 1
+    assert pool.metrics()["active"] == 0
+
+def test_get_browser_pool_singleton():
+    """get_browser_pool이 같은 프로세스에서 같은 풀을 반환하는지 테스트"""
+    from app import browser_pool
+    browser_pool.pool = None
+
+    assert get_browser_pool() is get_browser_pool()
+
+@patch('app.browser_pool.sync_playwright')
+def test_browser_pool_reaps_browsers_of_dead_threads(mock_sync_playwright):
+    """종료된 스레드가 띄운 브라우저는 다음 실행 때 정리되는지 테스트"""
+    import threading
+    mock_playwright, _ = _mock_playwright()
+    dead_browser, live_browser = MagicMock(), MagicMock()
+    mock_playwright.chromium.launch.side_effect = [dead_browser, live_browser]
+    mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+    pool = BrowserPool(max_pages=1, recycle_after=10)
+
+    def render():
+        with pool.page():
+            pass
+    thread = threading.Thread(target=render)
+    thread.start()
+    thread.join()
+    assert pool.metrics()["browsers"] == 1
+
+    render()
+
+    dead_browser.close.assert_called_once()
+    live_browser.close.assert_not_called()
+    assert pool.metrics()["browsers"] == 1
+
+@patch('app.browser_pool.sync_playwright')
+def test_browser_pool_release_current_thread(mock_sync_playwright):
+    """현재 스레드의 브라우저만 종료하고, 다음 요청에서 새로 띄우는지 테스트"""
+    mock_playwright, mock_browser = _mock_playwright()
+    mock_sync_playwright.return_value.start.return_value = mock_playwright
+
+    pool = BrowserPool(max_pages=1, recycle_after=10)
+    with pool.page():
+        pass
+    pool.release_current_thread()
+
+    mock_browser.close.assert_called_once()
+    assert pool.metrics()["browsers"] == 0
@@ -0,0 +1,121 @@
+# tests/test_embedding_cache.py
+
+import numpy as np
+import redis
+from unittest.mock import patch, MagicMock
+from app.embedding_cache import CachedEmbeddings, normalize_chunk
+
+class FakeRedis:
+    """테스트용 최소 redis 대체 객체 (mget/set/zadd/zcard/zrange/delete/zrem/pipeline)."""
+
+    def __init__(self):
+        self.data = {}
+        self.zset = {}
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def zadd(self, name, mapping):
+        self.zset.update(mapping)
+
+    def zcard(self, name):
+        return len(self.zset)
+
+    def zrange(self, name, start, end):
+        return [key for key, _ in sorted(self.zset.items(), key=lambda item: item[1])][start:end + 1]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def zrem(self, name, *keys):
+        for key in keys:
+            self.zset.pop(key, None)
+
+    def pipeline(self, transaction=False):
+        fake = self
+
+        class Pipe:
+            def __init__(self):
+                self.results = []
+
+            def __getattr__(self, name):
+                def call(*args, **kwargs):
+                    self.results.append(getattr(fake, name)(*args, **kwargs))
+                return call
+
+            def execute(self):
+                return self.results
+
+        return Pipe()
+
+def _underlying():
+    mock = MagicMock()
+    mock.model = "test-embedding"
+    mock.embed_documents.side_effect = lambda texts: [[float(len(t)), 0.5] for t in texts]
+    return mock
+
+def test_normalize_chunk():
+    """공백 차이만 있는 청크는 같은 텍스트로 정규화되는지 테스트"""
+    assert normalize_chunk("  안녕하세요\n\n여러분  ") == normalize_chunk("안녕하세요 여러분")
+
+def test_cached_embeddings_reuses_vectors():
+    """이미 임베딩한 청크는 다시 API를 호출하지 않고 적중률을 기록하는지 테스트"""
+    fake = FakeRedis()
+    underlying = _underlying()
+    cache = CachedEmbeddings(underlying)
+
+    with patch('app.embedding_cache.get_redis', return_value=fake):
+        first = cache.embed_documents(["공통 문구", "첫 글"])
+        second = cache.embed_documents(["공통  문구", "둘째 글"])
+
+    assert underlying.embed_documents.call_count == 2
+    assert underlying.embed_documents.call_args_list[1][0][0] == ["둘째 글"]
+    assert np.allclose(second[0], first[0])
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1
+    assert metrics["misses"] == 3
+    assert metrics["hit_rate"] == 0.25
+
+def test_cached_embeddings_counts_in_batch_duplicates_as_misses():
+    """캐시에 없는 청크가 배치 안에서 반복되면 한 번만 임베딩하되, 반복분을 적중으로 세지 않는지 테스트"""
+    fake = FakeRedis()
+    underlying = _underlying()
+    cache = CachedEmbeddings(underlying)
+
+    with patch('app.embedding_cache.get_redis', return_value=fake):
+        vectors = cache.embed_documents(["반복 문구", "반복 문구", "반복  문구"])
+
+    underlying.embed_documents.assert_called_once_with(["반복 문구"])
+    assert vectors[0] == vectors[1] == vectors[2]
+    assert cache.metrics() == {"hits": 0, "misses": 3, "hit_rate": 0.0}
+
+def test_cached_embeddings_evicts_least_recently_used():
+    """최대 개수를 넘으면 오래 사용하지 않은 항목부터 제거하는지 테스트"""
+    fake = FakeRedis()
+    cache = CachedEmbeddings(_underlying(), max_entries=2)
+
+    with patch('app.embedding_cache.get_redis', return_value=fake), \
+         patch('app.embedding_cache.time.time', side_effect=[1.0, 2.0, 3.0]):
+        cache.embed_documents(["a"])
+        cache.embed_documents(["b"])
+        cache.embed_documents(["c"])
+
+    assert len(fake.zset) == 2
+    assert cache._key("a") not in fake.data
+    assert cache._key("c") in fake.data
+
+def test_cached_embeddings_fails_open():
+    """Redis 장애 시 캐시 없이 임베딩을 계속하는지 테스트"""
+    broken = MagicMock()
+    broken.mget.side_effect = redis.ConnectionError("down")
+    broken.pipeline.side_effect = redis.ConnectionError("down")
+    underlying = _underlying()
+
+    with patch('app.embedding_cache.get_redis', return_value=broken):
+        vectors = CachedEmbeddings(underlying).embed_documents(["텍스트"])
+
+    assert vectors == [[3.0, 0.5]]
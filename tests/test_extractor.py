@@ -1,12 +1,13 @@
 # tests/test_extractor.py
 
 import pytest
-import requests
+import httpx
 from unittest.mock import patch, MagicMock
 from app.extractor import extract_text_from_url, extract_text_with_requests
 from app.structure_detector import extract_main_content_from_html
+from app.fetcher import PageArtifact
 
-@patch('app.extractor.requests.get')
+@patch('app.extractor.http_client.get')
 def test_extract_text_with_requests_success(mock_get):
     mock_response = MagicMock()
     mock_response.status_code = 200
@@ -19,7 +20,7 @@ def test_extract_text_with_requests_success(mock_get):
     assert content_type == 'text/html'
     assert "This is test content." in text
     
-@patch('app.extractor.requests.get', side_effect=requests.RequestException("Network Error"))
+@patch('app.extractor.http_client.get', side_effect=httpx.ConnectError("Network Error"))
 def test_extract_text_with_requests_failure(mock_get):
     content_type, text = extract_text_with_requests("https://invalid-url.com")
     assert content_type == "에러"
@@ -37,6 +38,21 @@ def test_extract_text_from_url_naver_blog(mock_requests_extract, mock_naver_blog
     extract_text_from_url("https://example.com/not-naver-blog")
     mock_requests_extract.assert_called_once()
 
+@patch('app.extractor.extract_text_with_requests')
+def test_extract_text_from_url_uses_artifact(mock_requests_extract):
+    """렌더링된 artifact가 있으면 다시 요청하지 않고 그 HTML을 사용하는지 테스트"""
+    artifact = PageArtifact(
+        url="https://example.com",
+        final_url="https://example.com",
+        headers={"content-type": "text/html"},
+        html="<html><body><script>var a;</script><p>Rendered content.</p></body></html>",
+    )
+
+    content_type, text = extract_text_from_url("https://example.com", artifact)
+    assert content_type == "text/html"
+    assert text == "Rendered content."
+    mock_requests_extract.assert_not_called()
+
 # [수정] Mock 텍스트의 길이를 100자 이상으로 늘려 조건문을 통과하도록 합니다.
 def test_extract_main_content_unstructured_success():
     """structure_detector.py의 주력 로직(unstructured) 테스트"""
@@ -0,0 +1,53 @@
+# tests/test_fetcher.py
+
+import pytest
+from unittest.mock import patch, MagicMock
+from app.fetcher import fetch_page, PageArtifact
+
+def _mock_pool(mock_get_browser_pool, mock_page):
+    mock_get_browser_pool.return_value.page.return_value.__enter__.return_value = mock_page
+
+@patch('app.fetcher.get_browser_pool')
+def test_fetch_page_webpage(mock_get_browser_pool):
+    """웹페이지를 한 번 로드하여 HTML과 스크린샷을 함께 반환하는지 테스트"""
+    mock_page = MagicMock()
+    mock_page.url = "https://example.com/final"
+    mock_page.goto.return_value = MagicMock(status=200, headers={"content-type": "text/html; charset=utf-8"})
+    mock_page.content.return_value = "<html><body>본문</body></html>"
+    mock_page.screenshot.return_value = b"screenshot_bytes"
+    _mock_pool(mock_get_browser_pool, mock_page)
+
+    artifact = fetch_page("https://example.com")
+
+    mock_page.goto.assert_called_once()
+    assert artifact.final_url == "https://example.com/final"
+    assert artifact.status == 200
+    assert artifact.content_type.startswith("text/html")
+    assert artifact.html == "<html><body>본문</body></html>"
+    assert artifact.screenshot == b"screenshot_bytes"
+    assert artifact.is_image is False
+
+@patch('app.fetcher.get_browser_pool')
+def test_fetch_page_image(mock_get_browser_pool):
+    """이미지 URL은 스크린샷 없이 원본 바이트만 보관하는지 테스트"""
+    mock_response = MagicMock(status=200, headers={"content-type": "image/jpeg"})
+    mock_response.body.return_value = b"image_bytes"
+    mock_page = MagicMock()
+    mock_page.goto.return_value = mock_response
+    _mock_pool(mock_get_browser_pool, mock_page)
+
+    artifact = fetch_page("https://example.com/image.jpg")
+
+    assert artifact.is_image is True
+    assert artifact.body == b"image_bytes"
+    assert artifact.screenshot is None
+    mock_page.screenshot.assert_not_called()
+
+@patch('app.fetcher.get_browser_pool')
+def test_fetch_page_failure(mock_get_browser_pool):
+    """페이지 로드에 실패하면 None을 반환하는지 테스트"""
+    mock_page = MagicMock()
+    mock_page.goto.side_effect = Exception("net::ERR_NAME_NOT_RESOLVED")
+    _mock_pool(mock_get_browser_pool, mock_page)
+
+    assert fetch_page("https://invalid-url.com") is None
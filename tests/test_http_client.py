@@ -0,0 +1,118 @@
+# tests/test_http_client.py
+
+import os
+import asyncio
+import threading
+import httpx
+import pytest
+from app import http_client
+
+@pytest.fixture
+def mock_transport():
+    """실제 네트워크 대신 요청 횟수를 세는 MockTransport를 공유 클라이언트에 연결"""
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, str(request.url)))
+        return httpx.Response(200, headers={"Content-Type": "Image/PNG"}, content=b"body")
+
+    http_client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    http_client.client_pid = os.getpid()
+    http_client.clear_head_cache()
+    yield calls
+    http_client.close_http_client()
+    http_client.clear_head_cache()
+
+def test_head_is_memoized(mock_transport):
+    """같은 URL의 HEAD 요청은 한 번만 보내고 결과를 재사용하는지 테스트"""
+    assert http_client.get_content_type("https://example.com/a.png") == "image/png"
+    assert http_client.get_content_type("https://example.com/a.png") == "image/png"
+    http_client.head("https://example.com/b.png")
+
+    assert mock_transport == [("HEAD", "https://example.com/a.png"), ("HEAD", "https://example.com/b.png")]
+
+def test_head_single_flight_across_threads(mock_transport):
+    """여러 스레드가 동시에 같은 URL을 요청해도 HEAD는 한 번만 보내는지 테스트"""
+    threads = [threading.Thread(target=http_client.head, args=("https://example.com/a.png",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(mock_transport) == 1
+
+def test_head_failure_is_not_cached():
+    """HEAD 요청이 실패하면 캐시에 남기지 않고 다음 호출에서 다시 시도하는지 테스트"""
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, headers={"Content-Type": "text/html"})
+
+    http_client.client = httpx.Client(transport=httpx.MockTransport(handler))
+    http_client.client_pid = os.getpid()
+    http_client.clear_head_cache()
+    try:
+        with pytest.raises(httpx.ConnectError):
+            http_client.head("https://example.com")
+        assert http_client.get_content_type("https://example.com") == "text/html"
+        assert len(attempts) == 2
+    finally:
+        http_client.close_http_client()
+        http_client.clear_head_cache()
+
+def test_head_cached_before_lock_released(mock_transport, monkeypatch):
+    """URL별 락을 없애는 시점에는 이미 캐시에 저장되어 있어, 뒤늦게 온 요청이 HEAD를 다시 보내지 않는지 테스트"""
+    cached_at_pop = []
+
+    class RecordingLocks(dict):
+        def pop(self, url, default=None):
+            cached_at_pop.append(url in http_client._head_cache)
+            return super().pop(url, default)
+
+    monkeypatch.setattr(http_client, "_head_locks", RecordingLocks())
+    http_client.head("https://example.com/a.png")
+
+    assert cached_at_pop == [True]
+
+def test_host_limits_are_bounded(mock_transport, monkeypatch):
+    """호스트별 동시 요청 제한은 최대 개수까지만 보관하고 오래 사용하지 않은 호스트부터 제거하는지 테스트"""
+    monkeypatch.setattr(http_client, "HTTP_HOST_LIMITS_MAX_ENTRIES", 2)
+    http_client._host_limits.clear()
+    for host in ["a.example.com", "b.example.com", "a.example.com", "c.example.com"]:
+        http_client.get(f"https://{host}/")
+
+    assert list(http_client._host_limits) == ["a.example.com", "c.example.com"]
+
+def test_async_head_single_flight_and_shared_cache():
+    """비동기 클라이언트로 같은 URL을 동시에 요청해도 HEAD는 한 번만 보내고, 동기 head()와 캐시를 공유하는지 테스트"""
+    calls = []
+
+    async def handler(request):
+        calls.append((request.method, str(request.url)))
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, headers={"Content-Type": "Image/PNG"})
+
+    async def run():
+        http_client.async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        http_client.async_client_loop = asyncio.get_running_loop()
+        try:
+            content_types = await asyncio.gather(*(http_client.async_get_content_type("https://example.com/a.png") for _ in range(5)))
+            response = await http_client.async_get("https://example.com/page")
+        finally:
+            await http_client.close_async_http_client()
+        return content_types, response
+
+    http_client.clear_head_cache()
+    try:
+        content_types, response = asyncio.run(run())
+        # 동기 head()도 비동기 요청이 저장한 응답을 그대로 사용
+        assert http_client.get_content_type("https://example.com/a.png") == "image/png"
+    finally:
+        http_client.clear_head_cache()
+
+    assert content_types == ["image/png"] * 5
+    assert response.status_code == 200
+    assert calls == [("HEAD", "https://example.com/a.png"), ("GET", "https://example.com/page")]
@@ -1,6 +1,8 @@
 # tests/test_image_handler.py
 
+import io
 import pytest
+from PIL import Image
 from unittest.mock import patch, MagicMock
 from app.image_handler import process_image_tip, get_ocr_reader
 
@@ -18,10 +20,12 @@ def test_get_ocr_reader_initialization(mock_reader):
     # easyocr.Reader는 한 번만 호출되어야 함
     mock_reader.assert_called_once_with(['ko', 'en'])
 
+@patch('app.image_handler.get_ocr_cache', return_value=None)
+@patch('app.image_handler.load_ocr_image')
 @patch('app.image_handler.extract_text_from_image', return_value="이미지에서 추출된 텍스트입니다.")
 @patch('app.image_handler.clean_text', return_value="불용어 제거된 텍스트")
 @patch('app.image_handler.summarize_and_tag')
-def test_process_image_tip(mock_summarize, mock_clean, mock_extract):
+def test_process_image_tip(mock_summarize, mock_clean, mock_extract, mock_load, mock_get_cache):
     """이미지 처리 파이프라인 전체가 올바르게 호출되는지 테스트"""
     mock_summarize.return_value = {
         "title": "이미지 제목",
@@ -32,11 +36,72 @@ def test_process_image_tip(mock_summarize, mock_clean, mock_extract):
     image_path = "path/to/image.jpg"
     result = process_image_tip(image_path)
     
-    # 각 함수가 올바른 인자와 함께 호출되었는지 확인
-    mock_extract.assert_called_once_with(image_path)
+    # 각 함수가 올바른 인자와 함께 호출되었는지 확인 (이미지는 한 번만 읽어서 전달)
+    mock_load.assert_called_once_with(image_path)
+    mock_extract.assert_called_once_with(mock_load.return_value)
     mock_clean.assert_called_once_with("이미지에서 추출된 텍스트입니다.")
     mock_summarize.assert_called_once_with("불용어 제거된 텍스트")
     
     # 최종 결과 구조 확인
     assert result["cleaned_text"] == "불용어 제거된 텍스트"
-    assert result["summary_and_tags"]["title"] == "이미지 제목"
\ No newline at end of file
+    assert result["summary_and_tags"]["title"] == "이미지 제목"
+
+@patch('app.image_handler.get_ocr_cache')
+@patch('app.image_handler.load_ocr_image')
+@patch('app.image_handler.extract_text_from_image')
+@patch('app.image_handler.summarize_and_tag', return_value={"title": "제목", "summary": "요약", "tags": []})
+def test_process_image_tip_uses_ocr_cache(mock_summarize, mock_extract, mock_load, mock_get_cache):
+    """OCR 캐시에 같은 이미지의 결과가 있으면 OCR을 건너뛰는지 테스트"""
+    mock_get_cache.return_value.get.return_value = {"raw_text": "캐시된 원문", "cleaned_text": "캐시된 정제 텍스트"}
+
+    result = process_image_tip(b"image_bytes")
+
+    mock_extract.assert_not_called()
+    mock_get_cache.return_value.set.assert_not_called()
+    mock_summarize.assert_called_once_with("캐시된 정제 텍스트")
+    assert result["raw_text"] == "캐시된 원문"
+
+def _png_bytes(width, height):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (255, 255, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def test_load_ocr_image_downscales_large_images():
+    """긴 변이 기준보다 큰 이미지는 비율을 유지하며 줄이는지 테스트"""
+    from app.image_handler import load_ocr_image
+    assert load_ocr_image(_png_bytes(1170, 2532), max_side=1600).shape == (1600, 739, 3)
+    assert load_ocr_image(_png_bytes(400, 300), max_side=1600).shape == (300, 400, 3)
+
+@patch('app.image_handler.OCR_MAX_SIDE', 800)
+def test_load_ocr_image_reads_max_side_at_call_time():
+    """max_side를 주지 않으면 호출 시점의 OCR_MAX_SIDE를 사용하는지 테스트 (벤치마크의 --max-side)"""
+    from app.image_handler import load_ocr_image
+    assert load_ocr_image(_png_bytes(1170, 2532)).shape == (800, 370, 3)
+
+@patch('app.image_handler.get_ocr_reader')
+def test_extract_text_from_images_batches_detection(mock_get_reader):
+    """크기가 다른 이미지도 한 번의 검출 호출로 묶고, 이미지별로 인식 결과를 돌려주는지 테스트"""
+    from app.image_handler import extract_text_from_images
+    mock_reader = mock_get_reader.return_value
+    mock_reader.detect.return_value = ([[[0, 10, 0, 10]], [[0, 20, 0, 20]]], [[], []])
+    mock_reader.recognize.side_effect = [["첫 번째"], ["두 번째", "줄"]]
+
+    texts = extract_text_from_images([_png_bytes(300, 600), _png_bytes(200, 500)])
+
+    mock_reader.detect.assert_called_once()
+    batch = mock_reader.detect.call_args[0][0]
+    assert batch.shape == (2, 600, 300, 3)
+    assert texts == ["첫 번째", "두 번째\n줄"]
+
+@patch('app.image_handler.OCR_MIN_TEXT_DENSITY', 0.05)
+@patch('app.image_handler.get_ocr_reader')
+def test_extract_text_from_images_skips_low_density_regions(mock_get_reader):
+    """글자 밀도가 낮은(빈 배경) 영역은 인식하지 않는지 테스트"""
+    from app.image_handler import extract_text_from_images
+    mock_reader = mock_get_reader.return_value
+    mock_reader.detect.return_value = ([[[0, 50, 0, 50]]], [[]])
+
+    texts = extract_text_from_images([_png_bytes(100, 100)])
+
+    mock_reader.recognize.assert_not_called()
+    assert texts == [""]
@@ -1,17 +1,18 @@
 # tests/test_langchain_pipe.py
 
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
 from app.langchain_pipe import run_langchain_pipeline
 
 @patch('app.langchain_pipe.summarize_and_tag')
-@patch('app.langchain_pipe.PGVector.from_documents')
-@patch('app.langchain_pipe.OpenAIEmbeddings')
+@patch('app.langchain_pipe.get_vector_store_writer')
 @patch('app.langchain_pipe.RecursiveCharacterTextSplitter')
-def test_run_langchain_pipeline_success(mock_splitter, mock_embeddings, mock_pgvector, mock_summarize):
+def test_run_langchain_pipeline_success(mock_splitter, mock_writer, mock_summarize):
     """Langchain 파이프라인 성공 경로 테스트"""
     # 각 Mock 객체의 반환값 설정
-    mock_splitter.return_value.create_documents.return_value = ["doc1", "doc2"]
+    docs = [MagicMock(page_content="doc1"), MagicMock(page_content="doc2")]
+    mock_splitter.return_value.create_documents.return_value = docs
     mock_summarize.return_value = {
         "title": "AI 제목",
         "summary": "AI 요약",
@@ -23,8 +24,8 @@ def test_run_langchain_pipeline_success(mock_splitter, mock_embeddings, mock_pgv
 
     # 각 주요 함수가 호출되었는지 확인
     mock_splitter.return_value.create_documents.assert_called_once_with([raw_text])
-    mock_pgvector.assert_called_once()
-    mock_summarize.assert_called_once_with(raw_text)
+    mock_writer.return_value.add_documents.assert_called_once_with(docs)
+    mock_summarize.assert_called_once_with(raw_text, ["doc1", "doc2"])
 
     # 결과 확인
     assert result["chunks"] == 2
@@ -32,16 +33,48 @@ def test_run_langchain_pipeline_success(mock_splitter, mock_embeddings, mock_pgv
     assert result["tags"] == ["AI", "태그"]
 
 @patch('app.langchain_pipe.summarize_and_tag', side_effect=Exception("API Error"))
-@patch('app.langchain_pipe.PGVector.from_documents')
-def test_run_langchain_pipeline_summarize_fails(mock_pgvector, mock_summarize):
+@patch('app.langchain_pipe.get_vector_store_writer')
+def test_run_langchain_pipeline_summarize_fails(mock_writer, mock_summarize):
     """AI 요약/태그 생성 실패 시 예외 처리 테스트"""
     raw_text = "이것은 긴 원본 텍스트입니다."
     result = run_langchain_pipeline(raw_text)
 
     # 요약은 실패했지만, PGVector 저장 로직은 정상 호출되어야 함
-    mock_pgvector.assert_called_once()
+    mock_writer.return_value.add_documents.assert_called_once()
     
     # 실패 시 기본값들이 반환되는지 확인
     assert result["summary"] == ""
     assert result["title"] == ""
-    assert result["tags"] == []
\ No newline at end of file
+    assert result["tags"] == []
+
+@patch('app.langchain_pipe.summarize_and_tag')
+@patch('app.langchain_pipe.get_vector_store_writer')
+def test_run_langchain_pipeline_runs_embedding_and_summary_concurrently(mock_writer, mock_summarize):
+    """임베딩 저장과 요약이 동시에 실행되는지 테스트"""
+    embedding = threading.Event()
+
+    def add_documents(docs):
+        embedding.set()
+        return ["id"]
+
+    # 순차 실행이라면 요약이 임베딩 시작을 기다리다가 시간 초과됨
+    mock_writer.return_value.add_documents.side_effect = add_documents
+    mock_summarize.side_effect = lambda text, chunks: {"title": "제목", "summary": "요약", "tags": []} if embedding.wait(timeout=5) else {}
+
+    result = run_langchain_pipeline("이것은 긴 원본 텍스트입니다.")
+
+    assert result["title"] == "제목"
+    assert result["summary"] == "요약"
+
+def test_without_overlap_sends_each_part_once():
+    """splitter의 청크 겹침(chunk_overlap)을 빼면 본문이 한 번씩만 남는지 테스트"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from app.langchain_pipe import without_overlap
+    raw_text = " ".join(f"문장{i:03d}입니다." for i in range(300))
+    chunks = [doc.page_content for doc in RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50).create_documents([raw_text])]
+
+    sections = without_overlap(raw_text, chunks)
+
+    assert sum(len(chunk) for chunk in chunks) > len(raw_text)
+    joined = " ".join(section.strip() for section in sections)
+    assert all(joined.count(f"문장{i:03d}입니다.") == 1 for i in range(300))
@@ -0,0 +1,157 @@
+# tests/test_llm_client.py
+
+import os
+import json
+import asyncio
+import threading
+import time
+import pytest
+import openai
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+from app import llm_client
+from app.llm_client import TokenBucket, chat_completion, async_chat_completion
+
+def _completion_body(content="응답", prompt_tokens=12, completion_tokens=3):
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-3.5-turbo",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                  "total_tokens": prompt_tokens + completion_tokens},
+    }
+
+class MockOpenAIServer:
+    """/v1/chat/completions에 미리 정한 응답(상태 코드, 본문, 헤더)을 차례로 돌려주는 로컬 모의 서버"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                server.requests.append((self.path, json.loads(body)))
+                status, payload, headers = server.responses.pop(0) if server.responses else (200, _completion_body(), {})
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+@pytest.fixture
+def mock_server():
+    server = MockOpenAIServer()
+    # 모의 서버에는 실제 키가 필요 없지만, SDK는 키가 없으면 클라이언트를 만들지 않음
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test"}), \
+         patch('app.llm_client.OPENAI_BASE_URL', server.base_url), \
+         patch('app.llm_client.LLM_BACKOFF_BASE', 0.01), \
+         patch('app.llm_client.request_bucket', TokenBucket(0)), \
+         patch('app.llm_client.token_bucket', TokenBucket(0)):
+        llm_client.client = None
+        llm_client.async_client = None
+        llm_client.metrics.reset()
+        yield server
+    llm_client.client = None
+    llm_client.async_client = None
+    server.close()
+
+MESSAGES = [{"role": "user", "content": "요약해 주세요"}]
+
+def test_chat_completion_against_mock_server(mock_server):
+    """모의 서버로 요청을 보내고 응답과 토큰 사용량을 기록하는지 테스트"""
+    response = chat_completion(MESSAGES, model="gpt-3.5-turbo")
+
+    assert response.choices[0].message.content == "응답"
+    path, body = mock_server.requests[0]
+    assert path == "/v1/chat/completions"
+    assert body["messages"] == MESSAGES
+    snapshot = llm_client.metrics.snapshot()
+    assert snapshot["requests"] == 1
+    assert snapshot["prompt_tokens"] == 12 and snapshot["completion_tokens"] == 3
+
+def test_chat_completion_retries_429_and_5xx(mock_server):
+    """429/5xx 응답은 백오프 후 재시도해서 성공하는지 테스트"""
+    error = {"error": {"message": "rate limited", "type": "requests"}}
+    mock_server.responses = [(429, error, {"retry-after": "0"}), (503, error, {}), (200, _completion_body("재시도 성공"), {})]
+
+    response = chat_completion(MESSAGES, model="gpt-3.5-turbo")
+
+    assert response.choices[0].message.content == "재시도 성공"
+    assert len(mock_server.requests) == 3
+    assert llm_client.metrics.snapshot()["retries"] == 2
+
+@patch('app.llm_client.LLM_MAX_RETRIES', 1)
+def test_chat_completion_gives_up_after_max_retries(mock_server):
+    """재시도 횟수를 넘기면 오류를 그대로 올리고 실패로 기록하는지 테스트"""
+    error = {"error": {"message": "rate limited", "type": "requests"}}
+    mock_server.responses = [(429, error, {}), (429, error, {})]
+
+    with pytest.raises(openai.RateLimitError):
+        chat_completion(MESSAGES, model="gpt-3.5-turbo")
+    assert llm_client.metrics.snapshot()["errors"] == 1
+
+def test_chat_completion_does_not_retry_client_errors(mock_server):
+    """400 같은 요청 오류는 재시도하지 않는지 테스트"""
+    mock_server.responses = [(400, {"error": {"message": "bad request", "type": "invalid_request_error"}}, {})]
+
+    with pytest.raises(openai.BadRequestError):
+        chat_completion(MESSAGES, model="gpt-3.5-turbo")
+    assert len(mock_server.requests) == 1
+
+def test_failed_call_refunds_token_reservation(mock_server):
+    """최종적으로 실패한 요청이 미리 잡아 둔 토큰을 토큰 제한에 돌려주는지 테스트"""
+    mock_server.responses = [(400, {"error": {"message": "bad request", "type": "invalid_request_error"}}, {})]
+    bucket = TokenBucket(60_000)
+
+    with patch('app.llm_client.token_bucket', bucket), pytest.raises(openai.BadRequestError):
+        chat_completion(MESSAGES, model="gpt-3.5-turbo")
+    assert bucket.available == pytest.approx(bucket.capacity)
+
+def test_async_chat_completion_retries(mock_server):
+    """비동기 버전도 모의 서버에 요청하고 재시도하는지 테스트"""
+    mock_server.responses = [(500, {"error": {"message": "server error", "type": "server"}}, {})]
+
+    async def run():
+        try:
+            return await async_chat_completion(MESSAGES, model="gpt-3.5-turbo")
+        finally:
+            await llm_client.close_async_openai_client()
+
+    response = asyncio.run(run())
+    assert response.choices[0].message.content == "응답"
+    assert len(mock_server.requests) == 2
+
+def test_token_bucket_waits_when_empty():
+    """분당 제한을 다 쓰면 채워질 때까지 기다릴 시간을 돌려주는지 테스트"""
+    bucket = TokenBucket(60)  # 초당 1
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+
+    # 실제 사용량이 적었으면 돌려받아 다시 바로 보낼 수 있음
+    bucket.refund(10)
+    assert bucket.reserve(5) == 0.0
+
+def test_backoff_uses_jitter_and_cap():
+    """백오프가 지수적으로 커지되 최대값을 넘지 않고, Retry-After를 따르는지 테스트"""
+    error = Exception("no response")
+    with patch('app.llm_client.LLM_BACKOFF_BASE', 1.0), patch('app.llm_client.LLM_BACKOFF_MAX', 4.0):
+        assert all(0 <= llm_client._backoff(1, error) <= 2.0 for _ in range(50))
+        assert all(0 <= llm_client._backoff(10, error) <= 4.0 for _ in range(50))
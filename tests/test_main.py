@@ -1,5 +1,6 @@
 # tests/test_main_endpoints.py
 
+import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from app.main import app
@@ -17,7 +18,8 @@ def test_get_summary_result_success(mock_async_result):
         "summary": "테스트 요약",
         "title": "테스트 제목",
         "tags": ["태그1"],
-        "thumbnail_url": "https://example.com/thumb.png"
+        "thumbnail_url": "https://example.com/thumb.png",
+        "subtitle_coverage": 0.8
     }
     mock_async_result.return_value = mock_instance
     
@@ -26,6 +28,7 @@ def test_get_summary_result_success(mock_async_result):
     data = response.json()
     assert data["summary"] == "테스트 요약"
     assert data["title"] == "테스트 제목"
+    assert data["subtitle_coverage"] == 0.8
 
 @patch('app.main.AsyncResult')
 def test_get_summary_result_pending(mock_async_result):
@@ -51,18 +54,106 @@ def test_get_summary_result_failure(mock_async_result):
     assert response.status_code == 500
     assert "작업이 실패했습니다" in response.json()["detail"]
 
-@patch('app.main.process_url_task.delay')
-def test_async_index(mock_delay):
+@patch('app.main.claim_inflight', return_value=None)
+@patch('app.main.get_cached_result', return_value=None)
+@patch('app.main.async_canonicalize_url', return_value="https://example.com/")
+@patch('app.main.async_detect_queue', return_value="web")
+@patch('app.main.celery_app.send_task')
+def test_async_index(mock_send_task, mock_detect_queue, mock_canonicalize, mock_get_cached, mock_claim):
     """URL을 받아 비동기 작업을 시작하는지 테스트"""
     mock_task = MagicMock()
     mock_task.id = "test_task_id"
-    mock_delay.return_value = mock_task
+    mock_send_task.return_value = mock_task
 
     response = client.post("/async-index/", json={"url": "https://example.com"})
     
     assert response.status_code == 200
     assert response.json() == {"task_id": "test_task_id"}
-    mock_delay.assert_called_once_with("https://example.com")
+    mock_send_task.assert_called_once()
+    args, kwargs = mock_send_task.call_args
+    assert args == ("app.summarizer.process_web_task",)
+    assert kwargs["args"] == ["https://example.com"]
+    assert kwargs["kwargs"] == {"canonical_url": "https://example.com/"}
+
+@patch('app.main.release_inflight')
+@patch('app.main.claim_inflight', return_value=None)
+@patch('app.main.get_cached_result', return_value=None)
+@patch('app.main.async_canonicalize_url', return_value="https://example.com/")
+@patch('app.main.async_detect_queue', return_value="web")
+@patch('app.main.celery_app.send_task', side_effect=ConnectionError("broker down"))
+def test_async_index_releases_claim_when_enqueue_fails(mock_send_task, mock_detect_queue, mock_canonicalize, mock_get_cached, mock_claim, mock_release):
+    """큐에 넣지 못하면 진행 중 표시를 해제해 다른 요청이 없는 task_id를 받지 않는지 테스트"""
+    with pytest.raises(ConnectionError):
+        client.post("/async-index/", json={"url": "https://example.com"})
+
+    task_id = mock_claim.call_args.args[1]
+    mock_release.assert_called_once_with("https://example.com/", task_id)
+
+@patch('app.main.celery_app.send_task')
+def test_async_index_rejects_malformed_url(mock_send_task):
+    """형식이 잘못된 URL은 500이 아니라 422로 거절하고 작업을 만들지 않는지 테스트"""
+    response = client.post("/async-index/", json={"url": "http://[::1"})
+
+    assert response.status_code == 422
+    mock_send_task.assert_not_called()
+
+@patch('app.main.celery_app')
+@patch('app.main.get_cached_result', return_value={"title": "캐시된 제목"})
+@patch('app.main.async_canonicalize_url', return_value="https://example.com/")
+def test_async_index_cache_hit(mock_canonicalize, mock_get_cached, mock_celery_app):
+    """캐시된 결과가 있으면 작업을 만들지 않고 완료된 task_id를 반환하는지 테스트"""
+    response = client.post("/async-index/", json={"url": "https://example.com/?utm_source=x"})
+
+    assert response.status_code == 200
+    task_id = response.json()["task_id"]
+    mock_celery_app.backend.store_result.assert_called_once_with(task_id, {"title": "캐시된 제목"}, "SUCCESS")
+    mock_celery_app.send_task.assert_not_called()
+
+@patch('app.main.claim_inflight', return_value="running_task_id")
+@patch('app.main.get_cached_result', return_value=None)
+@patch('app.main.async_canonicalize_url', return_value="https://example.com/")
+@patch('app.main.celery_app.send_task')
+def test_async_index_single_flight(mock_send_task, mock_canonicalize, mock_get_cached, mock_claim):
+    """같은 URL의 작업이 진행 중이면 기존 task_id를 공유하는지 테스트"""
+    response = client.post("/async-index/", json={"url": "https://example.com"})
+
+    assert response.json() == {"task_id": "running_task_id"}
+    mock_send_task.assert_not_called()
+
+@patch('app.main.invalidate', return_value=True)
+def test_invalidate_cache(mock_invalidate):
+    """캐시 무효화 엔드포인트 테스트"""
+    response = client.post("/cache/invalidate", json={"url": "https://example.com"})
+
+    assert response.json() == {"invalidated": True}
+    mock_invalidate.assert_called_once_with("https://example.com")
+
+@patch('app.main.submit_batch', return_value={"group_id": "batch1", "submitted": 2})
+def test_batch_index(mock_submit_batch):
+    """배치 등록 엔드포인트가 배치 ID를 반환하는지 테스트"""
+    urls = ["https://example.com/a", "https://example.com/b"]
+    response = client.post("/batch-index/", json={"urls": urls})
+
+    assert response.status_code == 200
+    assert response.json()["group_id"] == "batch1"
+    mock_submit_batch.assert_called_once_with(urls)
+
+@patch('app.main.BATCH_INDEX_MAX_URLS', 2)
+@patch('app.main.submit_batch')
+def test_batch_index_too_many_urls(mock_submit_batch):
+    """최대 개수를 넘는 URL은 거부하는지 테스트"""
+    response = client.post("/batch-index/", json={"urls": ["https://example.com/a"] * 3})
+
+    assert response.status_code == 400
+    mock_submit_batch.assert_not_called()
+
+@patch('app.main.get_batch_status', return_value=None)
+def test_batch_status_not_found(mock_get_batch_status):
+    """없는 배치는 404, limit은 최대값으로 제한되는지 테스트"""
+    response = client.get("/batch-status/missing?offset=10&limit=100000")
+
+    assert response.status_code == 404
+    mock_get_batch_status.assert_called_once_with("missing", 10, 200)
 
 @patch('app.main.AsyncResult')
 def test_get_status(mock_async_result):
@@ -78,7 +169,7 @@ def test_get_status(mock_async_result):
     assert response.json()["result"] is None
 
 
-@patch('app.main.generate_thumbnail', return_value=("https://youtube.com/thumb.jpg", "redirect"))
+@patch('app.thumbnail_handler.generate_thumbnail', return_value=("https://youtube.com/thumb.jpg", "redirect"))
 def test_create_thumbnail_redirect(mock_generate_thumbnail):
     """썸네일 생성 시 redirect를 잘 처리하는지 테스트"""
     response = client.post("/thumbnail", json={"url": "https://youtube.com"})
@@ -88,4 +179,96 @@ def test_create_thumbnail_redirect(mock_generate_thumbnail):
     redirect_response = response.history[0]  # 첫 번째 리다이렉션 응답을 가져옴
 
     assert redirect_response.status_code == 307  # 리다이렉션 응답의 상태 코드가 307인지 확인
-    assert redirect_response.headers["location"] == "https://youtube.com/thumb.jpg"
\ No newline at end of file
+    assert redirect_response.headers["location"] == "https://youtube.com/thumb.jpg"
+
+@patch('app.main.AsyncResult')
+@patch('app.main.THUMBNAIL_MAX_CONCURRENCY', 4)
+def test_task_status_latency_flat_during_thumbnail_load(mock_async_result):
+    """썸네일 20개를 동시에 렌더링하는 동안에도 /task-status 응답 지연이 늘어나지 않는지 테스트"""
+    import asyncio
+    import time
+    import httpx
+    from app import main
+
+    mock_async_result.return_value.status = "PENDING"
+    mock_async_result.return_value.ready.return_value = False
+
+    def slow_render(url):
+        time.sleep(0.3)  # 동기 Playwright 렌더링을 흉내냄
+        return b"png_bytes", "image"
+
+    async def run_load():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            renders = [asyncio.create_task(http.post("/thumbnail", json={"url": f"https://example.com/{i}"})) for i in range(20)]
+            await asyncio.sleep(0.05)
+
+            latencies = []
+            while not all(task.done() for task in renders):
+                start = time.perf_counter()
+                response = await http.get("/task-status/some_task_id")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                await asyncio.sleep(0.05)
+            return await asyncio.gather(*renders), latencies
+
+    main.thumbnail_executor = None
+    try:
+        with patch('app.thumbnail_handler.generate_thumbnail', side_effect=slow_render):
+            responses, latencies = asyncio.run(run_load())
+    finally:
+        if main.thumbnail_executor is not None:
+            main.thumbnail_executor.shutdown()
+            main.thumbnail_executor = None
+
+    assert all(response.status_code == 200 for response in responses)
+    # 렌더링 20개는 4개씩 약 1.5초가 걸리지만, 상태 조회는 렌더링 한 번(0.3초)도 기다리지 않아야 함
+    assert len(latencies) >= 5
+    assert max(latencies) < 0.2
+
+
+@patch('app.main.celery_app.send_task')
+def test_ocr_batch(mock_send_task):
+    """여러 이미지를 한 번에 업로드하면 OCR 워커에 보내고 파일별 OCR 결과를 반환하는지 테스트"""
+    import base64
+    mock_send_task.return_value.get.return_value = ["첫 번째 이미지", "두 번째 이미지"]
+    files = [("files", ("a.png", b"image_a", "image/png")), ("files", ("b.png", b"image_b", "image/png"))]
+    response = client.post("/ocr/batch", files=files)
+
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"filename": "a.png", "text": "첫 번째 이미지"},
+        {"filename": "b.png", "text": "두 번째 이미지"},
+    ]
+    args, kwargs = mock_send_task.call_args
+    assert args == ("app.summarizer.ocr_images_task",)
+    assert [base64.b64decode(image) for image in kwargs["args"][0]] == [b"image_a", b"image_b"]
+
+@patch('app.main.celery_app.send_task')
+def test_ocr_batch_timeout(mock_send_task):
+    """OCR 워커가 제한 시간 안에 응답하지 않으면 504를 반환하는지 테스트"""
+    from celery.exceptions import TimeoutError as CeleryTimeoutError
+    mock_send_task.return_value.get.side_effect = CeleryTimeoutError()
+    response = client.post("/ocr/batch", files=[("files", ("a.png", b"image_a", "image/png"))])
+
+    assert response.status_code == 504
+
+
+def test_shutdown_closes_async_llm_client():
+    """웹 프로세스 종료 시 불러온 비동기 LLM 클라이언트를 닫는지 테스트"""
+    from unittest.mock import AsyncMock
+    from app import llm_client
+    with patch.object(llm_client, 'close_async_openai_client', new_callable=AsyncMock) as mock_close:
+        with TestClient(app):
+            pass
+    mock_close.assert_awaited_once()
+
+
+def test_web_process_does_not_import_worker_modules():
+    """웹 프로세스(app.main) import 시 OCR/음성 인식/LangChain 등 워커 전용 패키지를 불러오지 않는지 테스트"""
+    from benchmarks.bench_import_time import measure_import, HEAVY_MODULES
+    result = measure_import("app.main")
+
+    assert [name for name in HEAVY_MODULES if name in result["modules"]] == []
+    # 변경 전에는 torch/easyocr/whisper 로딩으로 약 10초, 900MB가 들었음
+    assert result["rss_mb"] < 250
@@ -0,0 +1,150 @@
+# tests/test_ocr_cache.py
+
+import io
+import random
+import redis
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+from app.ocr_cache import OcrResultCache
+
+class FakeRedis:
+    """테스트용 최소 redis 대체 객체 (문자열/집합/정렬 집합 일부와 pipeline)."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+        self.zset = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(m.encode() for m in members)
+
+    def srem(self, key, *members):
+        self.sets.get(key, set()).difference_update(m.encode() for m in members)
+
+    def smembers(self, key):
+        return set(self.sets.get(key, set()))
+
+    def zadd(self, name, mapping):
+        self.zset.update(mapping)
+
+    def zcard(self, name):
+        return len(self.zset)
+
+    def zrange(self, name, start, end):
+        return [key.encode() for key, _ in sorted(self.zset.items(), key=lambda item: item[1])][start:end + 1]
+
+    def zrem(self, name, *members):
+        for member in members:
+            self.zset.pop(member, None)
+
+    def pipeline(self, transaction=False):
+        fake = self
+
+        class Pipe:
+            def __init__(self):
+                self.results = []
+
+            def __getattr__(self, name):
+                def call(*args, **kwargs):
+                    self.results.append(getattr(fake, name)(*args, **kwargs))
+                return call
+
+            def execute(self):
+                return self.results
+
+        return Pipe()
+
+def make_screenshot(seed=0, size=(390, 844)):
+    """줄마다 단어 블록의 개수와 길이가 다른 가짜 휴대폰 스크린샷"""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    for y in range(40, size[1] - 40, 28):
+        x = 16
+        while x < size[0] - 60:
+            width = rng.randint(20, 70)
+            draw.rectangle((x, y, x + width, y + 14), fill=(20, 20, 20))
+            x += width + rng.randint(8, 16)
+    return image
+
+def reencode(image, fmt="JPEG", scale=1.0):
+    if scale != 1.0:
+        image = image.resize((int(image.width * scale), int(image.height * scale)))
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, quality=70)
+    return Image.open(io.BytesIO(buffer.getvalue()))
+
+@patch('app.ocr_cache.get_redis')
+def test_near_duplicate_hits_cache(mock_get_redis):
+    """재인코딩/리사이즈된 같은 스크린샷은 캐시에 적중하고, 다른 스크린샷은 적중하지 않는지 테스트"""
+    mock_get_redis.return_value = FakeRedis()
+    cache = OcrResultCache()
+    original = make_screenshot()
+
+    cache.set(cache.hash_image(original), "원문", "정제된 텍스트")
+
+    assert cache.get(cache.hash_image(original)) == {"raw_text": "원문", "cleaned_text": "정제된 텍스트"}
+    assert cache.get(cache.hash_image(reencode(original, scale=0.6)))["cleaned_text"] == "정제된 텍스트"
+    assert cache.get(cache.hash_image(make_screenshot(seed=1))) is None
+
+    metrics = cache.metrics()
+    assert (metrics["hits"], metrics["near_hits"], metrics["misses"]) == (2, 1, 1)
+
+def make_text_page(lines, size=(390, 844)):
+    """상단 바와 글자 줄 배치가 같은 가짜 팁 화면 (글자만 lines로 바뀜)"""
+    image = Image.new("RGB", size, (250, 250, 250))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, size[0], 60), fill=(30, 90, 200))
+    for i, line in enumerate(lines):
+        draw.text((16, 90 + i * 22), line, fill=(20, 20, 20))
+    return image
+
+@patch('app.ocr_cache.get_redis')
+def test_same_layout_different_text_misses(mock_get_redis):
+    """배치가 같고 글자 한 줄만 다른 스크린샷은 기본 설정에서 서로의 OCR 결과를 받지 않는지 테스트"""
+    mock_get_redis.return_value = FakeRedis()
+    cache = OcrResultCache()
+    lines = [f"Tip {i}: save 10% on groceries by buying in bulk" for i in range(30)]
+    edited = list(lines)
+    edited[3] = "Tip 3: never pay full price for electronics!!"
+
+    cache.set(cache.hash_image(make_text_page(lines)), "원문", "정제된 텍스트")
+
+    assert cache.get(cache.hash_image(make_text_page(edited))) is None
+    assert cache.metrics()["misses"] == 1
+
+@patch('app.ocr_cache.get_redis')
+def test_lru_eviction(mock_get_redis):
+    """최대 개수를 넘으면 가장 오래 사용하지 않은 항목이 제거되는지 테스트"""
+    mock_get_redis.return_value = FakeRedis()
+    cache = OcrResultCache(max_distance=0, max_entries=2)
+    hashes = [cache.hash_image(make_screenshot(seed=i)) for i in range(3)]
+
+    with patch('app.ocr_cache.time.time', side_effect=[1.0, 2.0, 3.0, 4.0]):
+        cache.set(hashes[0], "0", "0")
+        cache.set(hashes[1], "1", "1")
+        cache.get(hashes[0])  # 0번을 최근 사용으로 갱신
+        cache.set(hashes[2], "2", "2")
+
+    assert cache.get(hashes[1]) is None
+    assert cache.get(hashes[0])["raw_text"] == "0"
+    assert cache.get(hashes[2])["raw_text"] == "2"
+
+@patch('app.ocr_cache.get_redis')
+def test_redis_failure_is_a_miss(mock_get_redis):
+    """Redis 장애 시 캐시를 건너뛰고 미스로 집계하는지 테스트"""
+    mock_get_redis.return_value.get.side_effect = redis.ConnectionError("down")
+    cache = OcrResultCache()
+
+    assert cache.get(cache.hash_image(make_screenshot())) is None
+    assert cache.metrics()["misses"] == 1
@@ -0,0 +1,146 @@
+# tests/test_result_cache.py
+
+import json
+import pytest
+import httpx
+from unittest.mock import patch, MagicMock
+from app.result_cache import canonicalize_url, get_cached_result, set_cached_result, claim_inflight, invalidate
+
+def test_canonicalize_url_youtube():
+    """유튜브 URL은 영상 ID 기준으로 정규화되는지 테스트"""
+    expected = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    assert canonicalize_url("https://youtu.be/dQw4w9WgXcQ?si=abc", follow_redirects=False) == expected
+    assert canonicalize_url("https://m.youtube.com/watch?v=dQw4w9WgXcQ&feature=share", follow_redirects=False) == expected
+
+def test_canonicalize_url_strips_tracking_params():
+    """추적용 파라미터와 프래그먼트가 제거되고 쿼리가 정렬되는지 테스트"""
+    url = "HTTPS://Example.com:443/post?b=2&utm_source=kakao&a=1&fbclid=xyz#section"
+    assert canonicalize_url(url, follow_redirects=False) == "https://example.com/post?a=1&b=2"
+
+@patch('app.result_cache.http_client.head')
+def test_canonicalize_url_follows_redirects(mock_head):
+    """단축 URL은 리다이렉트된 최종 URL로 정규화되는지 테스트"""
+    mock_head.return_value = MagicMock(url="https://example.com/article?utm_medium=social")
+    assert canonicalize_url("https://bit.ly/abc", follow_redirects=True) == "https://example.com/article"
+
+@patch('app.result_cache.http_client.async_head')
+def test_async_canonicalize_url_follows_redirects(mock_async_head):
+    """비동기 버전도 비동기 HTTP 클라이언트로 리다이렉트를 따라가 같은 URL로 정규화하는지 테스트"""
+    import asyncio
+    from app.result_cache import async_canonicalize_url
+    mock_async_head.return_value = MagicMock(url="https://youtu.be/dQw4w9WgXcQ")
+
+    assert asyncio.run(async_canonicalize_url("https://bit.ly/abc", follow_redirects=True)) == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    mock_async_head.assert_awaited_once()
+
+def test_cached_result_roundtrip():
+    """결과 저장 후 같은 키로 조회되는지 테스트"""
+    store = {}
+    mock_redis = MagicMock()
+    mock_redis.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value)
+    mock_redis.get.side_effect = lambda key: store.get(key)
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        set_cached_result("https://example.com/", {"title": "제목"}, ttl=60)
+        assert get_cached_result("https://example.com/") == {"title": "제목"}
+        assert get_cached_result("https://example.com/other") is None
+
+def test_claim_inflight():
+    """진행 중 작업이 없으면 등록하고, 있으면 기존 task_id를 반환하는지 테스트"""
+    mock_redis = MagicMock()
+    mock_redis.set.side_effect = [True, False]
+    mock_redis.get.return_value = b"first_task"
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        assert claim_inflight("https://example.com/", "first_task") is None
+        assert claim_inflight("https://example.com/", "second_task") == "first_task"
+
+def test_cache_fails_open_when_redis_unavailable():
+    """Redis 오류 시 캐시를 건너뛰고 파이프라인을 막지 않는지 테스트"""
+    import redis
+    mock_redis = MagicMock()
+    mock_redis.get.side_effect = redis.ConnectionError("down")
+    mock_redis.set.side_effect = redis.ConnectionError("down")
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        assert get_cached_result("https://example.com/") is None
+        assert claim_inflight("https://example.com/", "task") is None
+
+def test_invalidate():
+    """캐시 무효화 시 정규화된 키가 삭제되는지 테스트"""
+    mock_redis = MagicMock()
+    mock_redis.delete.return_value = 1
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        assert invalidate("https://youtu.be/dQw4w9WgXcQ") is True
+    mock_redis.delete.assert_called_once()
+
+def test_release_inflight_only_own_claim():
+    """task_id를 주면 그 작업이 등록한 진행 중 표시만 해제하는지 테스트"""
+    from app.result_cache import release_inflight
+    mock_redis = MagicMock()
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        release_inflight("https://example.com/", "my_task")
+    mock_redis.delete.assert_not_called()
+    _, numkeys, key, task_id = mock_redis.eval.call_args.args
+    assert key.startswith("url-cache:inflight:") and task_id == "my_task"
+
+class FakeInflightRedis:
+    """진행 중 표시에 쓰는 SET NX/GET/DEL과 소유자 확인 해제 스크립트만 흉내 내는 Redis"""
+    def __init__(self):
+        self.store = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value.encode()
+        return True
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def delete(self, key):
+        return int(self.store.pop(key, None) is not None)
+
+    def eval(self, script, numkeys, key, task_id):
+        if self.store.get(key) == task_id.encode():
+            return self.delete(key)
+        return 0
+
+def test_release_inflight_keeps_newer_claim():
+    """먼저 등록한 작업의 표시가 만료된 뒤 늦게 끝나도, 그 사이 새 요청이 등록한 표시는 남는지 테스트"""
+    from app.result_cache import release_inflight
+    fake_redis = FakeInflightRedis()
+
+    with patch('app.result_cache.get_redis', return_value=fake_redis):
+        assert claim_inflight("https://example.com/", "old_task") is None
+        fake_redis.store.clear()  # old_task의 표시가 TTL로 만료
+        assert claim_inflight("https://example.com/", "new_task") is None
+
+        release_inflight("https://example.com/", "old_task")
+        assert claim_inflight("https://example.com/", "third_task") == "new_task"
+
+        release_inflight("https://example.com/", "new_task")
+        assert claim_inflight("https://example.com/", "third_task") is None
+
+def test_canonicalize_url_rejects_malformed_url():
+    """형식이 잘못된 URL은 ValueError를 발생시키는지 테스트"""
+    with pytest.raises(ValueError):
+        canonicalize_url("http://[::1", follow_redirects=True)
+
+@patch('app.result_cache.http_client.head', side_effect=httpx.InvalidURL("bad redirect"))
+def test_canonicalize_url_invalid_redirect_uses_original(mock_head):
+    """리다이렉트 확인 중 InvalidURL이 나도 원본 URL로 정규화하는지 테스트"""
+    assert canonicalize_url("https://example.com/a", follow_redirects=True) == "https://example.com/a"
+
+def test_get_cached_results_single_round_trip():
+    """여러 URL의 캐시 결과를 MGET 한 번으로 조회하는지 테스트"""
+    from app.result_cache import get_cached_results
+    mock_redis = MagicMock()
+    mock_redis.mget.return_value = [json.dumps({"title": "제목"}).encode(), None]
+
+    with patch('app.result_cache.get_redis', return_value=mock_redis):
+        assert get_cached_results(["https://example.com/a", "https://example.com/b"]) == [{"title": "제목"}, None]
+    mock_redis.mget.assert_called_once()
+    mock_redis.get.assert_not_called()
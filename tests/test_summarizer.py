@@ -1,22 +1,25 @@
+import threading
 import pytest
 from unittest.mock import patch, MagicMock
 from app.summarizer import process_url_task
+from app.fetcher import PageArtifact
 
 # 의존성 모의(Mocking)
 @pytest.fixture
 def mock_dependencies():
-    with patch('app.summarizer.generate_thumbnail_and_upload_to_s3') as mock_thumbnail, \
-         patch('app.summarizer.requests.head') as mock_head, \
+    with patch('app.summarizer.fetch_page', return_value=None), \
+         patch('app.summarizer.generate_thumbnail_and_upload_to_s3') as mock_thumbnail, \
+         patch('app.summarizer.get_content_type') as mock_content_type, \
          patch('app.summarizer.run_langchain_pipeline') as mock_langchain:
         
         mock_thumbnail.return_value = "https://example.com/thumbnail.png"
-        mock_head.return_value = MagicMock(headers={'Content-Type': 'text/html'})
+        mock_content_type.return_value = 'text/html'
         mock_langchain.return_value = {
             "title": "테스트 제목",
             "summary": "테스트 요약",
             "tags": ["테스트", "태그"]
         }
-        yield mock_thumbnail, mock_head, mock_langchain
+        yield mock_thumbnail, mock_content_type, mock_langchain
 
 def test_process_url_task_web(mock_dependencies):
     """웹페이지 URL에 대한 Celery 태스크를 테스트합니다."""
@@ -29,10 +32,10 @@ def test_process_url_task_web(mock_dependencies):
         
 def test_process_url_task_image(mock_dependencies):
     """이미지 URL에 대한 Celery 태스크를 테스트합니다."""
-    with patch('app.summarizer.requests.head') as mock_head, \
+    with patch('app.summarizer.get_content_type') as mock_content_type, \
          patch('app.summarizer.process_image_tip') as mock_image_process:
         
-        mock_head.return_value = MagicMock(headers={'Content-Type': 'image/jpeg'})
+        mock_content_type.return_value = 'image/jpeg'
         mock_image_process.return_value = {
             "summary_and_tags": {
                 "title": "이미지 제목",
@@ -48,21 +51,116 @@ def test_process_url_task_image(mock_dependencies):
 
 def test_process_url_task_youtube(mock_dependencies):
     """유튜브 URL에 대한 Celery 태스크를 테스트합니다."""
-    _, mock_head, mock_langchain = mock_dependencies
+    _, mock_content_type, mock_langchain = mock_dependencies
     
-    mock_head.return_value = MagicMock(headers={'Content-Type': 'text/html'})
+    mock_content_type.return_value = 'text/html'
     
-    with patch('app.summarizer.get_combined_transcript', return_value="유튜브 자막과 음성 내용입니다.") as mock_get_transcript:
+    transcript = {"text": "유튜브 자막과 음성 내용입니다.", "transcript_path": "subtitles", "subtitle_coverage": 0.95}
+    with patch('app.summarizer.build_combined_transcript', return_value=transcript) as mock_get_transcript:
         result = process_url_task.apply(args=["https://www.youtube.com/watch?v=some_video_id"]).get()
 
         mock_get_transcript.assert_called_once()
         mock_langchain.assert_called_once()
         assert result["type"] == "유튜브"
         assert result["title"] == "테스트 제목"
+        assert result["transcript_path"] == "subtitles"
 
-@patch('app.summarizer.generate_thumbnail_and_upload_to_s3', side_effect=Exception("S3 Upload Error"))
-def test_process_url_task_failure(mock_thumbnail):
+def test_process_url_task_reuses_fetched_page(mock_dependencies):
+    """한 번 렌더링한 페이지를 썸네일과 본문 추출이 함께 사용하는지 테스트"""
+    mock_thumbnail, mock_content_type, _ = mock_dependencies
+    artifact = PageArtifact(
+        url="https://example.com",
+        final_url="https://example.com/",
+        headers={"content-type": "text/html"},
+        html="<html><body>본문</body></html>",
+        screenshot=b"screenshot_bytes",
+    )
+
+    with patch('app.summarizer.fetch_page', return_value=artifact) as mock_fetch, \
+         patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")) as mock_extract:
+        result = process_url_task.apply(args=["https://example.com"]).get()
+
+        mock_fetch.assert_called_once_with("https://example.com")
+        mock_thumbnail.assert_called_once_with("https://example.com", artifact)
+        mock_extract.assert_called_once_with("https://example.com", artifact)
+        mock_content_type.assert_not_called()
+        assert result["title"] == "테스트 제목"
+
+@patch('app.summarizer.release_inflight')
+@patch('app.summarizer.set_cached_result')
+def test_process_url_task_caches_result(mock_set_cached, mock_release, mock_dependencies):
+    """canonical_url이 주어지면 결과를 캐시에 저장하고 자신의 task_id로 진행 중 표시를 해제하는지 테스트"""
+    with patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")):
+        async_result = process_url_task.apply(args=["https://example.com"], kwargs={"canonical_url": "https://example.com/"})
+        result = async_result.get()
+
+    mock_set_cached.assert_called_once_with("https://example.com/", result)
+    # 이 작업이 등록한 진행 중 표시일 때만 해제하도록 자신의 task_id를 넘김
+    mock_release.assert_called_once_with("https://example.com/", async_result.id)
+
+@patch('app.summarizer.record_batch_result')
+def test_batch_task_records_result_on_batch(mock_record, mock_dependencies):
+    """배치로 보낸 작업은 끝난 상태(성공/실패)를 배치 정보에 직접 기록하는지 테스트"""
+    from app.summarizer import process_web_task
+    with patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")):
+        succeeded = process_web_task.apply(args=["https://example.com"], kwargs={"batch_id": "batch1"})
+    with patch('app.summarizer.extract_text_from_url', side_effect=Exception("추출 실패")):
+        failed = process_web_task.apply(args=["https://example.com/broken"], kwargs={"batch_id": "batch1"})
+
+    assert mock_record.call_args_list[0].args == ("batch1", succeeded.id)
+    assert mock_record.call_args_list[0].kwargs == {"result": succeeded.get()}
+    assert mock_record.call_args_list[1].args == ("batch1", failed.id)
+    assert mock_record.call_args_list[1].kwargs == {"error": "추출 실패"}
+
+def test_process_url_task_failure(mock_dependencies):
     """Celery 작업 중 예외 발생 시 task가 실패하는지 테스트"""
+    mock_thumbnail, _, _ = mock_dependencies
+    mock_thumbnail.side_effect = Exception("S3 Upload Error")
+
     # .apply().get()은 작업이 실패하면 예외를 발생시킵니다.
-    with pytest.raises(Exception, match="S3 Upload Error"):
-        process_url_task.apply(args=["https://example.com"]).get()
\ No newline at end of file
+    with patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")), \
+         pytest.raises(Exception, match="S3 Upload Error"):
+        process_url_task.apply(args=["https://example.com"]).get()
+
+def test_process_url_task_runs_thumbnail_in_parallel(mock_dependencies):
+    """썸네일 작업이 본문 요약과 동시에 실행되는지 테스트"""
+    mock_thumbnail, _, mock_langchain = mock_dependencies
+    summarizing = threading.Event()
+    summary_result = mock_langchain.return_value
+
+    def run_pipeline(text):
+        summarizing.set()
+        return summary_result
+
+    # 순차 실행이라면 썸네일 작업이 요약 시작을 기다리다가 시간 초과됨
+    mock_thumbnail.side_effect = lambda url, artifact: "https://example.com/thumbnail.png" if summarizing.wait(timeout=5) else None
+    mock_langchain.side_effect = run_pipeline
+
+    with patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")):
+        result = process_url_task.apply(args=["https://example.com"]).get()
+
+    assert result["thumbnail_url"] == "https://example.com/thumbnail.png"
+    assert result["title"] == "테스트 제목"
+
+def test_process_url_task_reuses_thumbnail_thread(mock_dependencies):
+    """작업마다 새 스레드를 만들지 않고 같은 썸네일 스레드(와 그 스레드의 브라우저)를 재사용하는지 테스트"""
+    mock_thumbnail, _, _ = mock_dependencies
+    threads = []
+    mock_thumbnail.side_effect = lambda url, artifact: threads.append(threading.current_thread()) or None
+
+    with patch('app.summarizer.extract_text_from_url', return_value=("text/html", "테스트 본문 내용입니다.")):
+        for _ in range(3):
+            process_url_task.apply(args=["https://example.com"]).get()
+
+    assert len(threads) == 3 and len(set(threads)) == 1
+    assert threads[0] is not threading.current_thread()
+
+@patch('app.summarizer.extract_text_from_images', return_value=["텍스트"])
+def test_ocr_images_task(mock_extract):
+    """base64로 받은 이미지를 디코딩해 배치 OCR하는지 테스트"""
+    import base64
+    from app.summarizer import ocr_images_task
+    result = ocr_images_task.apply(args=[[base64.b64encode(b"image_a").decode()]]).get()
+
+    assert result == ["텍스트"]
+    mock_extract.assert_called_once_with([b"image_a"])
@@ -0,0 +1,121 @@
+# tests/test_summary_cache.py
+
+import redis
+from unittest.mock import patch, MagicMock
+from app.summary_cache import SummaryCache
+
+class FakeRedis:
+    """테스트용 최소 redis 대체 객체 (get/set/zadd/zcard/zrange/delete/zrem/pipeline)."""
+
+    def __init__(self):
+        self.data = {}
+        self.zsets = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def zadd(self, name, mapping):
+        self.zsets.setdefault(name, {}).update(mapping)
+
+    def zcard(self, name):
+        return len(self.zsets.get(name, {}))
+
+    def zrange(self, name, start, end):
+        members = sorted(self.zsets.get(name, {}).items(), key=lambda item: item[1])
+        return [key for key, _ in members][start:end + 1]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def zrem(self, name, *keys):
+        for key in keys:
+            self.zsets.get(name, {}).pop(key, None)
+
+    def pipeline(self, transaction=False):
+        fake = self
+
+        class Pipe:
+            def __init__(self):
+                self.results = []
+
+            def __getattr__(self, name):
+                def call(*args, **kwargs):
+                    self.results.append(getattr(fake, name)(*args, **kwargs))
+                return call
+
+            def execute(self):
+                return self.results
+
+        return Pipe()
+
+RESULT = {"title": "제목", "summary": "요약", "tags": ["태그"]}
+
+def test_summary_cache_normalizes_text():
+    """공백/유니코드 표기만 다른 텍스트는 같은 결과를 재사용하는지 테스트"""
+    fake = FakeRedis()
+    cache = SummaryCache()
+    with patch('app.summary_cache.get_redis', return_value=fake):
+        assert cache.get("같은  글\n입니다", "gpt-3.5-turbo", "v1") is None
+        cache.set("같은  글\n입니다", "gpt-3.5-turbo", "v1", RESULT)
+        assert cache.get(" 같은 글 입니다 ", "gpt-3.5-turbo", "v1") == RESULT
+
+    assert cache.metrics() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+def test_summary_cache_key_includes_model_and_prompt_version():
+    """모델이나 프롬프트 버전이 다르면 이전 결과를 쓰지 않는지 테스트"""
+    fake = FakeRedis()
+    cache = SummaryCache()
+    with patch('app.summary_cache.get_redis', return_value=fake):
+        cache.set("글", "gpt-3.5-turbo", "v1", RESULT)
+        assert cache.get("글", "gpt-3.5-turbo", "v2") is None
+        assert cache.get("글", "gpt-4o-mini", "v1") is None
+
+def test_summary_cache_evicts_least_recently_used():
+    """최대 개수를 넘으면 가장 오래 사용하지 않은 결과부터 제거하는지 테스트"""
+    fake = FakeRedis()
+    cache = SummaryCache(max_entries=2)
+    with patch('app.summary_cache.get_redis', return_value=fake), \
+         patch('app.summary_cache.time.time', side_effect=range(100)):
+        cache.set("첫 번째", "m", "v1", RESULT)
+        cache.set("두 번째", "m", "v1", RESULT)
+        cache.get("첫 번째", "m", "v1")
+        cache.set("세 번째", "m", "v1", RESULT)
+
+        assert cache.get("첫 번째", "m", "v1") == RESULT
+        assert cache.get("두 번째", "m", "v1") is None
+
+def test_summary_cache_fails_open():
+    """Redis 장애 시 캐시를 건너뛰는지 테스트"""
+    broken = MagicMock()
+    broken.get.side_effect = redis.ConnectionError("down")
+    broken.pipeline.side_effect = redis.ConnectionError("down")
+    cache = SummaryCache()
+    with patch('app.summary_cache.get_redis', return_value=broken):
+        assert cache.get("글", "m", "v1") is None
+        cache.set("글", "m", "v1", RESULT)
+
+@patch('app.ai_utils._generate_summary', return_value=RESULT)
+def test_summarize_and_tag_uses_cache(mock_generate):
+    """같은 글을 두 번 요약하면 두 번째는 GPT를 호출하지 않는지 테스트"""
+    from app.ai_utils import summarize_and_tag
+    with patch('app.ai_utils.get_summary_cache', return_value=SummaryCache()), \
+         patch('app.summary_cache.get_redis', return_value=FakeRedis()):
+        assert summarize_and_tag("같은 블로그 글") == RESULT
+        assert summarize_and_tag("같은 블로그 글 ") == RESULT
+
+    mock_generate.assert_called_once()
+
+@patch('app.ai_utils._generate_summary', side_effect=Exception("API Error"))
+def test_summarize_and_tag_does_not_cache_failures(mock_generate):
+    """실패 결과는 캐시에 저장하지 않는지 테스트"""
+    from app.ai_utils import summarize_and_tag
+    fake = FakeRedis()
+    with patch('app.ai_utils.get_summary_cache', return_value=SummaryCache()), \
+         patch('app.summary_cache.get_redis', return_value=fake):
+        assert summarize_and_tag("글")["summary"] == "요약 실패"
+
+    assert fake.data == {}
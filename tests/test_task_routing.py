@@ -0,0 +1,54 @@
+# tests/test_task_routing.py
+
+import asyncio
+import httpx
+from unittest.mock import patch
+from app.task_routing import detect_queue, async_detect_queue, QUEUE_TASKS, OCR_BATCH_TASK, BATCH_PREPARE_TASK, WEB_QUEUE, OCR_QUEUE, ASR_QUEUE
+
+def test_detect_queue_youtube_without_request():
+    """유튜브 URL은 HEAD 요청 없이 음성 인식 큐로 보내는지 테스트"""
+    with patch('app.task_routing.http_client.get_content_type') as mock_content_type:
+        assert detect_queue("https://youtu.be/dQw4w9WgXcQ") == ASR_QUEUE
+        assert detect_queue("https://www.youtube.com/watch?v=dQw4w9WgXcQ") == ASR_QUEUE
+    mock_content_type.assert_not_called()
+
+@patch('app.task_routing.http_client.get_content_type')
+def test_detect_queue_by_content_type(mock_content_type):
+    """Content-Type이 이미지이면 OCR 큐, 그 외에는 웹 큐로 보내는지 테스트"""
+    mock_content_type.return_value = "image/jpeg"
+    assert detect_queue("https://example.com/photo") == OCR_QUEUE
+
+    mock_content_type.return_value = "text/html; charset=utf-8"
+    assert detect_queue("https://example.com/post") == WEB_QUEUE
+
+@patch('app.task_routing.http_client.get_content_type', side_effect=httpx.ConnectError("connection refused"))
+def test_detect_queue_falls_back_to_web(mock_content_type):
+    """HEAD 요청이 실패하면 웹 큐로 보내는지 테스트"""
+    assert detect_queue("https://example.com/post") == WEB_QUEUE
+
+def test_detect_queue_malformed_url_falls_back_to_web():
+    """형식이 잘못된 URL(httpx.InvalidURL)도 예외 없이 웹 큐로 보내는지 테스트"""
+    assert detect_queue("http://[::1") == WEB_QUEUE
+    assert asyncio.run(async_detect_queue("http://[::1")) == WEB_QUEUE
+
+@patch('app.task_routing.http_client.async_get_content_type', return_value="image/png")
+def test_async_detect_queue(mock_content_type):
+    """비동기 버전도 비동기 HTTP 클라이언트의 Content-Type으로 큐를 정하는지 테스트"""
+    assert asyncio.run(async_detect_queue("https://example.com/photo")) == OCR_QUEUE
+    assert asyncio.run(async_detect_queue("https://youtu.be/dQw4w9WgXcQ")) == ASR_QUEUE
+    mock_content_type.assert_awaited_once_with("https://example.com/photo", timeout=5)
+
+def test_queue_tasks_are_routed_to_their_queue():
+    """큐별 작업이 등록되어 있고, 각자의 큐와 속도 제한으로 설정되는지 테스트"""
+    from app.celery_config import celery_app
+    import app.summarizer  # noqa: F401 (작업 등록)
+
+    for queue, task_name in QUEUE_TASKS.items():
+        assert task_name in celery_app.tasks
+        assert celery_app.amqp.router.route({}, task_name)["queue"].name == queue
+    assert celery_app.tasks[QUEUE_TASKS[ASR_QUEUE]].rate_limit == "10/m"
+    # /ocr/batch 작업도 OCR 워커에서 실행
+    assert celery_app.amqp.router.route({}, OCR_BATCH_TASK)["queue"].name == OCR_QUEUE
+    # /batch-index/의 준비 작업(URL 정규화)은 웹 워커에서 실행
+    assert BATCH_PREPARE_TASK in celery_app.tasks
+    assert celery_app.amqp.router.route({}, BATCH_PREPARE_TASK)["queue"].name == WEB_QUEUE
@@ -0,0 +1,44 @@
+# tests/test_thumbnail_encoder.py
+
+import io
+import pytest
+from PIL import Image
+from app.thumbnail_encoder import encode_thumbnails, sniff_image_extension
+
+def make_png(width, height, mode="RGB"):
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), (200, 100, 50, 128) if mode == "RGBA" else (200, 100, 50)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def test_encode_thumbnails_multiple_sizes():
+    """한 번의 호출로 여러 너비의 WebP 썸네일을 비율을 유지하며 만드는지 테스트"""
+    thumbnails = encode_thumbnails(make_png(1280, 720), sizes=[320, 640], fmt="webp")
+
+    assert [(t.width, t.height) for t in thumbnails] == [(640, 360), (320, 180)]
+    for thumbnail in thumbnails:
+        assert thumbnail.content_type == "image/webp"
+        assert Image.open(io.BytesIO(thumbnail.data)).format == "WEBP"
+
+def test_encode_thumbnails_does_not_upscale():
+    """원본보다 큰 크기는 만들지 않고 원본 크기 하나만 인코딩하는지 테스트"""
+    thumbnails = encode_thumbnails(make_png(200, 100), sizes=[640, 320], fmt="webp")
+
+    assert [(t.width, t.height) for t in thumbnails] == [(200, 100)]
+
+def test_encode_thumbnails_jpeg_flattens_alpha():
+    """투명도가 있는 이미지를 JPEG로 인코딩할 수 있는지 테스트"""
+    thumbnails = encode_thumbnails(make_png(800, 400, mode="RGBA"), sizes=[400], fmt="jpeg")
+
+    assert thumbnails[0].extension == "jpg"
+    assert thumbnails[0].content_type == "image/jpeg"
+    assert Image.open(io.BytesIO(thumbnails[0].data)).mode == "RGB"
+
+def test_encode_thumbnails_invalid_data():
+    """이미지가 아닌 데이터는 빈 리스트를 반환하는지 테스트"""
+    assert encode_thumbnails(b"not an image", sizes=[320]) == []
+    assert sniff_image_extension(b"not an image") == "png"
+
+def test_encode_thumbnails_unknown_format():
+    """지원하지 않는 포맷은 ValueError를 발생시키는지 테스트"""
+    with pytest.raises(ValueError, match="지원하지 않는 썸네일 포맷입니다"):
+        encode_thumbnails(make_png(10, 10), fmt="avif")
@@ -2,7 +2,9 @@
 
 import pytest
 from unittest.mock import patch, MagicMock
-from app.thumbnail_handler import generate_thumbnail, upload_to_s3, generate_thumbnail_and_upload_to_s3
+from app.thumbnail_handler import generate_thumbnail, upload_to_s3, generate_thumbnail_and_upload_to_s3, upload_thumbnail_variants
+from app.fetcher import PageArtifact
+from app.thumbnail_index import content_hash
 
 def test_generate_thumbnail_youtube_url():
     """유튜브 URL 썸네일 생성 테스트"""
@@ -11,9 +13,9 @@ def test_generate_thumbnail_youtube_url():
     assert "https://img.youtube.com/vi/dQw4w9WgXcQ/0.jpg" == result
     assert thumb_type == "redirect"
 
-@patch('app.thumbnail_handler.requests.head', return_value=MagicMock(headers={'Content-Type': 'image/png'}))
-@patch('app.thumbnail_handler.requests.get')
-def test_generate_thumbnail_image_url(mock_get, mock_head):
+@patch('app.thumbnail_handler.http_client.get_content_type', return_value='image/png')
+@patch('app.thumbnail_handler.http_client.get')
+def test_generate_thumbnail_image_url(mock_get, mock_content_type):
     """이미지 URL 썸네일 생성 테스트"""
     mock_response = MagicMock()
     mock_response.raise_for_status.return_value = None
@@ -24,23 +26,149 @@ def test_generate_thumbnail_image_url(mock_get, mock_head):
     assert result == b"image_bytes"
     assert thumb_type == "image"
 
-@patch('app.thumbnail_handler.sync_playwright')
-def test_generate_thumbnail_webpage_url(mock_sync_playwright):
+@patch('app.thumbnail_handler.get_browser_pool')
+def test_generate_thumbnail_webpage_url(mock_get_browser_pool):
     """일반 웹페이지 URL 스크린샷 썸네일 생성 테스트"""
     mock_page = MagicMock()
     mock_page.screenshot.return_value = b"screenshot_bytes"
-    mock_browser = MagicMock()
-    mock_browser.new_page.return_value = mock_page
-    mock_playwright = MagicMock()
-    mock_playwright.chromium.launch.return_value = mock_browser
-    mock_sync_playwright.return_value.__enter__.return_value = mock_playwright
+    mock_get_browser_pool.return_value.page.return_value.__enter__.return_value = mock_page
 
     result, thumb_type = generate_thumbnail("https://example.com")
     assert result == b"screenshot_bytes"
     assert thumb_type == "image"
 
+@patch('app.thumbnail_handler.get_browser_pool')
+@patch('app.thumbnail_handler.http_client.get_content_type')
+def test_generate_thumbnail_uses_artifact(mock_content_type, mock_get_browser_pool):
+    """렌더링된 artifact가 있으면 페이지를 다시 불러오지 않는지 테스트"""
+    artifact = PageArtifact(
+        url="https://example.com",
+        final_url="https://example.com",
+        headers={"content-type": "text/html"},
+        html="<html></html>",
+        screenshot=b"screenshot_bytes",
+    )
+
+    result, thumb_type = generate_thumbnail("https://example.com", artifact)
+    assert result == b"screenshot_bytes"
+    assert thumb_type == "image"
+    mock_content_type.assert_not_called()
+    mock_get_browser_pool.assert_not_called()
+
 @patch('app.thumbnail_handler.boto3.client')
 def test_upload_to_s3_success(mock_boto_client):
     """S3 업로드 성공 테스트"""
     mock_s3 = MagicMock()
     mock_boto_client.return_value = mock_s3
+
+def _fake_upload(data, ext, key=None, content_type=None, on_uploaded=None):
+    on_uploaded()
+    return f"https://bucket/{key}"
+
+@patch('app.thumbnail_handler.remember')
+@patch('app.thumbnail_handler.find_existing', return_value=None)
+@patch('app.thumbnail_handler.upload_to_s3', side_effect=_fake_upload)
+@patch('app.thumbnail_handler.encode_thumbnails')
+def test_upload_thumbnail_variants(mock_encode, mock_upload, mock_find, mock_remember):
+    """크기별 썸네일을 같은 경로 아래 올바른 ContentType으로 업로드하고 가장 큰 크기의 URL을 반환하는지 테스트"""
+    from app.thumbnail_encoder import EncodedThumbnail
+    mock_encode.return_value = [
+        EncodedThumbnail(640, 360, b"large", "webp", "image/webp"),
+        EncodedThumbnail(320, 180, b"small", "webp", "image/webp"),
+    ]
+
+    url = upload_thumbnail_variants(b"screenshot_bytes")
+
+    keys = [call.kwargs["key"] for call in mock_upload.call_args_list]
+    assert keys[0].endswith("/640.webp") and keys[1].endswith("/320.webp")
+    assert keys[0].rsplit("/", 1)[0] == keys[1].rsplit("/", 1)[0]
+    assert all(call.kwargs["content_type"] == "image/webp" for call in mock_upload.call_args_list)
+    assert url == f"https://bucket/{keys[0]}"
+    # 키는 원본 내용의 해시로 정해지고, 업로드 후 인덱스에 기록
+    assert keys[0] == f"thumbnails/{content_hash(b'screenshot_bytes')[:32]}/640.webp"
+    mock_remember.assert_called_once_with(content_hash(b"screenshot_bytes"), url, None)
+
+@patch('app.thumbnail_handler.find_existing', return_value="https://bucket/thumbnails/existing/640.webp")
+@patch('app.thumbnail_handler.upload_to_s3')
+@patch('app.thumbnail_handler.encode_thumbnails')
+def test_upload_thumbnail_variants_reuses_existing(mock_encode, mock_upload, mock_find):
+    """이미 업로드한 썸네일이면 인코딩/업로드 없이 기존 URL을 반환하는지 테스트"""
+    assert upload_thumbnail_variants(b"screenshot_bytes") == "https://bucket/thumbnails/existing/640.webp"
+    mock_encode.assert_not_called()
+    mock_upload.assert_not_called()
+
+@patch('app.thumbnail_handler.remember')
+@patch('app.thumbnail_handler.find_existing', return_value=None)
+@patch('app.thumbnail_handler.upload_to_s3', return_value="https://bucket/original.gif")
+@patch('app.thumbnail_handler.encode_thumbnails', return_value=[])
+def test_upload_thumbnail_variants_falls_back_to_original(mock_encode, mock_upload, mock_find, mock_remember):
+    """인코딩할 수 없는 이미지는 원본 그대로 업로드하는지 테스트"""
+    assert upload_thumbnail_variants(b"GIF89a...") == "https://bucket/original.gif"
+    mock_upload.assert_called_once()
+
+@pytest.fixture
+def moto_s3(monkeypatch):
+    """moto로 띄운 가짜 S3에 버킷을 만들고, 캐시된 S3 클라이언트를 초기화"""
+    from moto import mock_aws
+    from app import thumbnail_handler
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_REGION", "ap-northeast-2")
+    monkeypatch.setenv("AWS_ACCOUNT_ID", "123456789012")
+    monkeypatch.setenv("AWS_S3_BUCKET_NAME", "test-thumbnails")
+
+    with mock_aws():
+        thumbnail_handler.s3_client = None
+        s3 = thumbnail_handler.get_s3_client()
+        s3.create_bucket(Bucket="test-thumbnails", CreateBucketConfiguration={"LocationConstraint": "ap-northeast-2"})
+        yield s3
+        thumbnail_handler.flush_uploads()
+        thumbnail_handler.s3_client = None
+
+def test_upload_to_s3_reuses_client(moto_s3):
+    """S3 클라이언트를 매 업로드마다 새로 만들지 않고, 올바른 ContentType으로 저장하는지 테스트"""
+    with patch('app.thumbnail_handler.boto3.client') as mock_boto_client:
+        url1 = upload_to_s3(b"webp_bytes", "webp", key="thumbnails/a/640.webp")
+        url2 = upload_to_s3(b"jpg_bytes", "jpg")
+        mock_boto_client.assert_not_called()
+
+    assert url1 == "https://test-thumbnails.s3.ap-northeast-2.amazonaws.com/thumbnails/a/640.webp"
+    stored = moto_s3.get_object(Bucket="test-thumbnails", Key="thumbnails/a/640.webp")
+    assert stored["ContentType"] == "image/webp"
+    assert stored["Body"].read() == b"webp_bytes"
+    assert moto_s3.head_object(Bucket="test-thumbnails", Key=url2.split(".com/")[1])["ContentType"] == "image/jpeg"
+
+def test_upload_to_s3_background(moto_s3):
+    """백그라운드 업로드는 URL을 바로 반환하고, 큐를 비우면 객체가 저장되어 있는지 테스트"""
+    from app.thumbnail_handler import flush_uploads
+
+    url = upload_to_s3(b"png_bytes", "png", key="thumbnails/bg.png", background=True)
+    assert url.endswith("/thumbnails/bg.png")
+
+    flush_uploads()
+    assert moto_s3.get_object(Bucket="test-thumbnails", Key="thumbnails/bg.png")["Body"].read() == b"png_bytes"
+
+@pytest.mark.parametrize("bucket, remembered", [("test-thumbnails", True), ("missing-bucket", False)])
+@patch('app.thumbnail_handler.S3_ASYNC_UPLOAD', True)
+@patch('app.thumbnail_handler.remember')
+@patch('app.thumbnail_handler.find_existing', return_value=None)
+@patch('app.thumbnail_handler.encode_thumbnails')
+def test_upload_thumbnail_variants_background_remembers_only_on_success(mock_encode, mock_find, mock_remember,
+                                                                        bucket, remembered, moto_s3, monkeypatch):
+    """백그라운드 업로드는 모든 크기가 업로드된 뒤에만 인덱스에 기록하고, 실패하면 기록하지 않는지 테스트"""
+    from app.thumbnail_encoder import EncodedThumbnail
+    from app.thumbnail_handler import flush_uploads
+    monkeypatch.setenv("AWS_S3_BUCKET_NAME", bucket)
+    mock_encode.return_value = [
+        EncodedThumbnail(640, 360, b"large", "webp", "image/webp"),
+        EncodedThumbnail(320, 180, b"small", "webp", "image/webp"),
+    ]
+
+    url = upload_thumbnail_variants(b"screenshot_bytes")
+    flush_uploads()
+
+    if remembered:
+        mock_remember.assert_called_once_with(content_hash(b"screenshot_bytes"), url, None)
+    else:
+        mock_remember.assert_not_called()
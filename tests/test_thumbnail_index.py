@@ -0,0 +1,97 @@
+# tests/test_thumbnail_index.py
+
+import io
+import redis
+from unittest.mock import patch, MagicMock
+from PIL import Image, ImageDraw
+from app.image_hash import dhash, hamming, hash_bands
+from app.thumbnail_index import find_existing, remember, content_hash, perceptual_hash
+
+class FakeRedis:
+    """테스트용 최소 redis 대체 객체 (get/set/sadd/smembers/expire/pipeline)."""
+
+    def __init__(self):
+        self.data = {}
+        self.sets = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def sadd(self, key, *members):
+        self.sets.setdefault(key, set()).update(str(member).encode() for member in members)
+
+    def smembers(self, key):
+        return self.sets.get(key, set())
+
+    def expire(self, key, ttl):
+        pass
+
+    def pipeline(self, transaction=False):
+        fake = self
+
+        class Pipe:
+            def __init__(self):
+                self.results = []
+
+            def __getattr__(self, name):
+                def call(*args, **kwargs):
+                    self.results.append(getattr(fake, name)(*args, **kwargs))
+                return call
+
+            def execute(self):
+                return self.results
+
+        return Pipe()
+
+def make_screenshot(layout=0, fmt="PNG", size=(640, 360)):
+    """배경 위에 가로 위치가 layout에 따라 달라지는 블록들을 그린 가짜 스크린샷"""
+    width, height = size
+    image = Image.new("RGB", size, (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    for row in range(8):
+        x = ((row * 3 + layout * 5) % 8) * width // 8
+        draw.rectangle((x, row * height // 8, x + width // 4, (row + 1) * height // 8), fill=(40 + row * 20, 90, 200))
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+def test_hash_bands_share_a_band_within_distance():
+    """해밍 거리 3 이하인 두 해시는 적어도 한 구간이 같은지 테스트"""
+    a = 0x0123456789ABCDEF
+    b = a ^ (1 << 3) ^ (1 << 20) ^ (1 << 40)
+    assert hamming(a, b) == 3
+    assert any(x == y for x, y in zip(hash_bands(a), hash_bands(b)))
+
+@patch('app.thumbnail_index.get_redis')
+def test_find_existing_by_content_hash(mock_get_redis):
+    """같은 바이트의 썸네일은 내용 해시로 기존 URL을 찾는지 테스트"""
+    mock_get_redis.return_value = FakeRedis()
+    data = make_screenshot()
+    digest = content_hash(data)
+
+    assert find_existing(digest) is None
+    remember(digest, "https://bucket/thumbnails/abc/640.webp")
+    assert find_existing(digest) == "https://bucket/thumbnails/abc/640.webp"
+
+@patch('app.thumbnail_index.THUMBNAIL_PHASH_DISTANCE', 3)
+@patch('app.thumbnail_index.get_redis')
+def test_find_existing_by_perceptual_hash(mock_get_redis):
+    """압축/해상도만 다른 스크린샷은 지각 해시로 찾고, 다른 화면은 찾지 않는지 테스트"""
+    mock_get_redis.return_value = FakeRedis()
+    original = make_screenshot()
+    recompressed = make_screenshot(fmt="JPEG", size=(1280, 720))
+    different = make_screenshot(layout=1)
+
+    remember(content_hash(original), "https://bucket/thumbnails/abc/640.webp", perceptual_hash(original))
+
+    assert find_existing(content_hash(recompressed), perceptual_hash(recompressed)) == "https://bucket/thumbnails/abc/640.webp"
+    assert find_existing(content_hash(different), perceptual_hash(different)) is None
+
+@patch('app.thumbnail_index.get_redis')
+def test_find_existing_fails_open(mock_get_redis):
+    """Redis 장애 시 중복 확인을 건너뛰고 업로드하도록 None을 반환하는지 테스트"""
+    mock_get_redis.return_value.get.side_effect = redis.ConnectionError("down")
+    assert find_existing("digest") is None
@@ -0,0 +1,64 @@
+# tests/test_vector_store.py
+
+import threading
+from unittest.mock import patch, MagicMock
+from langchain_core.documents import Document
+from app.vector_store import VectorStoreWriter, get_vector_store_writer
+
+def _docs(*texts):
+    return [Document(page_content=text, metadata={"i": i}) for i, text in enumerate(texts)]
+
+@patch('app.vector_store.PGVector')
+@patch('app.vector_store.OpenAIEmbeddings')
+def test_writer_embeds_in_batch_and_bulk_inserts(mock_embeddings, mock_pgvector):
+    """청크를 한 번의 임베딩 호출과 한 번의 저장으로 처리하는지 테스트"""
+    mock_embeddings.return_value.embed_documents.return_value = [[0.1], [0.2]]
+    mock_pgvector.return_value.add_embeddings.return_value = ["id1", "id2"]
+
+    writer = VectorStoreWriter("postgresql+psycopg2://test", batch_size=256, micro_batch_ms=0, use_cache=False)
+    ids = writer.add_documents(_docs("첫 청크", "둘째 청크"))
+
+    assert ids == ["id1", "id2"]
+    assert mock_embeddings.call_args.kwargs["chunk_size"] == 256
+    mock_embeddings.return_value.embed_documents.assert_called_once_with(["첫 청크", "둘째 청크"])
+    mock_pgvector.return_value.add_embeddings.assert_called_once_with(
+        texts=["첫 청크", "둘째 청크"], embeddings=[[0.1], [0.2]], metadatas=[{"i": 0}, {"i": 1}]
+    )
+    # 커넥션 풀 설정으로 엔진을 한 번만 생성
+    assert mock_pgvector.call_args.kwargs["engine_args"]["pool_size"] > 0
+
+@patch('app.vector_store.PGVector')
+@patch('app.vector_store.OpenAIEmbeddings')
+def test_writer_micro_batches_concurrent_calls(mock_embeddings, mock_pgvector):
+    """동시에 들어온 작업의 청크를 모아 한 번에 저장하고 ID를 나눠 돌려주는지 테스트"""
+    mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[0.0] for _ in texts]
+    mock_pgvector.return_value.add_embeddings.side_effect = lambda texts, embeddings, metadatas: [f"id-{t}" for t in texts]
+
+    writer = VectorStoreWriter("postgresql+psycopg2://test", batch_size=3, micro_batch_ms=2000, use_cache=False)
+    results = {}
+
+    def add(name, texts):
+        results[name] = writer.add_documents(_docs(*texts))
+
+    threads = [
+        threading.Thread(target=add, args=("a", ["a1", "a2"])),
+        threading.Thread(target=add, args=("b", ["b1"])),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert results["a"] == ["id-a1", "id-a2"]
+    assert results["b"] == ["id-b1"]
+    mock_pgvector.return_value.add_embeddings.assert_called_once()
+
+@patch('app.vector_store.PGVector')
+@patch('app.vector_store.OpenAIEmbeddings')
+def test_get_vector_store_writer_singleton(mock_embeddings, mock_pgvector):
+    """get_vector_store_writer가 프로세스당 한 번만 저장기를 생성하는지 테스트"""
+    from app import vector_store
+    vector_store.writer = None
+
+    assert get_vector_store_writer() is get_vector_store_writer()
+    mock_pgvector.assert_called_once()
@@ -12,7 +12,11 @@ from app.video_handler import (
     remove_overlap,
     get_combined_transcript,
     normalize_youtube_url,
-    extract_video_id
+    extract_video_id,
+    load_transcriber,
+    build_combined_transcript,
+    subtitle_coverage,
+    find_uncovered_ranges
 )
 
 @patch('app.video_handler.YouTubeTranscriptApi.get_transcript')
@@ -29,23 +33,91 @@ def test_get_youtube_subtitles_no_transcript(mock_get_transcript):
     assert subtitles == []
 
 @patch('app.video_handler.yt_dlp.YoutubeDL')
-def test_download_youtube_audio(mock_ydl):
+def test_download_youtube_audio(mock_ydl, tmp_path):
     mock_ydl_instance = MagicMock()
     mock_ydl.return_value.__enter__.return_value = mock_ydl_instance
-    audio_file = download_youtube_audio("https://www.youtube.com/watch?v=mock_video_id")
-    mock_ydl_instance.download.assert_called_once()
-    assert audio_file == "yt_audio.mp3"
+    audio_file = download_youtube_audio("https://www.youtube.com/watch?v=mock_video_id", str(tmp_path), transcode=True)
+    mock_ydl_instance.extract_info.assert_called_once()
+    assert audio_file == str(tmp_path / "audio.mp3")
 
-@patch('app.video_handler.get_youtube_subtitles', return_value=["Youtube subtitles."])
+    ydl_opts = mock_ydl.call_args[0][0]
+    assert ydl_opts['outtmpl'].startswith(str(tmp_path))
+    assert ydl_opts['postprocessors'][0]['preferredcodec'] == 'mp3'
+
+@patch('app.video_handler.yt_dlp.YoutubeDL')
+def test_download_youtube_audio_without_transcode(mock_ydl, tmp_path):
+    """변환 없이 원본 오디오 파일 경로를 그대로 반환하는지 테스트"""
+    mock_ydl_instance = MagicMock()
+    mock_ydl_instance.prepare_filename.return_value = str(tmp_path / "audio.webm")
+    mock_ydl.return_value.__enter__.return_value = mock_ydl_instance
+
+    audio_file = download_youtube_audio("https://www.youtube.com/watch?v=mock_video_id", str(tmp_path))
+    assert audio_file == str(tmp_path / "audio.webm")
+    assert 'postprocessors' not in mock_ydl.call_args[0][0]
+
+@patch('app.video_handler.get_youtube_subtitle_entries', return_value=[{"text": "Youtube subtitles.", "start": 0.0, "duration": 0.0}])
+@patch('app.video_handler.get_video_duration', return_value=None)
 @patch('app.video_handler.download_youtube_audio', return_value="audio.mp3")
 @patch('app.video_handler.get_whisper_transcript', return_value=["Additional whisper content."])
-@patch('os.path.exists', return_value=True)
-@patch('os.remove')
-def test_get_combined_transcript(mock_os_remove, mock_os_exists, mock_whisper, mock_download, mock_subtitles):
+def test_get_combined_transcript(mock_whisper, mock_download, mock_duration, mock_subtitles):
     combined_text = get_combined_transcript("https://www.youtube.com/watch?v=mock_video_id")
     assert "[유튜브 자막 기반]" in combined_text
     assert "Additional whisper content." in combined_text
-    mock_os_remove.assert_called_once_with("audio.mp3")
+
+    # 작업별 임시 폴더에 받고, 작업이 끝나면 폴더가 정리되어야 함
+    workdir = mock_download.call_args[0][1]
+    assert os.path.basename(workdir).startswith("yt_audio_")
+    assert not os.path.exists(workdir)
+
+@patch('app.video_handler.stream_youtube_audio')
+@patch('app.video_handler.download_youtube_audio')
+def test_get_youtube_audio_stream_mode(mock_download, mock_stream):
+    """stream 모드에서는 파일로 내려받지 않는지 테스트"""
+    from app.video_handler import get_youtube_audio
+    audio = get_youtube_audio("https://www.youtube.com/watch?v=mock_video_id", "/tmp/unused", mode="stream")
+
+    assert audio is mock_stream.return_value
+    mock_download.assert_not_called()
+
+SUBTITLE_ENTRIES = [
+    {"text": "첫 문장", "start": 0.0, "duration": 40.0},
+    {"text": "둘째 문장", "start": 40.0, "duration": 20.0},
+    {"text": "셋째 문장", "start": 80.0, "duration": 20.0},
+]
+
+def test_subtitle_coverage_and_gaps():
+    """자막 구간을 합쳐 커버리지와 자막이 없는 구간을 계산하는지 테스트"""
+    assert subtitle_coverage(SUBTITLE_ENTRIES, 100.0) == pytest.approx(0.8)
+    assert find_uncovered_ranges(SUBTITLE_ENTRIES, 100.0, min_gap=3) == [(60.0, 80.0)]
+    assert find_uncovered_ranges(SUBTITLE_ENTRIES, 110.0, min_gap=3) == [(60.0, 80.0), (100.0, 110.0)]
+
+@patch('app.video_handler.SUBTITLE_COVERAGE_THRESHOLD', 0.75)
+@patch('app.video_handler.get_youtube_subtitle_entries', return_value=SUBTITLE_ENTRIES)
+@patch('app.video_handler.get_video_duration', return_value=100.0)
+@patch('app.video_handler.download_youtube_audio')
+def test_build_combined_transcript_skips_asr(mock_download, mock_duration, mock_subtitles):
+    """자막 커버리지가 임계값 이상이면 오디오 다운로드 없이 자막만 사용하는지 테스트"""
+    result = build_combined_transcript("https://www.youtube.com/watch?v=mock_video_id", mode="coverage")
+
+    mock_download.assert_not_called()
+    assert result["transcript_path"] == "subtitles"
+    assert result["subtitle_coverage"] == pytest.approx(0.8)
+    assert "둘째 문장" in result["text"]
+
+@patch('app.video_handler.SUBTITLE_COVERAGE_THRESHOLD', 0.9)
+@patch('app.video_handler.get_youtube_subtitle_entries', return_value=SUBTITLE_ENTRIES)
+@patch('app.video_handler.get_video_duration', return_value=100.0)
+@patch('app.video_handler.download_youtube_audio', return_value="audio.mp3")
+@patch('app.video_handler.get_whisper_transcript_ranges', return_value=["빈", "구간", "내용"])
+@patch('app.video_handler.get_whisper_transcript')
+def test_build_combined_transcript_partial_asr(mock_full, mock_ranges, mock_download, mock_duration, mock_subtitles):
+    """자막이 부족하면 자막이 없는 구간만 음성 인식하는지 테스트"""
+    result = build_combined_transcript("https://www.youtube.com/watch?v=mock_video_id", mode="coverage")
+
+    mock_ranges.assert_called_once_with("audio.mp3", [(60.0, 80.0)])
+    mock_full.assert_not_called()
+    assert result["transcript_path"] == "partial_asr"
+    assert "구간" in result["text"]
 
 def test_remove_overlap():
     whisper_lines = ["Hello world.", "This is a test.", "Goodbye."]
@@ -53,6 +125,15 @@ def test_remove_overlap():
     unique_lines = remove_overlap(whisper_lines, subtitle_lines)
     assert unique_lines == ["Goodbye."]
 
+def test_remove_overlap_matches_pairwise():
+    """cdist 기반 구현이 모든 쌍을 비교하던 기존 방식과 같은 결과를 내는지 테스트"""
+    whisper_lines = ["안녕하세요", "여러분", "오늘은", "안녕하세요", "날씨가", "좋네요", "여러분", "감사합니다"]
+    subtitle_lines = ["안녕하세요!", "오늘은 날씨가 좋네요", "여러분"]
+    expected = [w for w in whisper_lines if not any(is_similar(w, s) for s in subtitle_lines)]
+
+    assert remove_overlap(whisper_lines, subtitle_lines, workers=1) == expected
+    assert remove_overlap(whisper_lines, [], workers=1) == whisper_lines
+
 def test_normalize_youtube_url_invalid():
     """유효하지 않은 유튜브 URL 입력 시 ValueError가 발생하는지 테스트"""
     with pytest.raises(ValueError, match="유효한 유튜브 URL이 아닙니다."):
@@ -63,9 +144,13 @@ def test_extract_video_id_none():
     video_id = extract_video_id("https://example.com/not-a-video")
     assert video_id is None
 
-@patch('app.video_handler.whisper.load_model')
+@patch('whisper.load_model')
 def test_get_whisper_transcript(mock_load_model):
     """Whisper를 이용한 음성-텍스트 변환 테스트"""
+    # 전역 변수 초기화를 위해
+    from app import video_handler
+    video_handler.transcriber = None
+
     mock_model = MagicMock()
     mock_model.transcribe.return_value = {"text": "이것은. 테스트. 문장입니다."}
     mock_load_model.return_value = mock_model
@@ -76,6 +161,44 @@ def test_get_whisper_transcript(mock_load_model):
     mock_load_model.assert_called_once_with("base")
     mock_model.transcribe.assert_called_once_with("dummy_audio.mp3")
 
+@patch('whisper.load_model')
+def test_get_transcriber_initialization(mock_load_model):
+    """음성 인식 모델이 처음 호출될 때만 로드되는지 테스트"""
+    from app import video_handler
+    video_handler.transcriber = None
+
+    mock_load_model.return_value.transcribe.return_value = {"text": "문장"}
+    get_whisper_transcript("first.mp3")
+    get_whisper_transcript("second.mp3")
+
+    mock_load_model.assert_called_once_with("base")
+
+def test_whisper_backend_int8_quantizes_linear_layers():
+    """compute_type=int8이면 whisper의 Linear 하위 클래스까지 모두 동적 양자화되는지 테스트"""
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+    from app.video_handler import WhisperBackend
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=10, n_audio_state=8, n_audio_head=2, n_audio_layer=1,
+                           n_vocab=100, n_text_ctx=8, n_text_state=8, n_text_head=2, n_text_layer=1)
+    model = Whisper(dims)
+    mel = torch.randn(1, 80, 20)
+    expected = model.encoder(mel)
+
+    with patch('whisper.load_model', return_value=model):
+        backend = WhisperBackend("tiny", compute_type="int8")
+
+    linears = [m for m in backend.model.modules() if isinstance(m, torch.nn.Linear)]
+    quantized = [m for m in backend.model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+    assert not linears and quantized
+    assert not any(isinstance(m, whisper.model.Linear) for m in backend.model.modules())
+    assert torch.allclose(backend.model.encoder(mel), expected, atol=0.1)
+
+def test_load_transcriber_unknown_backend():
+    """지원하지 않는 백엔드 이름은 ValueError를 발생시키는지 테스트"""
+    with pytest.raises(ValueError, match="지원하지 않는 음성 인식 백엔드입니다"):
+        load_transcriber("unknown-backend")
+
 def test_is_similar():
     """문자열 유사도가 정확히 계산되는지 테스트"""
     assert is_similar("안녕하세요", "안녕하세요!") == True
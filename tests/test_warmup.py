@@ -0,0 +1,46 @@
+# tests/test_warmup.py
+
+import pytest
+from unittest.mock import patch, MagicMock
+from app.warmup import models_for_queues, warm_up
+
+def test_models_for_queues_auto():
+    """큐 이름에 따라 필요한 모델만 고르는지 테스트"""
+    assert models_for_queues(["ocr"], "auto") == ["ocr"]
+    assert models_for_queues(["asr"], "auto") == ["asr"]
+    assert models_for_queues(["ocr", "asr", "ocr"], "auto") == ["ocr", "asr"]
+    assert models_for_queues(["web"], "auto") == []
+    assert models_for_queues(["celery"], "auto") == ["ocr", "asr"]
+
+def test_models_for_queues_explicit():
+    """WORKER_WARMUP으로 직접 지정하거나 끌 수 있는지 테스트"""
+    assert models_for_queues(["celery"], "asr") == ["asr"]
+    assert models_for_queues(["celery"], "none") == []
+    with pytest.raises(ValueError, match="지원하지 않는 워밍업 대상입니다"):
+        models_for_queues(["celery"], "gpu")
+
+def test_warm_up_continues_after_failure():
+    """한 모델의 워밍업이 실패해도 다음 모델을 계속 불러오는지 테스트"""
+    failing, succeeding = MagicMock(side_effect=RuntimeError("download failed")), MagicMock()
+    with patch.dict('app.warmup.WARMUP_TARGETS', {"ocr": failing, "asr": succeeding}):
+        warm_up(["ocr", "asr"])
+
+    failing.assert_called_once()
+    succeeding.assert_called_once()
+
+@patch('app.image_handler.get_ocr_reader')
+def test_warm_up_ocr_runs_dummy_inference(mock_get_reader):
+    """OCR 워밍업이 모델을 불러오고 더미 추론을 한 번 실행하는지 테스트"""
+    warm_up(["ocr"])
+    mock_get_reader.return_value.readtext.assert_called_once()
+
+@patch('app.warmup.warm_up')
+def test_worker_process_init_hook(mock_warm_up):
+    """워커 프로세스 시작 신호에서 구독 큐에 맞는 모델을 워밍업하는지 테스트"""
+    from app.celery_config import warm_up_models, celery_app
+    amqp = MagicMock()
+    amqp.queues.consume_from = {"ocr": MagicMock()}
+    with patch.object(celery_app, 'amqp', amqp):
+        warm_up_models()
+
+    mock_warm_up.assert_called_once_with(["ocr"])